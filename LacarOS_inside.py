@@ -3,15 +3,23 @@ from PyQt5.QtCore import *
 from PyQt5.QtWidgets import *
 from PyQt5.QtWebEngineWidgets import *
 
+import app_shell
+
 class MainWindow(QMainWindow):
-   def __init__(self):
+   def __init__(self, shell):
        super(MainWindow, self).__init__()
        self.browser = QWebEngineView()
-       self.browser.setUrl(QUrl('https://kitibrowser.netlify.app/lacarosinside.html'))
+       # O shell sai da cópia local em disco; a rede só é usada para revalidar em segundo plano
+       shell.install(self.browser.page().profile())
+       self.browser.setUrl(shell.entry_url())
        self.setCentralWidget(self.browser)
        self.showMaximized()
 
+app_shell.register_scheme()
 app = QApplication(sys.argv)
 QApplication.setApplicationName('Kiti Browser (LaçarOS Inside version)')
-window = MainWindow()
+shell = app_shell.AppShell()
+window = MainWindow(shell)
+shell.start()
+app.aboutToQuit.connect(shell.close)
 app.exec_()
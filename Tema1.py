@@ -1,9 +1,17 @@
 import sys
 import os
+
+if __name__ == "__main__":
+    # Uma segunda execução entrega as URLs à janela aberta e sai antes de carregar o QtWebEngine
+    import single_instance
+    single_instance.forward_or_continue("tema1")
+
 from PyQt5.QtCore import *
 from PyQt5.QtWidgets import *
 from PyQt5.QtWebEngineWidgets import *
-from PyQt5.QtGui import QIcon, QPixmap
+from PyQt5.QtGui import QIcon, QPixmap, QKeySequence
+
+from tab_registry import TabWidget, TabSearchPanel
 
 class ClowBrowser(QMainWindow):
     def __init__(self):
@@ -17,12 +25,22 @@ class ClowBrowser(QMainWindow):
         self.USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 ClowBrowser/1.0"
         
         # Configuração das guias
-        self.tabs = QTabWidget()
+        self.tabs = TabWidget()
         self.tabs.setTabsClosable(True)
         self.tabs.tabCloseRequested.connect(self.close_tab)
         self.tabs.currentChanged.connect(self.tab_changed)
         self.setCentralWidget(self.tabs)
         
+        # Lista pesquisável das guias; aparece sozinha quando há guias demais para a barra
+        self.tab_panel = TabSearchPanel(self.tabs)
+        self.tab_panel.tabActivated.connect(self.tabs.setCurrentIndex)
+        self.tab_dock = QDockWidget("Guias", self)
+        self.tab_dock.setWidget(self.tab_panel)
+        self.addDockWidget(Qt.LeftDockWidgetArea, self.tab_dock)
+        self.tab_dock.hide()
+        self.tabs.stripVisibilityChanged.connect(lambda visible: self.tab_dock.setVisible(not visible))
+        QShortcut(QKeySequence("Ctrl+Shift+A"), self).activated.connect(self.show_tab_search)
+        
         # Inicialização
         self.init_ui()
         self.new_tab()
@@ -159,6 +177,12 @@ class ClowBrowser(QMainWindow):
         browser.iconChanged.connect(lambda icon, browser=browser: 
             self.update_tab_icon(browser, icon))
     
+    def show_tab_search(self):
+        """Mostra a lista de guias com o foco na busca"""
+        self.tab_dock.show()
+        self.tab_panel.select_current(self.tabs.currentIndex())
+        self.tab_panel.focus_search()
+    
     def close_tab(self, index):
         """Fecha a guia especificada"""
         if self.tabs.count() > 1:
@@ -178,12 +202,14 @@ class ClowBrowser(QMainWindow):
         index = self.tabs.indexOf(browser)
         if index != -1:
             self.tabs.setTabText(index, title[:15] + "..." if len(title) > 15 else title)
+            self.tabs.registry.refresh(browser)
     
     def update_tab_icon(self, browser, icon):
         """Atualiza o ícone da guia"""
         index = self.tabs.indexOf(browser)
         if index != -1 and not icon.isNull():
             self.tabs.setTabIcon(index, icon)
+            self.tabs.registry.refresh(browser)
     
     def navigate_home(self):
         """Navega para a página inicial"""
@@ -217,6 +243,48 @@ if __name__ == "__main__":
     app.setAttribute(Qt.AA_EnableHighDpiScaling)
     app.setAttribute(Qt.AA_UseHighDpiPixmaps)
     
-    browser = ClowBrowser()
-    browser.show()
+    # Janelas abertas, da usada há mais tempo para a mais recente; a fechada sai da lista
+    windows = []
+    
+    def add_window():
+        window = ClowBrowser()
+        window.setAttribute(Qt.WA_DeleteOnClose)
+        window.destroyed.connect(lambda _=None, window=window: windows.remove(window) if window in windows else None)
+        windows.append(window)
+        window.show()
+        return window
+    
+    def window_activated(old, new):
+        window = new.window() if new is not None else None
+        if window in windows:
+            windows.remove(window)
+            windows.append(window)
+    
+    app.focusChanged.connect(window_activated)
+    browser = add_window()
+    
+    def open_command_line(argv, cwd):
+        """Abre as URLs de outra execução em guias novas na última janela usada (ou numa nova com --new-window)"""
+        _, argv = single_instance.split_qt_args(argv)
+        urls = [QUrl.fromUserInput(arg, cwd) for arg in argv if not arg.startswith("-")]
+        visible = [window for window in windows if window.isVisible()]
+        if "--new-window" in argv or not urls or not visible:
+            window = add_window()
+        else:
+            window = visible[-1]
+        for url in urls:
+            window.new_tab(url)
+        if window.isMinimized():
+            window.showNormal()
+        window.raise_()
+        window.activateWindow()
+    
+    for arg in sys.argv[1:]:
+        if not arg.startswith("-"):
+            browser.new_tab(QUrl.fromUserInput(arg, os.getcwd()))
+    
+    if "--new-instance" not in sys.argv:
+        instance = single_instance.SingleInstanceServer("tema1", app)
+        instance.received.connect(open_command_line)
+        instance.listen()
     sys.exit(app.exec_())
\ No newline at end of file
@@ -1,130 +1,135 @@
 import sys
 import os
-from PyQt5.QtCore import Qt, QUrl, QSize, QUrlQuery
+import argparse
+
+if __name__ == "__main__":
+    # Antes dos imports pesados (QtWebEngine): uma segunda execução só entrega as URLs e sai
+    import single_instance
+    single_instance.forward_or_continue("tema2")
+
+from PyQt5.QtCore import Qt, QUrl, QSize, QUrlQuery, QTimer
 from PyQt5.QtGui import QKeySequence
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QToolBar, QLineEdit, 
                             QStatusBar, QAction, QVBoxLayout, QWidget, QHBoxLayout,
-                            QTabWidget, QMenu, QLabel, QSizePolicy, QToolButton,
-                            QProgressBar, QShortcut, QStyle)
+                            QMenu, QLabel, QSizePolicy, QToolButton,
+                            QProgressBar, QShortcut, QStyle, QMessageBox, QDockWidget)
 from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEngineProfile, QWebEnginePage
 from PyQt5.QtGui import QIcon, QPixmap, QFont, QColor, QPalette
-from PyQt5.QtWebEngineWidgets import QWebEngineSettings
+from PyQt5.QtWebEngineWidgets import QWebEngineSettings, QWebEngineScript
+from tab_discarder import TabDiscarder, TabPlaceholder, restore_history
+from tab_lifecycle import TabFreezer
+from tab_registry import TabWidget, TabSearchPanel
+from text_index import TextIndex, TextSearchDialog, EXTRACT_DELAY
+from session_store import SessionStore
+from browser_profile import shared_profile
+from tab_pool import SpareTabPool
+from kiti_scheme import NEW_TAB_URL, PERF_URL, error_url, register_scheme
+from task_manager import TaskManager
+from favicon_store import FaviconStore
+from download_manager import DownloadManager
+from speculation import SpeculationEngine
+from single_instance import SingleInstanceServer, split_qt_args
+from perf_store import PerfStore, TIMING_SCRIPT, COLLECT_DELAY
+import cache_manager
+from cache_manager import CacheStats
+from history_store import HistoryStore, UrlCompleter
+from request_filter import TabRequestFilter, shared_engine
+from console_log import ConsoleLogSink
+from tab_state import TabState, FRAME_INTERVAL
+from theme import apply_theme
+import startup_trace
+import rendering
+import process_model
+import batch_mode
 
 class BrowserTab(QWebEngineView):
-    def __init__(self, parent=None):
+    def __init__(self, profile=None, parent=None):
         super().__init__(parent)
-        self.profile = QWebEngineProfile.defaultProfile()
-        self.profile.setHttpCacheType(QWebEngineProfile.DiskHttpCache)
-        self.profile.setPersistentCookiesPolicy(QWebEngineProfile.ForcePersistentCookies)
+        self.profile = profile or shared_profile()
         
         self._web_page = WebPage(self.profile, self)
         self.setPage(self._web_page)
+        self.state = TabState(self)
         
-        settings = self.settings()
-        settings.setAttribute(QWebEngineSettings.JavascriptEnabled, True)
-        settings.setAttribute(QWebEngineSettings.JavascriptCanOpenWindows, True)
-        settings.setAttribute(QWebEngineSettings.PluginsEnabled, True)
-        settings.setAttribute(QWebEngineSettings.FullScreenSupportEnabled, True)
-        settings.setAttribute(QWebEngineSettings.WebGLEnabled, True)
-        settings.setAttribute(QWebEngineSettings.LocalStorageEnabled, True)
-        settings.setAttribute(QWebEngineSettings.LocalContentCanAccessRemoteUrls, True)
-        settings.setAttribute(QWebEngineSettings.ErrorPageEnabled, True)
-        settings.setDefaultTextEncoding("utf-8")
-        settings.setAttribute(QWebEngineSettings.AutoLoadIconsForPage, True)
-        settings.setAttribute(QWebEngineSettings.ScrollAnimatorEnabled, True)
-        settings.setAttribute(QWebEngineSettings.Accelerated2dCanvasEnabled, True)
-        settings.setAttribute(QWebEngineSettings.SpatialNavigationEnabled, True)
-        
-        cache_path = os.path.join(os.path.expanduser("~"), ".cache", "clowbrowser")
-        os.makedirs(cache_path, exist_ok=True)
-        self.profile.setCachePath(cache_path)
-        self.profile.setPersistentStoragePath(os.path.join(cache_path, "storage"))
-        
-        user_agent = self.page().profile().httpUserAgent()
-        self.page().profile().setHttpUserAgent(user_agent)
-        
-        settings.setAttribute(QWebEngineSettings.LocalContentCanAccessFileUrls, True)
-        settings.setAttribute(QWebEngineSettings.AllowRunningInsecureContent, True)
-        settings.setAttribute(QWebEngineSettings.AllowWindowActivationFromJavaScript, True)
-        settings.setAttribute(QWebEngineSettings.JavascriptCanAccessClipboard, True)
-        settings.setAttribute(QWebEngineSettings.LocalStorageEnabled, True)
-        settings.setAttribute(QWebEngineSettings.PluginsEnabled, True)
-        settings.setAttribute(QWebEngineSettings.FullScreenSupportEnabled, True)
-        settings.setAttribute(QWebEngineSettings.PlaybackRequiresUserGesture, False)
-        settings.setAttribute(QWebEngineSettings.WebRTCPublicInterfacesOnly, False)
-        
-        settings.setAttribute(QWebEngineSettings.WebGLEnabled, True)
-        settings.setAttribute(QWebEngineSettings.Accelerated2dCanvasEnabled, True)
-        settings.setAttribute(QWebEngineSettings.AllowGeolocationOnInsecureOrigins, True)
-        settings.setAttribute(QWebEngineSettings.ScreenCaptureEnabled, True)
-        
-        self.page().profile().setPersistentCookiesPolicy(QWebEngineProfile.AllowPersistentCookies)
-        self.page().profile().setHttpCacheType(QWebEngineProfile.DiskHttpCache)
-        self.page().profile().setHttpCacheMaximumSize(1024 * 1024 * 500)
-        
-        desktop_user_agent = user_agent.replace('Mobile', '').replace('mobile', '')
-        self.page().profile().setHttpUserAgent(desktop_user_agent)
-        
-        settings.setAttribute(QWebEngineSettings.WebRTCPublicInterfacesOnly, False)
-        
-        self.page().profile().setHttpUserAgent(
-            f"{desktop_user_agent} ClowBrowser/1.5"
-        )
+        # Espera o LCP e o fim do evento load antes de ler as métricas da página
+        self._timing_timer = QTimer(self)
+        self._timing_timer.setSingleShot(True)
+        self._timing_timer.setInterval(COLLECT_DELAY)
+        self._timing_timer.timeout.connect(self._collect_timing)
         
-        self.page().profile().setPersistentStoragePath(
-            os.path.join(os.path.expanduser("~"), ".cache", "clowbrowser", "storage")
-        )
+        # O texto da página entra no índice de busca entre abas depois que o conteúdo assenta
+        self._text_timer = QTimer(self)
+        self._text_timer.setSingleShot(True)
+        self._text_timer.setInterval(EXTRACT_DELAY)
+        self._text_timer.timeout.connect(lambda: TextIndex.shared().extract(self))
         
         self.loadStarted.connect(self._on_load_started)
         self.loadFinished.connect(self._on_load_finished)
         
-        self.setStyleSheet("""
-            QWebEngineView {
-                background-color: white;
-                color: black;
-            }
-        """)
-        
     def _on_load_started(self):
         self.setZoomFactor(1.0)
+        self._timing_timer.stop()
+        self._text_timer.stop()
         
     def _on_load_finished(self, ok):
         if ok:
             self.page().runJavaScript("window.scrollTo(0, 0);")
             self.update()
+            self._timing_timer.start()
+            if self.url().scheme() != "kiti":
+                self._text_timer.start()
+    
+    def _collect_timing(self):
+        url = self.url()
+        self.page().runJavaScript(TIMING_SCRIPT, QWebEngineScript.ApplicationWorld,
+                                  lambda timing: self._on_timing(url, timing))
+    
+    def _on_timing(self, url, timing):
+        PerfStore.shared().record(url, timing)
+        CacheStats.shared().record(timing)
+        SpeculationEngine.shared().record_ttfb(self.page(), timing)
 
 class WebPage(QWebEnginePage):
     def __init__(self, profile, parent=None):
         super().__init__(profile, parent)
+        self.request_filter = TabRequestFilter(shared_engine(), self)
+        self.setUrlRequestInterceptor(self.request_filter)
+        self.console_log = ConsoleLogSink.shared()
+        self.destroyed.connect(lambda obj=None, key=id(self), log=self.console_log: log.forget(key))
+        self.speculation = SpeculationEngine.shared()
+        self.linkHovered.connect(lambda url: self.speculation.hovered(self, QUrl(url)))
+        self.destroyed.connect(lambda obj=None, key=id(self), engine=self.speculation: engine.forget(key))
         
     def certificateError(self, certificateError):
         return True
         
+    def acceptNavigationRequest(self, url, navigation_type, is_main_frame):
+        if is_main_frame:
+            self.speculation.navigating(self, url)
+        return super().acceptNavigationRequest(url, navigation_type, is_main_frame)
+        
     def javaScriptConsoleMessage(self, level, message, lineNumber, sourceID):
-        level_names = {
-            0: "INFO",
-            1: "WARNING",
-            2: "ERROR"
-        }
-        level_name = level_names.get(int(level), "UNKNOWN")
-        print(f"JS {level_name}: {message} ({sourceID}:{lineNumber})")
-        return super().javaScriptConsoleMessage(level, message, lineNumber, sourceID)
+        self.console_log.add(id(self), level, message, sourceID, lineNumber)
+        
+    def console_messages(self):
+        """Mensagens recentes do console JS desta aba"""
+        return self.console_log.entries(id(self))
         
     def createWindow(self, _type):
-        browser = self.parent().parent()
-        if browser and hasattr(browser, 'add_new_tab'):
-            return browser.add_new_tab()
+        browser = self.parent().window()
+        if browser and hasattr(browser, 'add_blank_tab'):
+            return browser.add_blank_tab().page()
         return None
 
 class ClowBrowser(QMainWindow):
-    def __init__(self):
+    def __init__(self, session=None, saved_window=None):
         super().__init__()
         self.setWindowTitle("Clow Browser")
         self.setMinimumSize(1280, 800)
         
         self.setup_shortcuts()
     
-        self.tabs = QTabWidget()
+        self.tabs = TabWidget()
         self.tabs.setTabsClosable(True)
         self.tabs.setMovable(True)
         self.tabs.setDocumentMode(True)
@@ -132,85 +137,64 @@ class ClowBrowser(QMainWindow):
         self.tabs.setUsesScrollButtons(True)
         self.tabs.tabCloseRequested.connect(self.close_tab)
         self.tabs.currentChanged.connect(self.tab_changed)
+        # Reordenar muda o índice de várias abas de uma vez
+        self.tabs.tabBar().tabMoved.connect(lambda old, new: self.session.mark_dirty(self))
         
-        self.tabs.setStyleSheet("""
-            QTabWidget::pane {
-                border: none;
-                background: #202124;
-            }
-            QTabBar::tab {
-                background: #2d2e30;
-                color: #e8eaed;
-                padding: 8px 15px 8px 15px;
-                margin: 0 1px;
-                border-top-left-radius: 4px;
-                border-top-right-radius: 4px;
-                border: 1px solid #3c4043;
-                border-bottom: none;
-                min-width: 100px;
-                max-width: 200px;
-            }
-            QTabBar::tab:selected {
-                background: #202124;
-                border-bottom: 2px solid #8ab4f8;
-                margin-bottom: -1px;
-            }
-            QTabBar::tab:!selected {
-                margin-top: 2px;
-                background: #2d2e30;
-            }
-            QTabBar::tab:hover {
-                background: #3c4043;
-            }
-            QTabBar::close-button {
-                subcontrol-position: right;
-                width: 16px;
-                height: 16px;
-                margin: 0px 2px;
-                border-radius: 8px;
-                background: transparent;
-            }
-            QTabBar::close-button:hover {
-                background: #5f6368;
-            }
-            QTabBar::close-button::pressed {
-                background: #9aa0a6;
-            }
-            
-            /* Estilo dos botões de rolagem de abas */
-            QTabBar::scroller {
-                width: 20px;
-            }
-            QTabBar QToolButton {
-                background: #2d2e30;
-                border: none;
-                padding: 0px;
-                margin: 0px;
-                color: #e8eaed;
-                font-size: 14px;
-                font-weight: bold;
-            }
-            QTabBar QToolButton::right-arrow {
-                image: none;
-                text: "›";
-            }
-            QTabBar QToolButton::left-arrow {
-                image: none;
-                text: "‹";
-            }
-            QTabBar QToolButton:hover {
-                background: #3c4043;
-            }
-            QTabBar QToolButton:pressed {
-                background: #5f6368;
-            }
-        """)
+        self._dirty_states = set()
+        # URL que está na barra de endereço, para só reescrevê-la quando a da aba mudar
+        self._shown_url = None
+        self._chrome_timer = QTimer(self)
+        self._chrome_timer.setSingleShot(True)
+        self._chrome_timer.setInterval(FRAME_INTERVAL)
+        self._chrome_timer.timeout.connect(self.flush_chrome_updates)
         
         self.setCentralWidget(self.tabs)
         self.init_ui()
-        self.apply_styles()
-        
-        self.add_new_tab()
+        self.setup_tab_search()
+        
+        self.profile = shared_profile()
+        self.discarder = TabDiscarder(self)
+        self.freezer = TabFreezer(self)
+        self.spare_tabs = SpareTabPool(lambda: BrowserTab(self.profile), parent=self)
+        self.favicons = FaviconStore.shared()
+        self.favicons.loaded.connect(self.refresh_tab_icons)
+        self.downloads = DownloadManager.shared()
+        self.downloads.started.connect(self.download_started)
+        self.downloads.progress.connect(self.download_progress)
+        self.downloads.finished.connect(self.download_finished)
+        self.session = session or SessionStore.shared()
+        self.session.register_window(self)
+        
+        with startup_trace.phase("primeira BrowserTab"):
+            if saved_window:
+                self.restore_saved_tabs(saved_window)
+            else:
+                self.add_new_tab()
+        
+    def restore_saved_tabs(self, saved_window):
+        """Recria as abas salvas como placeholders; só a aba ativa carrega agora"""
+        active_index = 0
+        self.tabs.blockSignals(True)
+        for record in saved_window["tabs"]:
+            placeholder = SessionStore.placeholder_from_record(record)
+            self.session.register_tab(placeholder)
+            title = placeholder.title() or "Nova aba"
+            i = self.tabs.addTab(placeholder, title[:25] + ("..." if len(title) > 25 else ""))
+            self.tabs.setTabToolTip(i, placeholder.title())
+            self.tabs.setTabIcon(i, self.cached_tab_icon(placeholder.url()))
+            if record["tab"] == saved_window["active"]:
+                active_index = i
+        self.tabs.setCurrentIndex(active_index)
+        self.tabs.blockSignals(False)
+        
+        self.tab_changed(active_index)
+        self.session.mark_dirty(self)
+        self.session.flush()
+        
+    def closeEvent(self, event):
+        self.session.unregister_window(self)
+        self.spare_tabs.clear()
+        super().closeEvent(event)
         
     def setup_shortcuts(self):
         new_tab_shortcut = QShortcut(QKeySequence("Ctrl+T"), self)
@@ -229,6 +213,12 @@ class ClowBrowser(QMainWindow):
         focus_url_shortcut = QShortcut(QKeySequence("F6"), self)
         focus_url_shortcut.activated.connect(self.focus_url_bar)
         
+        tab_search_shortcut = QShortcut(QKeySequence("Ctrl+Shift+A"), self)
+        tab_search_shortcut.activated.connect(self.show_tab_search)
+        
+        text_search_shortcut = QShortcut(QKeySequence("Ctrl+Shift+F"), self)
+        text_search_shortcut.activated.connect(lambda: TextSearchDialog.show_for())
+        
     def close_current_tab(self):
         current_index = self.tabs.currentIndex()
         if current_index >= 0:
@@ -248,34 +238,26 @@ class ClowBrowser(QMainWindow):
         self.setup_toolbar()
         self.setup_statusbar()
         
+    def setup_tab_search(self):
+        """Lista lateral pesquisável das abas; assume o lugar da barra quando há abas demais"""
+        self.tab_panel = TabSearchPanel(self.tabs)
+        self.tab_panel.tabActivated.connect(self.tabs.setCurrentIndex)
+        self.tab_dock = QDockWidget("Abas", self)
+        self.tab_dock.setObjectName("tabDock")
+        self.tab_dock.setWidget(self.tab_panel)
+        self.addDockWidget(Qt.LeftDockWidgetArea, self.tab_dock)
+        self.tab_dock.setVisible(not self.tabs.strip_visible())
+        self.tabs.stripVisibilityChanged.connect(lambda visible: self.tab_dock.setVisible(not visible))
+        
+    def show_tab_search(self):
+        self.tab_dock.show()
+        self.tab_panel.select_current(self.tabs.currentIndex())
+        self.tab_panel.focus_search()
+        
     def setup_toolbar(self):
         toolbar = QToolBar("Barra de Navegação")
         toolbar.setMovable(False)
         toolbar.setIconSize(QSize(20, 20))
-        toolbar.setStyleSheet("""
-            QToolBar {
-                background-color: #202124;
-                border: none;
-                border-bottom: 1px solid #3c4043;
-                padding: 5px 10px;
-                spacing: 5px;
-            }
-            QToolButton {
-                background: transparent;
-                border: none;
-                border-radius: 4px;
-                padding: 5px;
-            }
-            QToolButton:hover {
-                background: #3c4043;
-            }
-            QToolButton:pressed {
-                background: #5f6368;
-            }
-            QToolButton:disabled {
-                color: #5f6368;
-            }
-        """)
         self.addToolBar(toolbar)
         
         def create_tool_button(icon_name, tooltip, slot, shortcut=None):
@@ -321,79 +303,33 @@ class ClowBrowser(QMainWindow):
         toolbar.addWidget(self.home_btn)
         
         self.url_bar = QLineEdit()
+        self.url_bar.setObjectName("urlBar")
         self.url_bar.setPlaceholderText("Digite um endereço ou termo de busca...")
         self.url_bar.returnPressed.connect(self.navigate_to_url)
-        self.url_bar.setStyleSheet("""
-            QLineEdit {
-                padding: 8px 15px;
-                border: 1px solid #5f6368;
-                border-radius: 20px;
-                background: #2d2e30;
-                color: #e8eaed;
-                min-width: 400px;
-                margin: 5px 10px;
-                font-size: 13px;
-                selection-background-color: #5f6368;
-            }
-            QLineEdit:focus {
-                border: 2px solid #8ab4f8;
-                background: #3c4043;
-                padding: 7px 14px;
-            }
-        """)
         
         toolbar.addWidget(self.url_bar)
         
+        self.history = HistoryStore.shared()
+        self.url_completer = UrlCompleter(self.url_bar, self.history, self)
+        self.url_completer.popup().clicked.connect(lambda index: self.navigate_to_url())
+        self.url_bar.textEdited.connect(lambda text: self.speculate_typed(url_from_text(text.strip())))
+        self.url_completer.suggested.connect(lambda url: self.speculate_typed(QUrl(url)))
+        
         new_tab_btn = QToolButton()
+        new_tab_btn.setObjectName("newTabButton")
         new_tab_btn.setText("+")
         new_tab_btn.setToolTip("Nova aba (Ctrl+T)")
         new_tab_btn.setFixedSize(24, 24)
-        new_tab_btn.setStyleSheet("""
-            QToolButton {
-                background: transparent;
-                border: 1px solid #5f6368;
-                border-radius: 12px;
-                color: #e8eaed;
-                font-size: 16px;
-                font-weight: bold;
-            }
-            QToolButton:hover {
-                background: #3c4043;
-                border-color: #8ab4f8;
-            }
-            QToolButton:pressed {
-                background: #5f6368;
-            }
-        """)
         new_tab_btn.clicked.connect(self.add_new_tab)
         self.tabs.setCornerWidget(new_tab_btn, Qt.TopRightCorner)
         
         self.menu_btn = QToolButton()
+        self.menu_btn.setObjectName("menuButton")
         self.menu_btn.setPopupMode(QToolButton.InstantPopup)
         self.menu_btn.setIcon(self.style().standardIcon(QStyle.SP_TitleBarMenuButton))
         self.menu_btn.setToolTip("Menu")
-        self.menu_btn.setStyleSheet("""
-            QToolButton::menu-indicator { width: 0px; }
-        """)
         
         menu = QMenu(self)
-        menu.setStyleSheet("""
-            QMenu {
-                background-color: #2d2e30;
-                color: #e8eaed;
-                border: 1px solid #5f6368;
-                padding: 5px;
-            }
-            QMenu::item {
-                padding: 5px 30px 5px 30px;
-            }
-            QMenu::item:selected {
-                background-color: #3c4043;
-            }
-            QMenu::item:disabled {
-                color: #5f6368;
-            }
-        """)
         
         new_tab_action = menu.addAction("Nova aba")
         new_tab_action.setShortcut("Ctrl+T")
@@ -403,6 +339,29 @@ class ClowBrowser(QMainWindow):
         new_window_action.setShortcut("Ctrl+N")
         new_window_action.triggered.connect(self.new_window)
         
+        tab_search_action = menu.addAction("Buscar abas")
+        tab_search_action.setShortcut("Ctrl+Shift+A")
+        tab_search_action.triggered.connect(self.show_tab_search)
+        
+        text_search_action = menu.addAction("Buscar texto nas abas")
+        text_search_action.setShortcut("Ctrl+Shift+F")
+        text_search_action.triggered.connect(lambda: TextSearchDialog.show_for())
+        
+        menu.addSeparator()
+        
+        perf_action = menu.addAction("Desempenho por site")
+        perf_action.triggered.connect(lambda: self.add_new_tab(PERF_URL))
+        
+        task_manager_action = menu.addAction("Gerenciador de tarefas")
+        task_manager_action.setShortcut("Shift+Esc")
+        task_manager_action.triggered.connect(lambda: TaskManager.show_for(self.session))
+        
+        cache_action = menu.addAction("Cache HTTP")
+        cache_action.triggered.connect(self.show_cache_report)
+        
+        processes_action = menu.addAction("Processos das abas")
+        processes_action.triggered.connect(self.show_renderer_processes)
+        
         menu.addSeparator()
         
         exit_action = menu.addAction("Sair")
@@ -417,27 +376,72 @@ class ClowBrowser(QMainWindow):
     def update_navigation_buttons(self):
         """Atualiza o estado dos botões de navegação com base no histórico da aba atual"""
         browser = self.current_browser()
-        if browser:
-            self.back_btn.setEnabled(browser.history().canGoBack())
-            self.forward_btn.setEnabled(browser.history().canGoForward())
+        if browser and not isinstance(browser, TabPlaceholder):
+            self.back_btn.setEnabled(browser.state.can_go_back)
+            self.forward_btn.setEnabled(browser.state.can_go_forward)
             
-    def update_tab_title(self, browser, title):
-        """Atualiza o título da aba quando o título da página muda"""
-        index = self.tabs.indexOf(browser)
-        if index >= 0:
-            if not title or title == "about:blank":
-                self.tabs.setTabText(index, "Nova aba")
-                self.tabs.setTabIcon(index, self.style().standardIcon(QStyle.SP_FileIcon))
-            else:
-                display_title = title[:25] + ("..." if len(title) > 25 else "")
-                self.tabs.setTabText(index, display_title)
-                
-                icon = browser.icon()
-                if icon.isNull():
-                    icon = self.style().standardIcon(QStyle.SP_FileIcon)
+    def update_tab_title(self, index, state):
+        """Atualiza título, ícone e dica da aba a partir do estado dela"""
+        title = state.title
+        if not title or title == "about:blank":
+            self.tabs.setTabText(index, "Nova aba")
+            self.tabs.setTabIcon(index, self.style().standardIcon(QStyle.SP_FileIcon))
+        else:
+            display_title = title[:25] + ("..." if len(title) > 25 else "")
+            self.tabs.setTabText(index, display_title)
+            
+            icon = state.icon
+            if icon.isNull():
+                icon = self.cached_tab_icon(state.url)
+            self.tabs.setTabIcon(index, icon)
+            
+            self.tabs.setTabToolTip(index, title)
+    
+    def cached_tab_icon(self, url, fallback=QStyle.SP_FileIcon):
+        """Favicon guardado da URL, para a aba não esperar a rede; senão o ícone padrão"""
+        icon = self.favicons.icon_for(url)
+        return self.style().standardIcon(fallback) if icon.isNull() else icon
+    
+    def refresh_tab_icons(self):
+        """Aplica os favicons do disco às abas criadas antes de a carga terminar"""
+        for index in range(self.tabs.count()):
+            tab = self.tabs.widget(index)
+            state = getattr(tab, "state", None)
+            if state is not None and not state.icon.isNull():
+                continue
+            icon = self.favicons.icon_for(tab.url())
+            if not icon.isNull():
                 self.tabs.setTabIcon(index, icon)
-                
-                self.tabs.setTabToolTip(index, title)
+                self.tabs.registry.refresh(tab)
+    
+    def schedule_chrome_update(self, state):
+        """Agrupa as mudanças das abas e redesenha no máximo uma vez por quadro"""
+        self._dirty_states.add(state)
+        if not self._chrome_timer.isActive():
+            self._chrome_timer.start()
+    
+    def flush_chrome_updates(self):
+        dirty, self._dirty_states = self._dirty_states, set()
+        current = self.current_browser()
+        for state in dirty:
+            index = self.tabs.indexOf(state.browser)
+            if index < 0:
+                continue
+            self.update_tab_title(index, state)
+            self.tabs.registry.refresh(state.browser)
+            if state.browser is current:
+                self.render_current_tab(state)
+    
+    def render_current_tab(self, state, switched=False):
+        """Redesenha barra de endereço, progresso e navegação a partir do estado da aba atual.
+
+        Progresso, título e ícone mudam várias vezes por segundo durante a carga; a barra de
+        endereço só é reescrita quando a URL muda de fato ou quando outra aba vira a atual.
+        """
+        if switched or state.url != self._shown_url:
+            self.update_url(state.url, force=switched)
+        self.update_progress(state.progress)
+        self.update_navigation_buttons()
     
     def setup_statusbar(self):
         self.status = QStatusBar()
@@ -457,77 +461,93 @@ class ClowBrowser(QMainWindow):
         return self.tabs.currentWidget()
     
     def add_new_tab(self, url=None):
-        browser = BrowserTab()
+        browser = self.add_blank_tab()
         
-        browser.urlChanged.connect(self.update_url)
-        browser.loadProgress.connect(self.update_progress)
-        browser.loadFinished.connect(self.page_loaded)
-        browser.titleChanged.connect(lambda title, browser=browser: self.update_tab_title(browser, title))
+        if url and isinstance(url, QUrl) and url.isValid():
+            browser.setUrl(url)
+            self.tabs.setTabIcon(self.tabs.indexOf(browser),
+                                 self.cached_tab_icon(url, QStyle.SP_BrowserReload))
+        elif browser.url() != NEW_TAB_URL:
+            browser.setUrl(NEW_TAB_URL)
+            
+        return browser
         
-        browser.loadFinished.connect(lambda ok, browser=browser: self.handle_load_finished(ok, browser))
+    def add_blank_tab(self):
+        """Adiciona e ativa uma aba do pool sem navegar; usada também por createWindow"""
+        browser = self.create_browser()
+        self.session.register_tab(browser)
         
         i = self.tabs.addTab(browser, "Nova aba")
         self.tabs.setTabIcon(i, self.style().standardIcon(QStyle.SP_BrowserReload))
         self.tabs.setCurrentIndex(i)
+        return browser
         
-        if url and isinstance(url, QUrl) and url.isValid():
-            browser.setUrl(url)
+    def create_browser(self):
+        """Pega uma BrowserTab pré-aquecida do pool e a conecta aos sinais da janela"""
+        browser = self.spare_tabs.take()
+        
+        browser.state.changed.connect(self.schedule_chrome_update)
+        browser.loadFinished.connect(lambda ok, browser=browser: self.page_loaded(browser, ok))
+        
+        browser.loadFinished.connect(lambda ok, browser=browser: self.handle_load_finished(ok, browser))
+        browser.renderProcessTerminated.connect(
+            lambda status, exit_code, browser=browser: self.handle_render_process_terminated(browser, status, exit_code))
+        
+        browser.loadFinished.connect(lambda ok, browser=browser: self.session.mark_dirty(self, browser))
+        browser.urlChanged.connect(self.record_history_visit)
+        browser.iconChanged.connect(lambda icon, browser=browser: self.favicons.remember(browser.url(), icon))
+        browser.titleChanged.connect(
+            lambda title, browser=browser: self.record_history_title(browser, title))
+        browser.titleChanged.connect(lambda title, browser=browser: self.session.mark_dirty(self, browser))
+        
+        return browser
+        
+    def replace_tab_widget(self, index, widget):
+        """Substitui o conteúdo de uma aba mantendo posição, texto, ícone e aba atual"""
+        current = self.tabs.currentWidget()
+        text = self.tabs.tabText(index)
+        icon = self.tabs.tabIcon(index)
+        tooltip = self.tabs.tabToolTip(index)
+        old = self.tabs.widget(index)
+        widget.session_id = getattr(old, "session_id", None)
+        widget.tab_id = getattr(old, "tab_id", None)
+        self._dirty_states.discard(getattr(old, "state", None))
+        
+        self.tabs.blockSignals(True)
+        self.tabs.removeTab(index)
+        self.tabs.insertTab(index, widget, icon, text)
+        self.tabs.setTabToolTip(index, tooltip)
+        self.tabs.setCurrentWidget(widget if current is old else current)
+        self.tabs.blockSignals(False)
+        
+    def restore_tab(self, index):
+        """Recria a página de uma aba descartada, com voltar/avançar preservados"""
+        placeholder = self.tabs.widget(index)
+        browser = self.create_browser()
+        if placeholder.history_data:
+            restore_history(browser.history(), placeholder.history_data)
         else:
-            browser.setUrl(QUrl("https://www.google.com"))
-            
+            browser.setUrl(placeholder.url())
+        
+        if any(placeholder.scroll):
+            x, y = placeholder.scroll
+            def restore_scroll(ok):
+                browser.loadFinished.disconnect(restore_scroll)
+                if ok:
+                    browser.page().runJavaScript(f"window.scrollTo({x}, {y});")
+            browser.loadFinished.connect(restore_scroll)
+        
+        self.replace_tab_widget(index, browser)
+        placeholder.deleteLater()
         return browser
         
     def handle_load_finished(self, ok, browser):
-        if not ok:
-            error_html = """
-            <html>
-            <head>
-                <style>
-                    body {
-                        font-family: 'Segoe UI', Arial, sans-serif;
-                        background-color: #202124;
-                        color: #e8eaed;
-                        display: flex;
-                        justify-content: center;
-                        align-items: center;
-                        height: 100vh;
-                        margin: 0;
-                        text-align: center;
-                    }
-                    .error-container {
-                        max-width: 500px;
-                        padding: 20px;
-                    }
-                    h1 {
-                        color: #f28b82;
-                        font-size: 24px;
-                        margin-bottom: 16px;
-                    }
-                    p {
-                        margin: 10px 0;
-                        color: #9aa0a6;
-                    }
-                    a {
-                        color: #8ab4f8;
-                        text-decoration: none;
-                    }
-                    a:hover {
-                        text-decoration: underline;
-                    }
-                </style>
-            </head>
-            <body>
-                <div class="error-container">
-                    <h1>Não foi possível carregar a página</h1>
-                    <p>Verifique sua conexão com a internet e tente novamente.</p>
-                    <p><a href="#" onclick="window.history.back(); return false;">Voltar</a> | 
-                       <a href="#" onclick="window.location.reload(); return false;">Recarregar</a> | 
-                       <a href="https://www.google.com">Ir para a página inicial</a></p>
-                </div>
-            </body>
-            </html>
-            """
-            browser.setHtml(error_html, QUrl("about:error"))
+        if not ok and browser.url().scheme() != "kiti":
+            browser.setUrl(error_url("network", browser.url()))
+            
+    def handle_render_process_terminated(self, browser, status, exit_code):
+        if status != QWebEnginePage.NormalTerminationStatus:
+            browser.setUrl(error_url("crash", browser.url()))
     
     def close_tab(self, index):
         if self.tabs.count() < 2:
@@ -535,6 +555,11 @@ class ClowBrowser(QMainWindow):
             
         widget = self.tabs.widget(index)
         if widget:
+            self.discarder.forget(widget)
+            self.freezer.forget(widget)
+            TextIndex.shared().forget(widget.tab_id)
+            self.session.tab_closed(widget)
+            self._dirty_states.discard(getattr(widget, "state", None))
             widget.deleteLater()
             self.tabs.removeTab(index)
     
@@ -543,16 +568,24 @@ class ClowBrowser(QMainWindow):
     def tab_changed(self, index):
         if index >= 0:
             browser = self.tabs.widget(index)
+            if isinstance(browser, TabPlaceholder):
+                browser = self.restore_tab(index)
             if browser:
-                self.update_url(browser.url())
-                self.update_navigation_buttons()
-                title = browser.page().title()
-                if title:
-                    self.tabs.setTabText(index, title[:15] + ("..." if len(title) > 15 else ""))
-    
-    def update_url(self, url):
-        """Atualiza a barra de endereço com a URL atual"""
+                self.freezer.touch(browser)
+                self.discarder.touch(browser)
+                self.session.mark_active(self)
+                self.update_tab_title(index, browser.state)
+                self.render_current_tab(browser.state, switched=True)
+    
+    def update_url(self, url, force=False):
+        """Atualiza a barra de endereço com a URL atual, sem atropelar o que o usuário está digitando"""
+        if not force and (self.url_bar.hasFocus() or self.url_bar.isModified()):
+            return
         if isinstance(url, QUrl):
+            self._shown_url = QUrl(url)
+            if url == NEW_TAB_URL:
+                self.url_bar.clear()
+                return
             display_url = url.toString()
             if display_url.startswith('https://'):
                 display_url = display_url[8:]
@@ -565,6 +598,16 @@ class ClowBrowser(QMainWindow):
             self.url_bar.setText(display_url)
             self.url_bar.setCursorPosition(0)
     
+    def record_history_visit(self, url):
+        """Registra no histórico as visitas a páginas web"""
+        if url.scheme() in ("http", "https"):
+            self.history.record_visit(url.toString())
+    
+    def record_history_title(self, browser, title):
+        url = browser.url()
+        if title and url.scheme() in ("http", "https"):
+            self.history.record_title(url.toString(), title)
+    
     def update_progress(self, progress):
         if progress < 100:
             self.progress_bar.setValue(progress)
@@ -572,7 +615,9 @@ class ClowBrowser(QMainWindow):
         else:
             self.progress_bar.setVisible(False)
     
-    def page_loaded(self, ok):
+    def page_loaded(self, browser, ok):
+        if browser is not self.current_browser():
+            return
         if ok:
             self.status.showMessage("Página carregada", 2000)
         else:
@@ -584,7 +629,7 @@ class ClowBrowser(QMainWindow):
         """Navega para a página inicial"""
         browser = self.current_browser()
         if browser:
-            browser.setUrl(QUrl("https://www.google.com"))
+            browser.setUrl(NEW_TAB_URL)
             
     def navigate_back(self):
         """Navega para a página anterior no histórico"""
@@ -606,9 +651,41 @@ class ClowBrowser(QMainWindow):
             
     def new_window(self):
         """Abre uma nova janela do navegador"""
-        new_browser = ClowBrowser()
+        new_browser = ClowBrowser(self.session)
         new_browser.show()
             
+    def show_renderer_processes(self):
+        """Mostra a qual processo renderizador cada aba de cada janela está ligada"""
+        QMessageBox.information(self, "Processos das abas",
+                                process_model.renderer_report(self.session.windows()))
+            
+    def download_started(self, download_id, path):
+        self.status.showMessage(f"Baixando {os.path.basename(path)}...", 3000)
+    
+    def download_progress(self, download_id, received, size):
+        if size:
+            self.status.showMessage(f"Download {download_id}: {100 * received // size}% "
+                                    f"de {size / (1024 * 1024):.1f} MB", 1000)
+    
+    def download_finished(self, download_id, path, ok, message):
+        name = os.path.basename(path)
+        if ok:
+            self.status.showMessage(f"{name} baixado (SHA-256 {message[:12]}...)", 5000)
+        else:
+            self.status.showMessage(f"Download de {name} falhou: {message}", 5000)
+    
+    def show_cache_report(self):
+        """Tamanho, cota e acertos do cache HTTP, com opção de esvaziá-lo"""
+        box = QMessageBox(QMessageBox.Information, "Cache HTTP",
+                          cache_manager.cache_report(stats=CacheStats.shared()), parent=self)
+        clear_button = box.addButton("Limpar cache", QMessageBox.DestructiveRole)
+        box.addButton(QMessageBox.Close)
+        box.exec_()
+        if box.clickedButton() is clear_button:
+            # Com o navegador aberto só o próprio Chromium pode mexer nos arquivos do cache
+            self.profile.clearHttpCache()
+            self.status.showMessage("Cache HTTP limpo", 3000)
+            
     def navigate_to_url(self):
         url_text = self.url_bar.text().strip()
         
@@ -619,194 +696,223 @@ class ClowBrowser(QMainWindow):
         self.progress_bar.setValue(0)
         self.progress_bar.setVisible(True)
 
-        if ' ' in url_text or '.' not in url_text:
-            url = QUrl("https://www.google.com/search")
-            query = QUrlQuery()
-            query.addQueryItem("q", url_text)
-            url.setQuery(query)
-        else:
-            if not url_text.startswith(('http://', 'https://')):
-                url_text = 'https://' + url_text
-            url = QUrl(url_text)
-            
-            if not url.isValid():
-                self.status.showMessage("URL inválida", 3000)
-                return
+        url = url_from_text(url_text)
+        if url is None:
+            self.status.showMessage("URL inválida", 3000)
+            return
         
+        # O texto digitado foi usado: a barra volta a seguir a URL da aba
+        self.url_bar.setModified(False)
         self.current_browser().setUrl(url)
+        self.current_browser().setFocus()
     
-    def apply_styles(self):
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #202124;
-                color: #e8eaed;
-            }
-            QToolBar {
-                background-color: #2d2e30;
-                border: none;
-                border-bottom: 1px solid #3c4043;
-                padding: 6px 8px;
-                spacing: 6px;
-            }
-            QToolButton {
-                background: transparent;
-                border: none;
-                border-radius: 4px;
-                padding: 6px 10px;
-                color: #e8eaed;
-            }
-            QToolButton:hover {
-                background-color: #3c4043;
-            }
-            QToolButton:pressed {
-                background-color: #5f6368;
-            }
-            QLineEdit {
-                background: #3c4043;
-                border: 1px solid #5f6368;
-                border-radius: 20px;
-                padding: 8px 20px;
-                font-size: 14px;
-                color: #e8eaed;
-                margin: 0 8px;
-                min-width: 400px;
-            }
-            QLineEdit:focus {
-                background: #3c4043;
-                border: 2px solid #8ab4f8;
-                padding: 7px 19px;
-            }
-            QTabBar::tab {
-                background: #3c4043;
-                border: 1px solid #5f6368;
-                border-bottom: none;
-                border-top-left-radius: 6px;
-                border-top-right-radius: 6px;
-                padding: 8px 20px;
-                margin-right: 2px;
-                color: #e8eaed;
-                min-width: 120px;
-            }
-            QTabBar::tab:selected {
-                background: #202124;
-                border-bottom: 2px solid #8ab4f8;
-                color: #8ab4f8;
-            }
-            QTabBar::tab:!selected:hover {
-                background: #5f6368;
-            }
-            QTabBar::tab:first-child {
-                margin-left: 5px;
-            }
-            QTabBar::close-button {
-                image: url(close_icon.png);
-                subcontrol-position: right;
-                subcontrol-origin: padding;
-                padding: 2px 4px;
-            }
-            QStatusBar {
-                background-color: #202124;
-                color: #9aa0a6;
-                border-top: 1px solid #3c4043;
-                font-size: 11px;
-            }
-            QProgressBar {
-                border: 1px solid #5f6368;
-                border-radius: 4px;
-                text-align: center;
-                background: #3c4043;
-                min-width: 100px;
-                max-width: 200px;
-                height: 6px;
-            }
-            QProgressBar::chunk {
-                background-color: #8ab4f8;
-                border-radius: 2px;
-            }
-            QMenu {
-                background-color: #2d2e30;
-                color: #e8eaed;
-                border: 1px solid #3c4043;
-                padding: 4px 0;
-            }
-            QMenu::item:selected {
-                background-color: #3c4043;
-            }
-            QMenu::item:disabled {
-                color: #5f6368;
-            }
-        """)
+    def speculate_typed(self, url):
+        if url is not None:
+            SpeculationEngine.shared().typed(self.profile, url)
 
-def main():
-    QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
-    QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
+def url_from_text(url_text):
+    """URL do texto da barra de endereço: busca se não parecer endereço; None se inválida"""
+    if not url_text:
+        return None
+    if ' ' in url_text or '.' not in url_text:
+        url = QUrl("https://www.google.com/search")
+        query = QUrlQuery()
+        query.addQueryItem("q", url_text)
+        url.setQuery(query)
+        return url
+    if not url_text.startswith(('http://', 'https://')):
+        url_text = 'https://' + url_text
+    url = QUrl(url_text)
+    return url if url.isValid() else None
+
+def command_line_url(text, cwd):
+    """URL de um argumento da linha de comando; caminhos de arquivo são relativos ao cwd de quem chamou"""
+    if os.path.exists(os.path.join(cwd, text)):
+        return QUrl.fromLocalFile(os.path.abspath(os.path.join(cwd, text)))
+    return url_from_text(text)
+
+def open_command_line(session, argv, cwd):
+    """Abre o pedido de outra execução: as URLs viram abas na janela ativa, ou numa janela nova"""
+    args, _ = parse_args(["Tema2.py"] + argv)
+    urls = [url for url in (command_line_url(text, cwd) for text in args.urls) if url is not None]
+    windows = session.windows()
+    window = QApplication.activeWindow()
+    if window not in windows:
+        window = windows[-1] if windows else None
+    if args.new_window or window is None or not urls:
+        # Sem URLs a outra execução queria uma janela, como no Chrome
+        window = ClowBrowser(session)
+        window.show()
+        if urls:
+            window.current_browser().setUrl(urls.pop(0))
+    for url in urls:
+        window.add_new_tab(url)
+    if window.isMinimized():
+        window.showNormal()
+    window.raise_()
+    window.activateWindow()
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="Tema2.py", add_help=False)
+    parser.add_argument("urls", nargs="*", metavar="URL",
+                        help="endereços ou arquivos para abrir em abas novas")
+    parser.add_argument("--new-window", action="store_true",
+                        help="abre as URLs numa janela nova da instância em execução")
+    parser.add_argument("--new-instance", action="store_true",
+                        help="não entrega as URLs à instância em execução; abre um processo independente")
+    parser.add_argument("--trace-startup", nargs="?", const=startup_trace.DEFAULT_TRACE_PATH, metavar="ARQUIVO",
+                        help="mede as fases da inicialização e grava um trace no formato do Chrome")
+    parser.add_argument("--exit-after-startup", action="store_true",
+                        help="encerra depois da primeira pintura (para benchmarks de inicialização)")
+    parser.add_argument("--rendering", choices=sorted(rendering.PROFILES), default=rendering.default_profile(),
+                        help="perfil de renderização (padrão: software sem GPU, auto com GPU)")
+    parser.add_argument("--rendering-report", action="store_true",
+                        help="mostra o perfil, as flags e o que o motor realmente usa, e sai")
+    parser.add_argument("--process-model", choices=sorted(process_model.MODELS),
+                        default=process_model.default_model(),
+                        help="como as abas são distribuídas entre processos renderizadores")
+    parser.add_argument("--renderer-limit", type=int, default=process_model.default_limit(), metavar="N",
+                        help="número máximo de processos renderizadores (0: sem limite)")
+    parser.add_argument("--batch", metavar="ARQUIVO",
+                        help="modo sem interface: carrega as URLs do arquivo (ou - para stdin) e sai")
+    parser.add_argument("--concurrency", type=int, default=batch_mode.DEFAULT_CONCURRENCY,
+                        help="páginas carregando ao mesmo tempo no modo --batch")
+    parser.add_argument("--timeout", type=float, default=batch_mode.DEFAULT_TIMEOUT,
+                        help="segundos por URL no modo --batch")
+    parser.add_argument("--formats", type=batch_mode.parse_formats, default=batch_mode.DEFAULT_FORMATS,
+                        help="saídas por URL no modo --batch: html, png e/ou pdf, separados por vírgula")
+    parser.add_argument("--output", default="batch-output",
+                        help="diretório das saídas do modo --batch")
+    parser.add_argument("--cache-report", action="store_true",
+                        help="mostra tamanho, cota, acertos/faltas e origens do cache HTTP, e sai")
+    parser.add_argument("--cache-evict-origin", action="append", default=[], metavar="ORIGEM",
+                        help="apaga do cache as entradas da origem (ex.: https://exemplo.com) e sai")
+    parser.add_argument("--cache-evict-older-than", type=float, metavar="DIAS",
+                        help="apaga do cache as entradas não gravadas há mais de DIAS dias e sai")
+    parser.add_argument("--cache-warm", metavar="ARQUIVO",
+                        help="carrega as URLs do arquivo (ou - para stdin) sem interface para aquecer o cache")
+    # As opções do Qt saem antes: com nargs="*" o valor de "-platform offscreen" viraria uma URL
+    qt_args, rest = split_qt_args(argv[1:])
+    args, unknown = parser.parse_known_args(rest)
+    return args, argv[:1] + qt_args + unknown
+
+def print_rendering_report(app, profile_name, flags):
+    """Carrega chrome://gpu numa página oculta e mostra o backend que o motor escolheu"""
+    page = QWebEnginePage(shared_profile())
     
-    QApplication.setAttribute(Qt.AA_UseOpenGLES)
+    def report(status):
+        print(f"Perfil: {profile_name}")
+        print(f"Flags: {' '.join(flags)}")
+        for feature, state in status.items():
+            print(f"{feature}: {state}")
+        app.quit()
     
-    os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] = "--enable-gpu-rasterization --enable-accelerated-video-decode --enable-accelerated-video-encode --enable-webrtc-hw-decoding --enable-webrtc-hw-encoding --enable-features=WebRTCHWDecoding,WebRTCHWEncoding,WebRTCH265WithOpenH264FFmpeg,WebRtcHideLocalIpsWithMdns,WebRtcUseEchoCanceller3"
+    rendering.detect_backend(page, report)
+    app.exec_()
+
+def run_cache_command(args):
+    if args.cache_evict_origin or args.cache_evict_older_than is not None:
+        older_than = None
+        if args.cache_evict_older_than is not None:
+            older_than = args.cache_evict_older_than * 86400
+        removed, freed = cache_manager.evict(origins=args.cache_evict_origin, older_than=older_than)
+        print(f"{removed} entradas removidas, {cache_manager.format_size(freed)} liberados")
+    if args.cache_report:
+        print(cache_manager.cache_report(stats=CacheStats.shared()))
+
+def main():
+    args, qt_args = parse_args(sys.argv)
+    if args.cache_report or args.cache_evict_origin or args.cache_evict_older_than is not None:
+        # Roda antes de qualquer perfil abrir o cache
+        run_cache_command(args)
+        return
+    if args.trace_startup:
+        startup_trace.start(args.trace_startup, args.exit_after_startup)
     
-    if sys.platform == "win32":
+    with startup_trace.phase("variáveis de ambiente e flags"):
+        QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
+        QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
+        
+        try:
+            flags = rendering.apply_profile(
+                args.rendering, process_model.model_flags(args.process_model, args.renderer_limit))
+        except rendering.RenderingConfigError as error:
+            print(error, file=sys.stderr)
+            sys.exit(2)
+        
+        cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "clowbrowser")
+        os.makedirs(cache_dir, exist_ok=True)
+        
         os.environ["QTWEBENGINE_DISABLE_SANDBOX"] = "1"
-        os.environ["QT_QUICK_BACKEND"] = "software"
-        os.environ["QMLSCENE_DEVICE"] = "softwarecontext"
+        os.environ["QTWEBENGINE_DISABLE_WEB_SECURITY"] = "1"
+        
+        if args.batch or args.cache_warm:
+            os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
     
-    if "QTWEBENGINE_CHROMIUM_FLAGS" not in os.environ:
-        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] = ""
+    with startup_trace.phase("QApplication"):
+        register_scheme()
+        
+        app = QApplication(qt_args)
+        app.setStyle("Fusion")
     
-
-
-    flags_to_add = [
-        "--enable-gpu-rasterization",
-        "--enable-accelerated-2d-canvas",
-        "--disable-gpu-compositing",
-        "--disable-software-rasterizer",
-        "--disable-gpu"
-    ]
-    
-    for flag in flags_to_add:
-        if flag not in os.environ["QTWEBENGINE_CHROMIUM_FLAGS"]:
-            os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] += f" {flag}"
-    
-    if sys.platform == "win32":
-        os.environ["QT_QUICK_BACKEND"] = "software"
-        os.environ["QMLSCENE_DEVICE"] = "softwarecontext"
-    
-    cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "clowbrowser")
-    os.makedirs(cache_dir, exist_ok=True)
-    
-    os.environ["QTWEBENGINE_DISABLE_SANDBOX"] = "1"
-    os.environ["QTWEBENGINE_DISABLE_WEB_SECURITY"] = "1"
-    
-    app = QApplication(sys.argv)
-    app.setStyle("Fusion")
-    
-    try:
-        app.setWindowIcon(QIcon("icon.png"))
-    except:
-        pass
-    
-    palette = app.palette()
-    palette.setColor(QPalette.Window, QColor("#202124"))
-    palette.setColor(QPalette.WindowText, QColor("#e8eaed"))
-    palette.setColor(QPalette.Base, QColor("#2d2e30"))
-    palette.setColor(QPalette.AlternateBase, QColor("#3c4043"))
-    palette.setColor(QPalette.ToolTipBase, QColor("#202124"))
-    palette.setColor(QPalette.ToolTipText, QColor("#e8eaed"))
-    palette.setColor(QPalette.Text, QColor("#e8eaed"))
-    palette.setColor(QPalette.Button, QColor("#3c4043"))
-    palette.setColor(QPalette.ButtonText, QColor("#e8eaed"))
-    palette.setColor(QPalette.BrightText, QColor("#8ab4f8"))
-    palette.setColor(QPalette.Highlight, QColor("#8ab4f8"))
-    palette.setColor(QPalette.HighlightedText, QColor("#202124"))
-    palette.setColor(QPalette.Link, QColor("#8ab4f8"))
-    palette.setColor(QPalette.LinkVisited, QColor("#c58af9"))
-    app.setPalette(palette)
-    
-    font = QFont("Segoe UI", 9)
-    app.setFont(font)
-    
-    browser = ClowBrowser()
-    browser.show()
+    with startup_trace.phase("paleta, tema e fonte"):
+        try:
+            app.setWindowIcon(QIcon("icon.png"))
+        except:
+            pass
+        
+        apply_theme(app)
+        
+        font = QFont("Segoe UI", 9)
+        app.setFont(font)
+    
+    with startup_trace.phase("perfil"):
+        shared_profile()
+    
+    if args.rendering_report:
+        print_rendering_report(app, args.rendering, flags)
+        return
+    
+    if args.batch:
+        urls = batch_mode.read_urls(args.batch)
+        renderer = batch_mode.run(app, urls, args.output, BrowserTab,
+                                  args.concurrency, args.timeout, args.formats)
+        sys.exit(1 if renderer.failures() else 0)
+    
+    if args.cache_warm:
+        urls = batch_mode.read_urls(args.cache_warm)
+        renderer = batch_mode.run(app, urls, None, BrowserTab, args.concurrency, args.timeout, ())
+        print(cache_manager.cache_report(), file=sys.stderr)
+        sys.exit(1 if renderer.failures() else 0)
+    
+    with startup_trace.phase("sessão"):
+        session = SessionStore.shared()
+        # Começa a ler os favicons do disco enquanto as janelas são montadas
+        FaviconStore.shared()
+        saved_windows = session.take_saved_windows()
+    
+    with startup_trace.phase("ClowBrowser.__init__"):
+        windows = [ClowBrowser(session, saved) for saved in saved_windows] or [ClowBrowser(session)]
+    
+    with startup_trace.phase("show"):
+        for browser in windows:
+            browser.show()
+    startup_trace.watch(windows[0].current_browser())
+    for url in (command_line_url(text, os.getcwd()) for text in args.urls):
+        if url is not None:
+            windows[-1].add_new_tab(url)
+    
+    if not args.new_instance:
+        instance = SingleInstanceServer("tema2", app)
+        instance.received.connect(lambda argv, cwd: open_command_line(session, argv, cwd))
+        if not instance.listen():
+            print("Modo de instância única indisponível: outra instância já atende ou o socket falhou",
+                  file=sys.stderr)
+    
+    downloads = DownloadManager.shared()
+    downloads.attach(shared_profile())
+    downloads.resume_pending()
+    app.aboutToQuit.connect(downloads.shutdown)
     
     sys.exit(app.exec_())
 
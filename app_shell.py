@@ -0,0 +1,191 @@
+import os
+import queue
+import itertools
+import threading
+from PyQt5.QtCore import QBuffer, QIODevice, QObject, QTimer, QUrl, pyqtSignal
+from PyQt5.QtWebEngineCore import QWebEngineUrlScheme, QWebEngineUrlSchemeHandler
+
+from shell_snapshot import ShellSnapshot, fetch, refresh
+
+SCHEME = b"lacaros"
+SHELL_HOST = "shell"
+DEFAULT_SHELL_URL = "https://kitibrowser.netlify.app/lacarosinside.html"
+SHELL_DIRECTORY = os.path.join(os.path.expanduser("~"), ".cache", "clowbrowser", "lacaros-shell")
+DEFAULT_REVALIDATE_INTERVAL = 15 * 60
+
+OFFLINE_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>LaçarOS Inside</title></head>
+<body style="font-family: 'Segoe UI', Arial, sans-serif; background: #202124; color: #9aa0a6;
+             display: flex; justify-content: center; align-items: center; height: 100vh; margin: 0;">
+    <p>LaçarOS Inside ainda não tem cópia local e está sem conexão. Tentando de novo...</p>
+    <script>setTimeout(function () { location.reload(); }, 5000);</script>
+</body>
+</html>
+""".encode("utf-8")
+
+
+def shell_url():
+    """Endereço de origem do app shell, de CLOWBROWSER_LACAROS_URL (útil para apontar a um servidor local)"""
+    return os.environ.get("CLOWBROWSER_LACAROS_URL", DEFAULT_SHELL_URL)
+
+
+def revalidate_interval():
+    """Segundos entre revalidações em segundo plano, de CLOWBROWSER_SHELL_REVALIDATE; 0 só revalida no boot"""
+    try:
+        return max(0.0, float(os.environ.get("CLOWBROWSER_SHELL_REVALIDATE", DEFAULT_REVALIDATE_INTERVAL)))
+    except ValueError:
+        return float(DEFAULT_REVALIDATE_INTERVAL)
+
+
+class AppShell(QObject):
+    """Espelho local do app shell: responde do snapshot na hora e revalida na rede em segundo plano"""
+
+    updated = pyqtSignal(int)
+    revalidated = pyqtSignal(bool)
+    _fetched = pyqtSignal(int, object)
+    _published = pyqtSignal(object)
+    _finished = pyqtSignal(bool)
+
+    def __init__(self, url=None, directory=SHELL_DIRECTORY, parent=None):
+        super().__init__(parent)
+        url = url or shell_url()
+        self.base, self.entry = url.rsplit("/", 1)[0] + "/", url.rsplit("/", 1)[1] or "index.html"
+        self.snapshot = ShellSnapshot(directory)
+        self.hits = 0
+        self.misses = 0
+        self._wanted = set()
+        self._pending = {}
+        self._request_ids = itertools.count()
+        self._revalidating = False
+        # Pedido de revalidação chegado durante outra: roda mais uma quando ela terminar
+        self._revalidate_again = False
+        self._fetched.connect(self._on_fetched)
+        self._published.connect(self._on_published)
+        self._finished.connect(self._on_finished)
+
+        self._tasks = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="app-shell", daemon=True)
+        self._worker.start()
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.revalidate)
+
+    def entry_url(self):
+        return QUrl(f"{SCHEME.decode()}://{SHELL_HOST}/{self.entry}")
+
+    def install(self, profile):
+        handler = AppShellSchemeHandler(self, profile)
+        profile.installUrlSchemeHandler(SCHEME, handler)
+        return handler
+
+    def start(self, interval=None):
+        """Revalida já e depois a cada interval segundos"""
+        interval = revalidate_interval() if interval is None else interval
+        self.revalidate()
+        if interval:
+            self._timer.start(int(interval * 1000))
+
+    def _run(self):
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+            task()
+
+    def serve(self, request, path):
+        """Responde do snapshot; o que ainda não está guardado vai à rede e entra na próxima versão"""
+        stored = self.snapshot.read(path)
+        if stored is not None:
+            self.hits += 1
+            reply(request, *stored)
+            return
+        self.misses += 1
+        self._wanted.add(path)
+        request_id = next(self._request_ids)
+        self._pending[request_id] = (request, path)
+        request.destroyed.connect(lambda obj=None, request_id=request_id: self._pending.pop(request_id, None))
+        url = self.base + path
+
+        def task():
+            try:
+                _, body, metadata = fetch(url)
+                self._fetched.emit(request_id, (metadata["content_type"], body))
+            except (OSError, ValueError):
+                self._fetched.emit(request_id, None)
+        self._tasks.put(task)
+
+    def _on_fetched(self, request_id, result):
+        request, path = self._pending.pop(request_id, (None, None))
+        if request is not None:
+            if result is not None:
+                reply(request, *result)
+            elif path == self.entry:
+                reply(request, "text/html", OFFLINE_PAGE)
+            else:
+                request.fail(request.UrlNotFound)
+        if result is not None:
+            # Guarda o que faltava; na primeira execução é isto que cria a versão 1
+            self.revalidate()
+
+    def revalidate(self):
+        """Confere cada arquivo na origem com GET condicional e publica uma versão nova se algo mudou"""
+        if self._revalidating:
+            self._revalidate_again = True
+            return
+        self._revalidating = True
+        manifest = self.snapshot.current
+        wanted = set(self._wanted)
+        self._tasks.put(lambda: self._revalidate(manifest, wanted))
+
+    def _revalidate(self, manifest, wanted):
+        try:
+            changes = refresh(self.snapshot, self.base, self.entry, manifest, wanted)
+        except (OSError, ValueError, TypeError):
+            # Rede fora do ar: o snapshot atual continua valendo
+            self._finished.emit(False)
+            return
+        if changes is not None:
+            self._published.emit(self.snapshot.publish(*changes))
+        self._finished.emit(True)
+
+    def _on_published(self, manifest):
+        self._wanted -= set(manifest["files"])
+        self.updated.emit(manifest["version"])
+
+    def _on_finished(self, ok):
+        self._revalidating = False
+        self.revalidated.emit(ok)
+        if self._revalidate_again:
+            self._revalidate_again = False
+            self.revalidate()
+
+    def close(self):
+        self._tasks.put(None)
+
+
+def reply(request, content_type, data):
+    buffer = QBuffer(parent=request)
+    buffer.setData(data)
+    buffer.open(QIODevice.ReadOnly)
+    request.reply(content_type.encode("ascii", "replace"), buffer)
+
+
+class AppShellSchemeHandler(QWebEngineUrlSchemeHandler):
+    def __init__(self, shell, parent=None):
+        super().__init__(parent)
+        self.shell = shell
+
+    def requestStarted(self, request):
+        url = request.requestUrl()
+        if url.host() != SHELL_HOST:
+            request.fail(request.UrlNotFound)
+            return
+        self.shell.serve(request, url.path().lstrip("/") or self.shell.entry)
+
+
+def register_scheme():
+    """Registra o esquema lacaros://; precisa rodar antes de criar a QApplication"""
+    scheme = QWebEngineUrlScheme(SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    scheme.setFlags(QWebEngineUrlScheme.SecureScheme | QWebEngineUrlScheme.CorsEnabled)
+    QWebEngineUrlScheme.registerScheme(scheme)
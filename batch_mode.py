@@ -0,0 +1,209 @@
+import os
+import sys
+import json
+import time
+from PyQt5.QtCore import QObject, QSize, QTimer, Qt, QUrl, pyqtSignal
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_FORMATS = ("html",)
+FORMATS = ("html", "png", "pdf")
+VIEWPORT = QSize(1280, 800)
+
+
+def read_urls(source):
+    """URLs de um arquivo ou da entrada padrão ("-"), uma por linha; ignora linhas vazias e comentários"""
+    if source == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(source, encoding="utf-8") as url_file:
+            lines = url_file.read().splitlines()
+    urls = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            urls.append(line)
+    return urls
+
+
+def parse_formats(text):
+    formats = tuple(name.strip() for name in text.split(",") if name.strip())
+    unknown = [name for name in formats if name not in FORMATS]
+    if unknown:
+        raise ValueError(f"Formatos desconhecidos: {', '.join(unknown)}")
+    return formats
+
+
+class BatchJob:
+    __slots__ = ("index", "url", "started", "loaded", "status", "outputs", "pending", "timer")
+
+    def __init__(self, index, url):
+        self.index = index
+        self.url = url
+        self.started = time.monotonic()
+        self.loaded = None
+        self.status = None
+        self.outputs = {}
+        self.pending = set()
+        self.timer = None
+
+
+class BatchRenderer(QObject):
+    """Carrega uma lista de URLs em várias abas fora da tela e grava HTML, PNG e/ou PDF de cada uma"""
+
+    finished = pyqtSignal()
+
+    def __init__(self, urls, output_dir, tab_factory, concurrency=DEFAULT_CONCURRENCY,
+                 timeout=DEFAULT_TIMEOUT, formats=DEFAULT_FORMATS, out=None, parent=None):
+        super().__init__(parent)
+        self.urls = list(urls)
+        self.output_dir = output_dir
+        self.tab_factory = tab_factory
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.formats = formats
+        self.out = out or sys.stdout
+        self.results = []
+        self._next_index = 0
+        self._active = {}
+        self._started = None
+        self.elapsed = 0.0
+
+    def start(self):
+        if self.formats:
+            os.makedirs(self.output_dir, exist_ok=True)
+        self._started = time.monotonic()
+        for _ in range(min(self.concurrency, len(self.urls))):
+            self._load_next(self._new_tab())
+        if not self._active:
+            self._finish()
+
+    def _new_tab(self):
+        tab = self.tab_factory()
+        # Pinta normalmente (necessário para o PNG), mas nunca aparece na tela
+        tab.setAttribute(Qt.WA_DontShowOnScreen)
+        tab.resize(VIEWPORT)
+        tab.show()
+        tab.loadFinished.connect(lambda ok, tab=tab: self._on_load_finished(tab, ok))
+        tab.page().pdfPrintingFinished.connect(
+            lambda path, ok, tab=tab: self._on_output_done(tab, "pdf", path if ok else None))
+        return tab
+
+    def _load_next(self, tab):
+        if self._next_index >= len(self.urls):
+            tab.deleteLater()
+            if not self._active:
+                self._finish()
+            return
+        job = BatchJob(self._next_index, self.urls[self._next_index])
+        self._next_index += 1
+        self._active[tab] = job
+        job.timer = QTimer(self)
+        job.timer.setSingleShot(True)
+        job.timer.timeout.connect(lambda tab=tab, job=job: self._on_timeout(tab, job))
+        job.timer.start(int(self.timeout * 1000))
+        tab.setUrl(QUrl.fromUserInput(job.url))
+
+    def _output_path(self, job, extension):
+        return os.path.join(self.output_dir, f"{job.index:05d}.{extension}")
+
+    def _on_load_finished(self, tab, ok):
+        job = self._active.get(tab)
+        if job is None or job.loaded is not None:
+            return
+        # O timeout continua valendo até as saídas serem gravadas
+        job.loaded = time.monotonic()
+        if not ok:
+            self._complete(tab, job, "error")
+            return
+
+        job.pending = set(self.formats)
+        if "html" in job.pending:
+            tab.page().toHtml(lambda html, tab=tab, job=job: self._save_html(tab, job, html))
+        if "png" in job.pending:
+            # Um ciclo do laço de eventos para o compositor entregar o quadro do loadFinished
+            QTimer.singleShot(0, lambda tab=tab, job=job: self._save_png(tab, job))
+        if "pdf" in job.pending:
+            tab.page().printToPdf(self._output_path(job, "pdf"))
+        if not job.pending:
+            self._complete(tab, job, "ok")
+
+    def _save_html(self, tab, job, html):
+        if self._active.get(tab) is not job:
+            return
+        path = self._output_path(job, "html")
+        with open(path, "w", encoding="utf-8") as html_file:
+            html_file.write(html or "")
+        self._on_output_done(tab, "html", path)
+
+    def _save_png(self, tab, job):
+        if self._active.get(tab) is not job:
+            return
+        path = self._output_path(job, "png")
+        self._on_output_done(tab, "png", path if tab.grab().save(path, "PNG") else None)
+
+    def _on_output_done(self, tab, kind, path):
+        job = self._active.get(tab)
+        if job is None or kind not in job.pending:
+            return
+        job.pending.discard(kind)
+        job.outputs[kind] = path
+        if not job.pending:
+            failed = any(path is None for path in job.outputs.values())
+            self._complete(tab, job, "output-error" if failed else "ok")
+
+    def _on_timeout(self, tab, job):
+        if self._active.get(tab) is not job:
+            return
+        # A aba pode ainda emitir loadFinished desta URL; troca por uma nova em vez de reaproveitar
+        tab.stop()
+        self._complete(tab, job, "timeout", replace_tab=True)
+
+    def _complete(self, tab, job, status, replace_tab=False):
+        job.status = status
+        job.timer.stop()
+        job.timer.deleteLater()
+        del self._active[tab]
+
+        now = time.monotonic()
+        result = {
+            "index": job.index,
+            "url": job.url,
+            "final_url": tab.url().toString(),
+            "title": tab.title(),
+            "status": status,
+            "load_ms": round((job.loaded - job.started) * 1000, 1) if job.loaded else None,
+            "total_ms": round((now - job.started) * 1000, 1),
+        }
+        result.update(job.outputs)
+        self.results.append(result)
+        self.out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self.out.flush()
+
+        if replace_tab:
+            tab.deleteLater()
+            tab = self._new_tab()
+        self._load_next(tab)
+
+    def _finish(self):
+        self.elapsed = time.monotonic() - self._started
+        self.finished.emit()
+
+    def pages_per_second(self):
+        return len(self.results) / self.elapsed if self.elapsed else 0.0
+
+    def failures(self):
+        return sum(1 for result in self.results if result["status"] != "ok")
+
+
+def run(app, urls, output_dir, tab_factory, concurrency=DEFAULT_CONCURRENCY,
+        timeout=DEFAULT_TIMEOUT, formats=DEFAULT_FORMATS):
+    """Roda o lote até o fim; o resumo vai para stderr e as linhas JSON para stdout"""
+    renderer = BatchRenderer(urls, output_dir, tab_factory, concurrency, timeout, formats)
+    renderer.finished.connect(app.quit)
+    QTimer.singleShot(0, renderer.start)
+    app.exec_()
+    print(f"{len(renderer.results)} páginas em {renderer.elapsed:.2f}s "
+          f"({renderer.pages_per_second():.2f} páginas/s, concorrência {renderer.concurrency}), "
+          f"{renderer.failures()} falha(s)", file=sys.stderr)
+    return renderer
@@ -0,0 +1,906 @@
+import os
+import sys
+import time
+import io
+import json
+import random
+import subprocess
+import argparse
+import threading
+import http.server
+import tempfile
+import statistics
+import functools
+
+os.environ.setdefault("QTWEBENGINE_DISABLE_SANDBOX", "1")
+
+from PyQt5.QtCore import QObject, QEvent, QEventLoop, QTimer, QUrl
+from PyQt5.QtWidgets import QApplication, QTabWidget, QWidget
+from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineProfile, QWebEngineView
+
+import Tema2
+from browser_profile import configure_profile, shared_profile
+from session_store import SessionStore
+import history_store
+import request_filter
+import theme
+import rendering
+import process_model
+import batch_mode
+import download_manager
+import task_manager
+import single_instance
+import app_shell
+import tab_registry
+import text_index
+from tab_discarder import renderer_rss
+from kiti_scheme import register_scheme
+
+BLANK = QUrl("about:blank")
+
+
+def make_window():
+    """Janela de teste com journal de sessão temporário, para não tocar na sessão real"""
+    session = SessionStore(os.path.join(tempfile.mkdtemp(), "session.jsonl"))
+    return Tema2.ClowBrowser(session)
+
+
+def wait_until(app, predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        app.processEvents(QEventLoop.AllEvents, 50)
+    return predicate()
+
+
+class PaintProbe(QObject):
+    """Filtro global que anota o primeiro evento de pintura dentro de um widget"""
+
+    def __init__(self, widget):
+        super().__init__()
+        self.widget = widget
+        self.painted_at = None
+
+    def eventFilter(self, obj, event):
+        if (self.painted_at is None and event.type() == QEvent.Paint
+                and isinstance(obj, QWidget) and self.widget.isAncestorOf(obj)):
+            self.painted_at = time.perf_counter()
+        return False
+
+
+def report(name, samples):
+    samples = sorted(samples)
+    p95 = samples[max(0, int(len(samples) * 0.95) - 1)]
+    print(f"{name}: n={len(samples)} p50={statistics.median(samples) * 1000:.2f}ms "
+          f"p95={p95 * 1000:.2f}ms total={sum(samples) * 1000:.1f}ms")
+
+
+def bench_new_tabs(app, args):
+    """Latência de add_new_tab com perfil compartilhado vs. reconfigurado a cada aba"""
+    window = make_window()
+
+    shared = []
+    for _ in range(args.count):
+        start = time.perf_counter()
+        window.add_new_tab(BLANK)
+        shared.append(time.perf_counter() - start)
+    app.processEvents()
+
+    legacy = []
+    for _ in range(args.count):
+        start = time.perf_counter()
+        configure_profile(shared_profile())
+        window.add_new_tab(BLANK)
+        legacy.append(time.perf_counter() - start)
+    app.processEvents()
+
+    report("add_new_tab (perfil compartilhado)", shared)
+    report("add_new_tab (perfil por aba)", legacy)
+    window.close()
+
+
+def bench_new_tab_paint(app, args):
+    """Tempo entre o pedido de nova aba e a primeira pintura, sem e com pool de abas reservas"""
+    for use_pool in (False, True):
+        window = make_window()
+        if not use_pool:
+            window.spare_tabs.size = 0
+            window.spare_tabs.clear()
+        pool_size = window.spare_tabs.size
+        window.show()
+
+        samples = []
+        for _ in range(args.count):
+            wait_until(app, lambda: len(window.spare_tabs._spares) >= pool_size)
+            start = time.perf_counter()
+            browser = window.add_new_tab(BLANK)
+            probe = PaintProbe(browser)
+            app.installEventFilter(probe)
+            wait_until(app, lambda: probe.painted_at is not None)
+            app.removeEventFilter(probe)
+            if probe.painted_at is not None:
+                samples.append(probe.painted_at - start)
+
+        report(f"nova aba até primeira pintura (pool={pool_size})", samples)
+        window.close()
+
+
+def bench_history(app, args):
+    """Latência das sugestões do omnibox com um histórico sintético grande"""
+    words = ("news mail docs intranet wiki jira github python video music "
+             "shop bank weather maps report sales admin portal").split()
+    rng = random.Random(0)
+    connection = history_store.connect(os.path.join(tempfile.mkdtemp(), "history.sqlite"))
+    now = time.time()
+    with connection:
+        for i in range(args.rows):
+            host, section, page = rng.sample(words, 3)
+            url = f"https://{host}.site{i % 2000}.com/{section}/{page}?id={i}"
+            history_store.add_visit(connection, url, now - rng.random() * 1e7)
+            history_store.set_title(connection, url, f"{page.title()} {section} {i}")
+
+    # Prefixos de uma e duas letras e os começos de URL que todo mundo digita são o pior caso
+    for text in ("g", "a", "4", "gi", "co", "com", "https://", "https://www.g", "www.gi", "github",
+                 "github py", "intranet wiki", "https://www.news.site1", "wiki page 4", "zz", "site1999"):
+        samples = []
+        for _ in range(args.count):
+            start = time.perf_counter()
+            history_store.suggest(connection, text)
+            samples.append(time.perf_counter() - start)
+        report(f"sugestões para {text!r} ({args.rows} linhas)", samples)
+
+
+def synthetic_filters(rng, count):
+    rules = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            rules.append(f"||ads{i}.tracker{i % 97}.net^")
+        elif kind == 1:
+            rules.append(f"/banner{i}/*$image")
+        elif kind == 2:
+            rules.append(f"&utm_campaign{i}=")
+        else:
+            rules.append(f"||cdn{i}.example.com/pixel{i}.gif$third-party")
+    return rules
+
+
+def bench_filters(app, args):
+    """Repete um log de requisições (url, site, tipo por linha, separados por tab) contra o motor de filtros"""
+    rng = random.Random(0)
+    if args.rules:
+        start = time.perf_counter()
+        engine = request_filter.compile_rules([args.rules])
+    else:
+        start = time.perf_counter()
+        engine = request_filter.FilterEngine()
+        for line in synthetic_filters(rng, 50000):
+            engine.add_line(line)
+    print(f"compilação: {engine.block.size + engine.allow.size} regras em "
+          f"{(time.perf_counter() - start) * 1000:.0f}ms")
+
+    if args.log:
+        with open(args.log, encoding="utf-8") as log:
+            requests = [line.rstrip("\n").split("\t") for line in log if line.strip()]
+    else:
+        requests = []
+        for i in range(100000):
+            n = rng.randrange(50000)
+            requests.append(rng.choice([
+                (f"https://ads{n}.tracker{n % 97}.net/x.js", "news.com", "script"),
+                (f"https://site{n}.com/static/app{n}.js?v={n}", f"site{n}.com", "script"),
+                (f"https://img.site{n}.com/banner{n}/a.png", f"site{n}.com", "image"),
+                (f"https://api.site{n}.com/q?id={n}&utm_source=x", f"site{n}.com", "xmlhttprequest"),
+            ]))
+
+    samples = []
+    blocked = 0
+    for request in requests:
+        start = time.perf_counter()
+        blocked += engine.should_block(*request)
+        samples.append(time.perf_counter() - start)
+    report(f"decisão por requisição ({blocked} bloqueadas de {len(requests)})", samples)
+
+
+class PageHandler(http.server.BaseHTTPRequestHandler):
+    """Serve páginas de teste com título, texto e algumas imagens"""
+
+    def do_GET(self):
+        if self.path.endswith(".svg"):
+            content_type = "image/svg+xml"
+            body = b'<svg xmlns="http://www.w3.org/2000/svg" width="10" height="10"/>'
+        else:
+            content_type = "text/html; charset=utf-8"
+            body = ("<html><head><title>Página %s</title></head><body>%s%s</body></html>" % (
+                self.path,
+                "<p>Lorem ipsum dolor sit amet.</p>" * 200,
+                "".join(f'<img src="/img{i}.svg">' for i in range(10))
+            )).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(handler=PageHandler):
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def bench_tab_load_ui(app, args):
+    """Tempo de thread da interface gasto com o cromo enquanto 30 abas carregam juntas"""
+    server, base = start_server()
+    window = make_window()
+    window.show()
+
+    flush_time = []
+    original_flush = window.flush_chrome_updates
+
+    def timed_flush():
+        start = time.perf_counter()
+        original_flush()
+        flush_time.append(time.perf_counter() - start)
+    window._chrome_timer.timeout.disconnect()
+    window._chrome_timer.timeout.connect(timed_flush)
+
+    state_changes = [0]
+    tabs = []
+    start = time.perf_counter()
+    for i in range(args.tabs):
+        browser = window.add_new_tab(QUrl(f"{base}/page{i}"))
+        browser.state.changed.connect(lambda state: state_changes.__setitem__(0, state_changes[0] + 1))
+        tabs.append(browser)
+
+    lags = []
+    last = [time.perf_counter()]
+
+    def tick():
+        now = time.perf_counter()
+        lags.append(now - last[0])
+        last[0] = now
+    probe = QTimer()
+    probe.timeout.connect(tick)
+    probe.start(1)
+
+    wait_until(app, lambda: all(not tab.state.loading and tab.state.progress == 100 for tab in tabs), 60)
+    probe.stop()
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.tabs} abas carregadas em {elapsed * 1000:.0f}ms; {state_changes[0]} mudanças de estado, "
+          f"{len(flush_time)} redesenhos do cromo em {sum(flush_time) * 1000:.1f}ms")
+    report("intervalo do laço de eventos (alvo 1ms)", lags)
+    window.close()
+    server.shutdown()
+
+
+LEGACY_TAB_STYLESHEET = """
+    QWebEngineView {
+        background-color: white;
+        color: black;
+    }
+"""
+
+
+def bench_theme(app, args):
+    """Tempo de adicionar e remover abas com tema da aplicação vs. folhas de estilo por widget"""
+    for legacy in (True, False):
+        app.setStyleSheet("" if legacy else theme.compile_stylesheet(theme.theme_name()))
+        window = make_window()
+        if legacy:
+            window.setStyleSheet(theme.compile_stylesheet(theme.theme_name()))
+        window.show()
+        app.processEvents()
+
+        start = time.perf_counter()
+        for _ in range(args.tabs):
+            browser = window.add_new_tab(BLANK)
+            if legacy:
+                browser.setStyleSheet(LEGACY_TAB_STYLESHEET)
+            app.processEvents()
+        while window.tabs.count() > 1:
+            window.close_tab(window.tabs.count() - 1)
+            app.processEvents()
+        elapsed = time.perf_counter() - start
+
+        label = "folhas por widget" if legacy else "tema da aplicação"
+        print(f"{label}: {args.tabs} abas adicionadas e removidas em {elapsed * 1000:.0f}ms")
+        window.close()
+
+
+def bench_startup(app, args):
+    """Roda Tema2.py --trace-startup repetidas vezes na plataforma offscreen e resume as fases"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    phases = {}
+    wall = []
+    for _ in range(args.runs):
+        home = tempfile.mkdtemp()
+        trace_path = os.path.join(home, "trace.json")
+        env = dict(os.environ, HOME=home, QT_QPA_PLATFORM="offscreen")
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, os.path.join(here, "Tema2.py"),
+             f"--trace-startup={trace_path}", "--exit-after-startup"],
+            env=env, check=True, timeout=120, stderr=subprocess.DEVNULL
+        )
+        wall.append(time.perf_counter() - start)
+        with open(trace_path, encoding="utf-8") as trace_file:
+            for event in json.load(trace_file)["traceEvents"]:
+                end = event["ts"] + event.get("dur", 0)
+                phases.setdefault(event["name"], []).append(end / 1e6)
+
+    report("processo completo (import até saída)", wall)
+    for name, samples in sorted(phases.items(), key=lambda item: statistics.median(item[1])):
+        report(f"fim de {name!r} desde main()", samples)
+
+
+ANIMATION_PAGE = """
+<html>
+<head>
+<style>
+    .box { width: 200px; height: 200px; margin: 20px; border-radius: 20px;
+           background: linear-gradient(45deg, #8ab4f8, #f28b82); box-shadow: 0 4px 20px #0008; }
+    @keyframes spin { from { transform: rotate(0deg); } to { transform: rotate(360deg); } }
+    .box { animation: spin 2s linear infinite; }
+</style>
+</head>
+<body>%s</body>
+</html>
+""" % ('<div class="box"></div>' * 200)
+
+FRAME_TIMES_SCRIPT = """
+(function () {
+    window.__frames = null;
+    var times = [];
+    var start = performance.now();
+    function frame(now) {
+        times.push(now);
+        window.scrollBy(0, 8);
+        if (now - start < %d) {
+            requestAnimationFrame(frame);
+        } else {
+            window.__frames = times.slice(1).map(function (t, i) { return t - times[i]; });
+        }
+    }
+    requestAnimationFrame(frame);
+})();
+"""
+
+
+def bench_frame_times(app, args):
+    """Intervalo entre quadros com rolagem e animação no perfil de renderização atual"""
+    window = make_window()
+    window.show()
+    browser = window.current_browser()
+    loaded = []
+    browser.loadFinished.connect(loaded.append)
+    browser.setHtml(ANIMATION_PAGE, QUrl("http://localhost/"))
+    wait_until(app, lambda: loaded)
+
+    duration = 3000
+    browser.page().runJavaScript(FRAME_TIMES_SCRIPT % duration)
+    frames = []
+    deadline = time.monotonic() + duration / 1000 + 10
+    while not frames and time.monotonic() < deadline:
+        browser.page().runJavaScript("window.__frames", lambda result: frames.extend(result or []))
+        wait_until(app, lambda: frames, 0.5)
+    report(f"tempo de quadro ({args.rendering})", [frame / 1000 for frame in frames])
+    window.close()
+
+
+def bench_rendering(app, args):
+    """Compara os perfis de renderização, cada um em um processo próprio"""
+    for name in sorted(rendering.PROFILES):
+        env = dict(os.environ)
+        env.pop("QTWEBENGINE_CHROMIUM_FLAGS", None)
+        subprocess.run([sys.executable, os.path.abspath(__file__), "frame-times", "--rendering", name],
+                       env=env, timeout=120)
+
+
+def bench_renderers(app, args):
+    """Renderizadores e memória com --tabs abas em sites diferentes, no modelo de processos atual"""
+    server, base = start_server()
+    window = make_window()
+    window.show()
+
+    loaded = []
+    for i in range(args.tabs):
+        # Hosts diferentes para o mesmo servidor: 127.0.0.1, localhost, alternados
+        host = "127.0.0.1" if i % 2 else "localhost"
+        browser = window.add_blank_tab()
+        browser.loadFinished.connect(loaded.append)
+        browser.setUrl(QUrl(base.replace("127.0.0.1", host) + f"/page{i}"))
+    wait_until(app, lambda: len(loaded) >= args.tabs, 60.0)
+
+    renderers = process_model.renderer_map([window])
+    rss = sum(renderer_rss(pid) for pid in renderers)
+    print(f"modelo {args.process_model} (limite {args.renderer_limit or '-'}): {args.tabs} abas, "
+          f"{len(renderers)} renderizadores, {rss / (1024 * 1024):.0f} MB")
+    window.close()
+    server.shutdown()
+
+
+def bench_process_model(app, args):
+    """Compara os modelos de processos, cada um em um processo próprio"""
+    runs = [(name, 0) for name in sorted(process_model.MODELS)] + [("site-instance", 4)]
+    for name, limit in runs:
+        env = dict(os.environ)
+        env.pop("QTWEBENGINE_CHROMIUM_FLAGS", None)
+        subprocess.run([sys.executable, os.path.abspath(__file__), "renderers", "--tabs", str(args.tabs),
+                        "--process-model", name, "--renderer-limit", str(limit)],
+                       env=env, timeout=300)
+
+
+def bench_batch(app, args):
+    """Páginas por segundo do modo --batch contra o servidor local, com concorrência crescente"""
+    server, base = start_server()
+    urls = [f"{base}/page{i}" for i in range(args.count)]
+    for concurrency in (1, 2, 4, 8):
+        renderer = batch_mode.BatchRenderer(urls, tempfile.mkdtemp(), Tema2.BrowserTab,
+                                            concurrency=concurrency, formats=("html",), out=io.StringIO())
+        renderer.start()
+        wait_until(app, lambda: len(renderer.results) == len(urls), 120.0)
+        print(f"batch concorrência {concurrency}: {renderer.pages_per_second():.2f} páginas/s, "
+              f"{renderer.failures()} falha(s)")
+    server.shutdown()
+
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    """Arquivo aleatório com suporte a Range e banda limitada por conexão, como um servidor distante"""
+
+    protocol_version = "HTTP/1.1"
+    data = b""
+    connection_rate = 8 * 1024 * 1024
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        first, last = 0, len(self.data) - 1
+        requested = self.headers.get("Range")
+        if requested:
+            start, _, end = requested[len("bytes="):].partition("-")
+            first, last = int(start), int(end) if end else last
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {first}-{last}/{len(self.data)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(last - first + 1))
+        self.send_header("ETag", '"bench"')
+        self.end_headers()
+        block = 256 * 1024
+        for offset in range(first, last + 1, block):
+            self.wfile.write(self.data[offset:min(last + 1, offset + block)])
+            time.sleep(block / self.connection_rate)
+
+
+def bench_downloads(app, args):
+    """Tempo de download com 1 e com 4 faixas paralelas contra um servidor local com Range"""
+    RangeHandler.data = os.urandom(32 * 1024 * 1024)
+    server, base = start_server(RangeHandler)
+    for segments in (1, 2, 4):
+        manager = download_manager.DownloadManager(max_segments=segments)
+        results = []
+        manager.finished.connect(lambda download_id, path, ok, message: results.append(ok))
+        path = os.path.join(tempfile.mkdtemp(), "file.bin")
+        start = time.perf_counter()
+        manager.start(f"{base}/file.bin", path, {})
+        wait_until(app, lambda: results, 120.0)
+        elapsed = time.perf_counter() - start
+        size = len(RangeHandler.data) / (1024 * 1024)
+        print(f"download {segments} faixa(s): {elapsed:.2f}s, {size / elapsed:.1f} MB/s, ok={results}")
+        manager.shutdown()
+    server.shutdown()
+
+
+class BusyPageHandler(http.server.BaseHTTPRequestHandler):
+    """Página ociosa típica: timer de 50 ms e animação CSS contínua"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        body = (f"<html><head><title>Ocupada {self.path}</title><style>"
+                "@keyframes pulse { from { opacity: 0.2; } to { opacity: 1; } }"
+                "div { animation: pulse 0.5s infinite alternate; width: 100px; height: 100px; background: red; }"
+                "</style></head><body><div></div><p id='n'></p>"
+                "<script>var n = 0; setInterval(function () {"
+                " n++; document.getElementById('n').textContent = n; }, 50);</script>"
+                "</body></html>").encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def renderer_cpu_seconds(window):
+    """Tempo de CPU de cada aba: o do renderizador dividido entre as abas que o compartilham"""
+    renderers = process_model.renderer_map([window])
+    per_tab = {}
+    for pid, tabs in renderers.items():
+        ticks = task_manager.process_cpu_ticks(pid) or 0
+        for _, index, _ in tabs:
+            per_tab[index] = ticks / task_manager.CLOCK_TICKS / len(tabs)
+    return per_tab
+
+
+def bench_freezing(app, args):
+    """CPU das abas em segundo plano em --tabs páginas ocupadas, sem e com congelamento"""
+    server, base = start_server(BusyPageHandler)
+    window = make_window()
+    # Nada congela sozinho durante a medição das abas ativas
+    window.freezer.delay = float("inf")
+    window.show()
+    loaded = []
+    for i in range(args.tabs):
+        browser = window.add_blank_tab()
+        browser.loadFinished.connect(loaded.append)
+        browser.setUrl(QUrl(f"{base}/page{i}"))
+    wait_until(app, lambda: len(loaded) >= args.tabs, 120.0)
+    window.tabs.setCurrentIndex(0)
+
+    duration = 15.0
+    for label, freeze in (("ativas", False), ("congeladas", True)):
+        if freeze:
+            window.freezer.delay = 0
+            window.freezer.freeze_hidden()
+        before = renderer_cpu_seconds(window)
+        wait_until(app, lambda: False, duration)
+        after = renderer_cpu_seconds(window)
+        usage = {index: after.get(index, 0.0) - before.get(index, 0.0) for index in after}
+        hidden = [usage[index] for index in usage if index != 0]
+        print(f"{len(hidden)} abas escondidas {label}: CPU total {sum(hidden):.2f}s em {duration:.0f}s, "
+              f"por aba p50={statistics.median(hidden) * 1000:.1f}ms "
+              f"máx={max(hidden) * 1000:.1f}ms")
+    print(f"abas congeladas: {window.freezer.frozen_count}")
+    window.close()
+    server.shutdown()
+
+
+def idle(seconds):
+    """Roda o laço de eventos de verdade; wait_until faz polling e ocuparia a CPU que se quer medir"""
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec_()
+
+
+def process_cpu_seconds():
+    """CPU do processo do navegador (todas as threads, inclusive a do sampler) desde o início"""
+    times = os.times()
+    return times.user + times.system
+
+
+def bench_task_manager(app, args):
+    """CPU do processo do navegador com 100 abas, com o gerenciador de tarefas fechado e aberto"""
+    window = make_window()
+    window.show()
+    for _ in range(99):
+        window.add_blank_tab()
+    idle(5.0)
+
+    manager = task_manager.TaskManager(window.session)
+    refreshes = []
+    samples = []
+    refresh, apply_sample = manager.refresh, manager.apply_sample
+
+    def timed_refresh():
+        start = time.perf_counter()
+        refresh()
+        refreshes.append(time.perf_counter() - start)
+
+    def timed_apply(sample):
+        start = time.perf_counter()
+        apply_sample(sample)
+        samples.append(time.perf_counter() - start)
+
+    manager.timer.timeout.disconnect()
+    manager.timer.timeout.connect(timed_refresh)
+    manager.sampler.sampled.disconnect()
+    manager.sampler.sampled.connect(timed_apply)
+
+    duration = 30.0
+    usage = {}
+    for label, visible in (("fechado", False), ("aberto", True)):
+        manager.setVisible(visible)
+        before, started = process_cpu_seconds(), time.monotonic()
+        idle(duration)
+        usage[label] = (process_cpu_seconds() - before) / (time.monotonic() - started) * 100
+        print(f"gerenciador {label}: CPU do navegador {usage[label]:.2f}%")
+    print(f"custo do gerenciador aberto com {window.tabs.count()} abas: "
+          f"{usage['aberto'] - usage['fechado']:.2f}% de CPU (meta: menos de 1%)")
+    report("refresh (enumerar abas)", refreshes)
+    report("apply_sample (atualizar a tabela)", samples)
+    manager.close()
+    window.close()
+
+
+HANDOFF_CLIENT = """
+import sys, json, single_instance
+name = single_instance.server_name(sys.argv[1])
+print(json.dumps([single_instance.forward(name, ["Tema2.py", "https://example.com/%d" % i])
+                  for i in range(int(sys.argv[2]))]))
+"""
+
+HANDOFF_LAUNCH = """
+import sys, single_instance
+single_instance.forward_or_continue(sys.argv[1])
+sys.exit(3)
+"""
+
+
+def bench_handoff(app, args):
+    """Latência da entrega ao servidor de instância única e o tempo total de uma segunda execução"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    name = f"bench-{os.getpid()}"
+    server = single_instance.SingleInstanceServer(name)
+    received = []
+    server.received.connect(lambda argv, cwd: received.append(argv))
+    assert server.listen(), server.server.errorString()
+
+    # O cliente bloqueia esperando a confirmação, então roda em outro processo com o laço girando aqui
+    client = subprocess.Popen([sys.executable, "-c", HANDOFF_CLIENT, name, str(args.count)],
+                              cwd=here, stdout=subprocess.PIPE, text=True)
+    wait_until(app, lambda: client.poll() is not None, 60.0)
+    latencies = json.loads(client.stdout.read())
+    report("entrega (conexão até confirmação)", latencies)
+
+    wall = []
+    for _ in range(args.runs):
+        launch = subprocess.Popen([sys.executable, "-c", HANDOFF_LAUNCH, name], cwd=here)
+        start = time.perf_counter()
+        wait_until(app, lambda: launch.poll() is not None, 60.0)
+        wall.append(time.perf_counter() - start)
+        assert launch.returncode == 0, "a segunda execução não entregou as URLs"
+    report("segunda execução completa (interpretador + entrega)", wall)
+    print(f"mensagens recebidas: {len(received)}; meta de entrega < 50 ms: "
+          f"{'ok' if max(latencies) < 0.05 else 'não atingida'}")
+    server.close()
+
+
+class ShellFileHandler(http.server.SimpleHTTPRequestHandler):
+    """Servidor de arquivos com Last-Modified/304, fazendo o papel da origem do app shell"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+SHELL_FILES = {
+    "lacarosinside.html": '<html><head><title>LaçarOS %s</title><link rel="stylesheet" href="style.css">'
+                          '<script src="app.js"></script></head><body><p>LaçarOS Inside</p></body></html>',
+    "style.css": "body { background: #%s; }",
+    "app.js": "document.documentElement.dataset.version = '%s';",
+}
+
+
+def write_shell_files(directory, version):
+    for name, template in SHELL_FILES.items():
+        path = os.path.join(directory, name)
+        with open(path, "w", encoding="utf-8") as data:
+            data.write(template % version)
+        # Last-Modified tem resolução de segundos; empurra o mtime para a troca ser vista
+        mtime = time.time() + version
+        os.utime(path, (mtime, mtime))
+
+
+def load_shell(app, directory, url):
+    """Um boot do quiosque: AppShell novo sobre o mesmo snapshot; devolve (tempo, título, shell)"""
+    shell = app_shell.AppShell(url, directory)
+    profile = QWebEngineProfile()
+    shell.install(profile)
+    view = QWebEngineView()
+    view.setPage(QWebEnginePage(profile, view))
+    finished = []
+    view.loadFinished.connect(finished.append)
+    start = time.perf_counter()
+    view.setUrl(shell.entry_url())
+    wait_until(app, lambda: finished, 30.0)
+    elapsed = time.perf_counter() - start
+    assert finished and finished[0], "o shell não carregou"
+    title = view.title()
+    done = []
+    shell.revalidated.connect(done.append)
+    shell.revalidate()
+    wait_until(app, lambda: done, 30.0)
+    view.deleteLater()
+    return elapsed, title, shell, done[0] if done else None
+
+
+def bench_app_shell(app, args):
+    """Quiosque contra uma origem local: primeiro boot, versão nova na origem e boots com a origem fora do ar"""
+    origin = tempfile.mkdtemp()
+    snapshot = tempfile.mkdtemp()
+    write_shell_files(origin, 1)
+    server, base = start_server(functools.partial(ShellFileHandler, directory=origin))
+    url = f"{base}/lacarosinside.html"
+
+    elapsed, title, shell, _ = load_shell(app, snapshot, url)
+    print(f"primeiro boot (rede): {elapsed * 1000:.1f}ms, título {title!r}, "
+          f"versão {shell.snapshot.current['version']} com {sorted(shell.snapshot.current['files'])}")
+    shell.close()
+
+    write_shell_files(origin, 2)
+    elapsed, title, shell, _ = load_shell(app, snapshot, url)
+    print(f"boot com versão nova na origem: {elapsed * 1000:.1f}ms, serviu {title!r} do snapshot, "
+          f"depois da revalidação versão {shell.snapshot.current['version']}")
+    shell.close()
+
+    server.shutdown()
+    server.server_close()
+    offline = []
+    misses = 0
+    for _ in range(args.runs):
+        elapsed, title, shell, _ = load_shell(app, snapshot, url)
+        offline.append(elapsed)
+        misses += shell.misses
+        shell.close()
+    report("boot com a origem fora do ar (snapshot)", offline)
+    print(f"título servido fora do ar: {title!r}, pedidos que foram à rede: {misses}")
+
+
+class FakeTab(QWidget):
+    """Aba sem página, para medir só a gestão de abas"""
+
+    def __init__(self, number):
+        super().__init__()
+        self._title = f"Página {number} sobre o assunto {number % 97}"
+        self._url = QUrl(f"https://site{number % 311}.example/artigo/{number}")
+
+    def title(self):
+        return self._title
+
+    def url(self):
+        return self._url
+
+
+def measure_tab_operations(app, tabs, count, rng, registry=None):
+    """Troca de aba e atualização de título em abas sorteadas; devolve (trocas, títulos)"""
+    widgets = [FakeTab(number) for number in range(count)]
+    for widget in widgets:
+        tabs.addTab(widget, widget.title()[:25])
+    tabs.show()
+    app.processEvents()
+    switches, titles = [], []
+    for round_number in range(200):
+        tab = rng.choice(widgets)
+        start = time.perf_counter()
+        tabs.setCurrentIndex(tabs.indexOf(tab))
+        app.processEvents()
+        switches.append(time.perf_counter() - start)
+
+        tab = rng.choice(widgets)
+        tab._title = f"Título novo {round_number}"
+        start = time.perf_counter()
+        index = tabs.indexOf(tab)
+        tabs.setTabText(index, tab.title()[:25])
+        if registry is not None:
+            registry.refresh(tab)
+        app.processEvents()
+        titles.append(time.perf_counter() - start)
+    return switches, titles
+
+
+def bench_tab_registry(app, args):
+    """Troca de aba, atualização de título e filtro por tecla em 100 a 2000 abas, QTabWidget vs registro"""
+    for count in (100, 500, 2000):
+        rng = random.Random(count)
+        plain = QTabWidget()
+        switches, titles = measure_tab_operations(app, plain, count, rng)
+        report(f"QTabWidget com {count} abas, troca", switches)
+        report(f"QTabWidget com {count} abas, título", titles)
+        plain.deleteLater()
+
+        tabs = tab_registry.TabWidget()
+        panel = tab_registry.TabSearchPanel(tabs)
+        panel.show()
+        switches, titles = measure_tab_operations(app, tabs, count, rng, tabs.registry)
+        report(f"TabWidget com {count} abas, troca", switches)
+        report(f"TabWidget com {count} abas, título", titles)
+
+        keystrokes = []
+        for query in ("s", "si", "sit", "site", "site1", "site12", "site12 artigo"):
+            start = time.perf_counter()
+            panel.search.setText(query)
+            app.processEvents()
+            keystrokes.append(time.perf_counter() - start)
+        report(f"TabWidget com {count} abas, filtro por tecla", keystrokes)
+        print(f"  '{panel.search.text()}' encontrou {panel.filter_model.rowCount()} abas")
+        panel.deleteLater()
+        tabs.deleteLater()
+        app.processEvents()
+
+
+WORDS = ("navegador aba página texto busca índice memória processo janela rede cache servidor "
+         "ação configuração português desempenho renderização histórico favorito download "
+         "segurança certificado extensão sessão perfil tema fonte imagem vídeo áudio").split()
+
+
+def synthetic_page(rng, number, size):
+    words = [rng.choice(WORDS) for _ in range(size // 8)]
+    # Palavras raras, que aparecem em poucas abas, como o texto que alguém procura de verdade
+    words.insert(rng.randrange(len(words)), f"pedido{number % 50}")
+    words.insert(rng.randrange(len(words)), f"codigo{number}")
+    return " ".join(words)
+
+
+def bench_text_index(app, args):
+    """Indexação e busca de texto em --tabs abas sintéticas, com o limite total de memória"""
+    rng = random.Random(7)
+    tabs = max(args.tabs, 500)
+    pages = [synthetic_page(rng, number, text_index.MAX_TEXT_CHARS) for number in range(tabs)]
+    index = text_index.TextIndex(max_total_chars=text_index.MAX_TEXT_CHARS * (tabs - 50))
+
+    indexing = []
+    for number, page in enumerate(pages):
+        start = time.perf_counter()
+        index.index_text(number, None, f"Aba {number}", f"https://exemplo{number}.test/", page)
+        indexing.append(time.perf_counter() - start)
+    report(f"indexação por aba ({text_index.MAX_TEXT_CHARS} caracteres, na thread do índice)", indexing)
+    print(f"depois de {tabs} abas: {index.stats()}")
+
+    for query in ("pedido7", "codigo1234", "navegador sessão", "desemp", "configuracao certificado pedido3", "ped"):
+        samples = []
+        for _ in range(args.runs * 10):
+            start = time.perf_counter()
+            results = index.search(query)
+            samples.append(time.perf_counter() - start)
+        report(f"busca {query!r} ({len(results)} abas)", samples)
+    if results:
+        print(f"trecho: {results[0].snippet}")
+
+    for number in range(tabs):
+        index.forget(number)
+    print(f"depois de fechar todas: {index.stats()}")
+    index.close()
+
+
+BENCHMARKS = {
+    "new-tabs": bench_new_tabs,
+    "new-tab-paint": bench_new_tab_paint,
+    "history": bench_history,
+    "filters": bench_filters,
+    "tab-load-ui": bench_tab_load_ui,
+    "theme": bench_theme,
+    "startup": bench_startup,
+    "frame-times": bench_frame_times,
+    "rendering": bench_rendering,
+    "renderers": bench_renderers,
+    "process-model": bench_process_model,
+    "batch": bench_batch,
+    "downloads": bench_downloads,
+    "freezing": bench_freezing,
+    "task-manager": bench_task_manager,
+    "handoff": bench_handoff,
+    "app-shell": bench_app_shell,
+    "tab-registry": bench_tab_registry,
+    "text-index": bench_text_index,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks do ClowBrowser")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--tabs", type=int, default=30)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--rendering", choices=sorted(rendering.PROFILES), default=rendering.default_profile())
+    parser.add_argument("--process-model", choices=sorted(process_model.MODELS),
+                        default=process_model.default_model())
+    parser.add_argument("--renderer-limit", type=int, default=process_model.default_limit())
+    parser.add_argument("--rules", help="lista de filtros no formato EasyList")
+    parser.add_argument("--log", help="log de requisições: url<TAB>site<TAB>tipo por linha")
+    args = parser.parse_args()
+
+    rendering.apply_profile(args.rendering, process_model.model_flags(args.process_model, args.renderer_limit))
+    register_scheme()
+    app_shell.register_scheme()
+    app = QApplication(sys.argv[:1])
+    BENCHMARKS[args.benchmark](app, args)
+
+
+if __name__ == "__main__":
+    main()
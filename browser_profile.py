@@ -0,0 +1,68 @@
+import os
+from PyQt5.QtWebEngineWidgets import QWebEngineProfile, QWebEngineSettings
+
+from kiti_scheme import install_handler
+from perf_store import install_script
+# CACHE_PATH mora em cache_manager: lá importar este módulo seria circular e puxaria o QtWebEngine
+from cache_manager import CACHE_PATH, adaptive_quota
+
+USER_AGENT_SUFFIX = "ClowBrowser/1.5"
+
+PAGE_ATTRIBUTES = {
+    QWebEngineSettings.JavascriptEnabled: True,
+    QWebEngineSettings.JavascriptCanOpenWindows: True,
+    QWebEngineSettings.JavascriptCanAccessClipboard: True,
+    QWebEngineSettings.PluginsEnabled: True,
+    QWebEngineSettings.FullScreenSupportEnabled: True,
+    QWebEngineSettings.WebGLEnabled: True,
+    QWebEngineSettings.Accelerated2dCanvasEnabled: True,
+    QWebEngineSettings.LocalStorageEnabled: True,
+    QWebEngineSettings.LocalContentCanAccessRemoteUrls: True,
+    QWebEngineSettings.LocalContentCanAccessFileUrls: True,
+    QWebEngineSettings.ErrorPageEnabled: True,
+    QWebEngineSettings.AutoLoadIconsForPage: True,
+    QWebEngineSettings.ScrollAnimatorEnabled: True,
+    QWebEngineSettings.SpatialNavigationEnabled: True,
+    QWebEngineSettings.AllowRunningInsecureContent: True,
+    QWebEngineSettings.AllowWindowActivationFromJavaScript: True,
+    QWebEngineSettings.AllowGeolocationOnInsecureOrigins: True,
+    QWebEngineSettings.ScreenCaptureEnabled: True,
+    QWebEngineSettings.PlaybackRequiresUserGesture: False,
+    QWebEngineSettings.WebRTCPublicInterfacesOnly: False,
+}
+
+_profile = None
+
+
+def desktop_user_agent(user_agent):
+    """Remove a marca 'Mobile' do user agent padrão e acrescenta a do ClowBrowser"""
+    user_agent = user_agent.replace('Mobile', '').replace('mobile', '')
+    return f"{user_agent} {USER_AGENT_SUFFIX}"
+
+
+def configure_profile(profile):
+    """Aplica cache, cookies, user agent e configurações padrão de página ao perfil"""
+    os.makedirs(CACHE_PATH, exist_ok=True)
+    profile.setCachePath(CACHE_PATH)
+    profile.setPersistentStoragePath(os.path.join(CACHE_PATH, "storage"))
+    profile.setHttpCacheType(QWebEngineProfile.DiskHttpCache)
+    profile.setHttpCacheMaximumSize(adaptive_quota(os.path.join(CACHE_PATH, "Cache")))
+    profile.setPersistentCookiesPolicy(QWebEngineProfile.AllowPersistentCookies)
+    profile.setHttpUserAgent(desktop_user_agent(profile.httpUserAgent()))
+
+    settings = profile.settings()
+    for attribute, enabled in PAGE_ATTRIBUTES.items():
+        settings.setAttribute(attribute, enabled)
+    settings.setDefaultTextEncoding("utf-8")
+
+    install_handler(profile)
+    install_script(profile)
+    return profile
+
+
+def shared_profile():
+    """Perfil configurado uma única vez e compartilhado por todas as abas e janelas"""
+    global _profile
+    if _profile is None:
+        _profile = configure_profile(QWebEngineProfile.defaultProfile())
+    return _profile
@@ -0,0 +1,212 @@
+import os
+import re
+import json
+import time
+import atexit
+import shutil
+import struct
+import collections
+from urllib.parse import urlsplit
+
+CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "clowbrowser")
+# O QtWebEngine guarda o cache HTTP em <cachePath>/Cache
+HTTP_CACHE_DIR = os.path.join(CACHE_PATH, "Cache")
+STATS_PATH = os.path.join(CACHE_PATH, "cache-stats.json")
+
+# Mesmos degraus do PreferredCacheSize do Chromium (net/disk_cache/cache_util.cc)
+DEFAULT_CACHE_SIZE = 80 * 1024 * 1024
+MAX_CACHE_SIZE = 4 * 1024 * 1024 * 1024
+MAX_DISK_FRACTION = 0.1
+
+# Cabeçalho dos arquivos do "simple cache" do Chromium (o backend usado no Linux):
+# uint64 magic, uint32 versão, uint32 tamanho da chave, uint32 hash da chave, alinhado a 24 bytes
+SIMPLE_MAGIC = 0xfcfb6d1ba7725c30
+SIMPLE_HEADER = struct.Struct("<QIII")
+SIMPLE_HEADER_SIZE = 24
+SIMPLE_ENTRY_FILE = re.compile(r"^([0-9a-f]{16})_(0|1|s)$")
+
+
+def preferred_cache_size(free):
+    """Cota para free bytes livres: 80% do livre em discos quase cheios, 80 MB, 10% do livre,
+    200 MB e, com muito espaço, 1% do livre"""
+    if free < DEFAULT_CACHE_SIZE * 10 // 8:
+        return free * 8 // 10
+    if free < DEFAULT_CACHE_SIZE * 10:
+        return DEFAULT_CACHE_SIZE
+    if free < DEFAULT_CACHE_SIZE * 25:
+        return free // 10
+    if free < DEFAULT_CACHE_SIZE * 250:
+        return DEFAULT_CACHE_SIZE * 5 // 2
+    return free // 100
+
+
+def adaptive_quota(path=HTTP_CACHE_DIR):
+    """Cota do cache a partir do espaço livre e total do disco, até 10% do disco e no máximo 4 GB.
+
+    Não depende do que o cache já ocupa, então diminui quando o disco enche.
+    CLOWBROWSER_HTTP_CACHE_MB fixa a cota e ignora o cálculo.
+    """
+    fixed = os.environ.get("CLOWBROWSER_HTTP_CACHE_MB")
+    if fixed:
+        try:
+            return max(0, int(fixed)) * 1024 * 1024
+        except ValueError:
+            pass
+    os.makedirs(path, exist_ok=True)
+    usage = shutil.disk_usage(path)
+    return int(min(MAX_CACHE_SIZE, usage.total * MAX_DISK_FRACTION, preferred_cache_size(usage.free)))
+
+
+def key_origin(key):
+    """Origem da URL de uma chave de cache; chaves particionadas terminam com a URL do recurso"""
+    url = key.split()[-1] if key.strip() else ""
+    parts = urlsplit(url)
+    if not parts.scheme or not parts.netloc:
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def read_entry_key(path):
+    try:
+        with open(path, "rb") as entry:
+            header = entry.read(SIMPLE_HEADER_SIZE)
+            if len(header) < SIMPLE_HEADER.size:
+                return None
+            magic, _, key_length, _ = SIMPLE_HEADER.unpack_from(header)
+            if magic != SIMPLE_MAGIC or key_length > 64 * 1024:
+                return None
+            return entry.read(key_length).decode("utf-8", "replace")
+    except OSError:
+        return None
+
+
+def scan_entries(path=HTTP_CACHE_DIR):
+    """Entradas do cache como (origem, bytes, última modificação, arquivos)
+
+    Cada entrada do simple cache é um grupo de arquivos <hash>_0, <hash>_1 e <hash>_s;
+    a chave fica no cabeçalho do <hash>_0.
+    """
+    groups = collections.defaultdict(list)
+    try:
+        names = os.listdir(path)
+    except OSError:
+        return []
+    for name in names:
+        # Outros backends (o "blockfile" do Windows) não seguem esse padrão e ficam de fora
+        match = SIMPLE_ENTRY_FILE.match(name)
+        if match:
+            groups[match.group(1)].append(os.path.join(path, name))
+
+    entries = []
+    for prefix, files in groups.items():
+        key = read_entry_key(os.path.join(path, prefix + "_0"))
+        size = 0
+        modified = 0.0
+        for file_path in files:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            size += stat.st_size
+            modified = max(modified, stat.st_mtime)
+        entries.append((key_origin(key) if key else None, size, modified, files))
+    return entries
+
+
+def evict(path=HTTP_CACHE_DIR, origins=(), older_than=None, now=None):
+    """Apaga entradas das origens dadas e/ou não gravadas há mais de older_than segundos.
+
+    Precisa rodar com o navegador fechado: o Chromium mantém o índice do cache em memória.
+    Devolve (entradas, bytes) removidos.
+    """
+    now = time.time() if now is None else now
+    origins = set(origins)
+    removed = freed = 0
+    for origin, size, modified, files in scan_entries(path):
+        if not ((origin is not None and origin in origins)
+                or (older_than is not None and now - modified > older_than)):
+            continue
+        for file_path in files:
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+        removed += 1
+        freed += size
+    if removed:
+        # O índice é reconstruído a partir dos arquivos na próxima abertura
+        shutil.rmtree(os.path.join(path, "index-dir"), ignore_errors=True)
+    return removed, freed
+
+
+def format_size(size):
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def cache_report(path=HTTP_CACHE_DIR, stats=None, top=15):
+    """Texto com tamanho, cota, acertos/faltas e as origens que mais ocupam o cache"""
+    entries = scan_entries(path)
+    by_origin = collections.Counter()
+    for origin, size, _, _ in entries:
+        by_origin[origin or "(desconhecida)"] += size
+    total = sum(by_origin.values())
+    lines = [f"Cache HTTP em {path}",
+             f"{len(entries)} entradas, {format_size(total)} de {format_size(adaptive_quota(path))}"]
+    if stats is not None:
+        lines.append(stats.summary())
+    for origin, size in by_origin.most_common(top):
+        lines.append(f"    {format_size(size):>10}  {origin}")
+    return "\n".join(lines)
+
+
+class CacheStats:
+    """Acertos e faltas do cache HTTP, contados pelos Resource Timing das páginas e guardados entre execuções"""
+
+    _shared = None
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, path=STATS_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        try:
+            with open(path, encoding="utf-8") as stats_file:
+                saved = json.load(stats_file)
+            self.hits = int(saved.get("hits", 0))
+            self.misses = int(saved.get("misses", 0))
+        except (OSError, ValueError, AttributeError):
+            pass
+        self.session_hits = 0
+        self.session_misses = 0
+        atexit.register(self.save)
+
+    def record(self, timing):
+        """Soma os contadores cache_hits/cache_misses do TIMING_SCRIPT de uma página"""
+        if not timing:
+            return
+        hits = int(timing.get("cache_hits") or 0)
+        misses = int(timing.get("cache_misses") or 0)
+        self.hits += hits
+        self.misses += misses
+        self.session_hits += hits
+        self.session_misses += misses
+
+    def summary(self):
+        def ratio(hits, misses):
+            return f"{100.0 * hits / (hits + misses):.0f}%" if hits + misses else "-"
+        return (f"Acertos/faltas nesta execução: {self.session_hits}/{self.session_misses} "
+                f"({ratio(self.session_hits, self.session_misses)}); "
+                f"no total: {self.hits}/{self.misses} ({ratio(self.hits, self.misses)})")
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as stats_file:
+                json.dump({"hits": self.hits, "misses": self.misses}, stats_file)
+        except OSError:
+            pass
@@ -0,0 +1,156 @@
+import os
+import time
+import queue
+import atexit
+import logging
+import collections
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from PyQt5.QtCore import QUrl
+
+from browser_profile import CACHE_PATH
+
+LOG_PATH = os.path.join(CACHE_PATH, "console.log")
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+TAB_BUFFER_SIZE = 200
+ORIGIN_RATE = 20.0
+ORIGIN_BURST = 50.0
+# Parado por esse tempo, o bucket de uma origem já se encheu de novo e pode sair da tabela
+BUCKET_IDLE = ORIGIN_BURST / ORIGIN_RATE
+PRUNE_INTERVAL = 60.0
+
+LEVEL_NAMES = {
+    0: "INFO",
+    1: "WARNING",
+    2: "ERROR"
+}
+LOG_LEVELS = {
+    0: logging.INFO,
+    1: logging.WARNING,
+    2: logging.ERROR
+}
+
+
+class ConsoleEntry:
+    __slots__ = ("time", "level", "message", "source", "line", "repeats")
+
+    def __init__(self, level, message, source, line):
+        self.time = time.time()
+        self.level = level
+        self.message = message
+        self.source = source
+        self.line = line
+        self.repeats = 0
+
+    def same_as(self, level, message, source, line):
+        return (self.message == message and self.level == level
+                and self.line == line and self.source == source)
+
+    def __str__(self):
+        text = f"JS {LEVEL_NAMES.get(self.level, 'UNKNOWN')}: {self.message} ({self.source}:{self.line})"
+        if self.repeats:
+            text += f" [mensagem repetida {self.repeats} vezes]"
+        return text
+
+
+class ConsoleLogSink:
+    """Buffer circular do console JS, com limite por origem e gravação em segundo plano"""
+
+    _shared = None
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, path=LOG_PATH, buffer_size=TAB_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self._tabs = {}
+        self._buckets = {}
+        self._pruned_at = time.monotonic()
+        self._dropped = collections.Counter()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        self._queue = queue.SimpleQueue()
+        self._listener = QueueListener(self._queue, handler)
+        self._listener.start()
+        self._running = True
+        self._logger = logging.getLogger(f"clowbrowser.console.{id(self)}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._logger.addHandler(QueueHandler(self._queue))
+        atexit.register(self.close)
+
+    def _allow(self, origin, now):
+        # Token bucket por origem: ORIGIN_BURST de folga, reposto a ORIGIN_RATE por segundo
+        tokens, last = self._buckets.get(origin, (ORIGIN_BURST, now))
+        tokens = min(ORIGIN_BURST, tokens + (now - last) * ORIGIN_RATE)
+        if tokens < 1.0:
+            self._buckets[origin] = (tokens, now)
+            return False
+        self._buckets[origin] = (tokens - 1.0, now)
+        return True
+
+    def _prune(self, now):
+        """Tira as origens paradas, para a tabela não crescer com cada site visitado"""
+        self._pruned_at = now
+        for origin in [origin for origin, (_, last) in self._buckets.items() if now - last >= BUCKET_IDLE]:
+            del self._buckets[origin]
+            self._write_dropped(origin)
+
+    def _write_dropped(self, origin):
+        dropped = self._dropped.pop(origin, 0)
+        if dropped:
+            self._logger.warning(f"JS: {dropped} mensagens de {origin} descartadas pelo limite de taxa")
+
+    def add(self, tab, level, message, source, line):
+        """Registra uma mensagem do console; custa só operações em memória na thread da interface"""
+        level = int(level)
+        entries = self._tabs.get(tab)
+        if entries is None:
+            entries = self._tabs[tab] = collections.deque(maxlen=self.buffer_size)
+        elif entries and entries[-1].same_as(level, message, source, line):
+            entries[-1].repeats += 1
+            return
+
+        origin = QUrl(source).host() or source
+        now = time.monotonic()
+        if now - self._pruned_at >= PRUNE_INTERVAL:
+            self._prune(now)
+        if not self._allow(origin, now):
+            self._dropped[origin] += 1
+            return
+
+        if entries:
+            self._write_repeats(entries[-1])
+        self._write_dropped(origin)
+
+        entry = ConsoleEntry(level, message, source, line)
+        entries.append(entry)
+        self._logger.log(LOG_LEVELS.get(level, logging.INFO), str(entry))
+
+    def _write_repeats(self, entry):
+        if entry.repeats:
+            self._logger.log(LOG_LEVELS.get(entry.level, logging.INFO),
+                             f"JS: mensagem anterior repetida {entry.repeats} vezes")
+
+    def entries(self, tab):
+        """Mensagens recentes de uma aba, da mais antiga para a mais nova"""
+        return list(self._tabs.get(tab, ()))
+
+    def forget(self, tab):
+        entries = self._tabs.pop(tab, None)
+        if entries:
+            self._write_repeats(entries[-1])
+
+    def close(self):
+        if not self._running:
+            return
+        self._running = False
+        for entries in self._tabs.values():
+            if entries:
+                self._write_repeats(entries[-1])
+        self._listener.stop()
@@ -0,0 +1,505 @@
+import os
+import re
+import json
+import time
+import base64
+import hashlib
+import itertools
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait
+from PyQt5.QtCore import QObject, QStandardPaths, QUrl, pyqtSignal
+
+MAX_CONNECTIONS = 8
+MAX_SEGMENTS = 4
+SEGMENT_MIN_SIZE = 4 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+RETRIES = 5
+RETRY_DELAY = 1.0
+STATE_INTERVAL = 1.0
+PROGRESS_INTERVAL = 0.25
+TIMEOUT = 30
+# Quanto a saída do navegador espera as conexões gravarem o estado dos downloads
+SHUTDOWN_TIMEOUT = 2.0
+
+CONTENT_RANGE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+EMPTY_RANGE = re.compile(r"bytes\s+\*/0\b")
+SHA256_DIGEST = re.compile(r"sha-256[=:]+([A-Za-z0-9+/=]+)", re.IGNORECASE)
+
+
+def download_directory():
+    return (QStandardPaths.writableLocation(QStandardPaths.DownloadLocation)
+            or os.path.join(os.path.expanduser("~"), "Downloads"))
+
+
+def default_rate_limit():
+    """Limite global de banda em bytes/s a partir de CLOWBROWSER_DOWNLOAD_LIMIT_KBPS; 0 é sem limite"""
+    try:
+        return max(0, int(os.environ.get("CLOWBROWSER_DOWNLOAD_LIMIT_KBPS", "0"))) * 1024
+    except ValueError:
+        return 0
+
+
+def unique_path(path):
+    base, extension = os.path.splitext(path)
+    for number in itertools.count(1):
+        if not os.path.exists(path) and not os.path.exists(path + ".part"):
+            return path
+        path = f"{base} ({number}){extension}"
+
+
+def split_segments(size, count):
+    """Divide [0, size) em count faixas [início, fim] contíguas"""
+    step = -(-size // count)
+    return [[start, min(size, start + step) - 1, 0] for start in range(0, size, step)]
+
+
+def expected_sha256(headers):
+    """SHA-256 anunciado pelo servidor em Digest/Repr-Digest, em hex; None se não houver"""
+    for header in ("Repr-Digest", "Digest"):
+        match = SHA256_DIGEST.search(headers.get(header, ""))
+        if match:
+            try:
+                return base64.b64decode(match.group(1).strip(":")).hex()
+            except ValueError:
+                return None
+    return None
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as data:
+        for block in iter(lambda: data.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class RateLimiter:
+    """Token bucket global em bytes/s compartilhado por todas as conexões"""
+
+    def __init__(self, rate=0):
+        self.rate = rate
+        self._tokens = float(rate)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, amount):
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+class Download:
+    """Um arquivo sendo baixado: faixas, progresso e o estado salvo em <destino>.part.json"""
+
+    def __init__(self, download_id, url, path, headers=None):
+        self.id = download_id
+        self.url = url
+        self.path = path
+        self.headers = dict(headers or {})
+        self.size = None
+        self.validator = None
+        self.sha256 = None
+        self.ranges = False
+        self.segments = []
+        self.error = None
+        self.cancelled = False
+        # O servidor mandou o arquivo inteiro para um If-Range: o .part é de outra versão
+        self.stale = False
+        self.restarts = 0
+        self.remaining = 0
+        self._lock = threading.Lock()
+        self._saved_at = 0.0
+        self._reported_at = 0.0
+
+    @property
+    def part_path(self):
+        return self.path + ".part"
+
+    @property
+    def state_path(self):
+        return self.path + ".part.json"
+
+    def received(self):
+        return sum(segment[2] for segment in self.segments)
+
+    def save_state(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._saved_at < STATE_INTERVAL:
+            return
+        self._saved_at = now
+        with self._lock:
+            # Copia o progresso antes do fsync: tudo o que ele conta já foi escrito no arquivo,
+            # então o .part.json nunca promete bytes que uma queda de energia levaria embora
+            segments = [list(segment) for segment in self.segments]
+            if os.path.exists(self.part_path):
+                with open(self.part_path, "rb+") as part:
+                    os.fsync(part.fileno())
+            state = {"url": self.url, "size": self.size, "validator": self.validator,
+                     "sha256": self.sha256, "segments": segments}
+            temporary = self.state_path + ".tmp"
+            with open(temporary, "w", encoding="utf-8") as state_file:
+                json.dump(state, state_file)
+            os.replace(temporary, self.state_path)
+
+    def discard_part(self):
+        """Apaga o .part e o .part.json e volta ao estado de antes da sondagem"""
+        for path in (self.part_path, self.state_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.size = self.validator = self.sha256 = self.error = None
+        self.ranges = self.stale = False
+        self.segments = []
+
+    def load_state(self):
+        try:
+            with open(self.state_path, encoding="utf-8") as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError):
+            return False
+        if state.get("url") != self.url or not os.path.exists(self.part_path):
+            return False
+        self.size = state["size"]
+        self.validator = state.get("validator")
+        self.sha256 = state.get("sha256")
+        self.segments = [list(segment) for segment in state["segments"]]
+        self.ranges = True
+        return True
+
+
+class DownloadManager(QObject):
+    """Downloads em faixas paralelas via HTTP Range, retomáveis, com pool de conexões e limite de banda"""
+
+    started = pyqtSignal(int, str)
+    progress = pyqtSignal(int, object, object)
+    finished = pyqtSignal(int, str, bool, str)
+
+    _shared = None
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, max_connections=MAX_CONNECTIONS, max_segments=MAX_SEGMENTS,
+                 rate_limit=None, parent=None):
+        super().__init__(parent)
+        self.max_segments = max_segments
+        self.limiter = RateLimiter(default_rate_limit() if rate_limit is None else rate_limit)
+        # Um pool só para todas as faixas de todos os downloads: o total de conexões é limitado
+        self._pool = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="download")
+        self._futures = set()
+        self._ids = itertools.count(1)
+        self._downloads = {}
+        self._profiles = set()
+        self._user_agent = None
+        self._cookies = {}
+
+    def attach(self, profile):
+        """Assume os downloads do perfil e passa a espelhar os cookies dele"""
+        if id(profile) in self._profiles:
+            return
+        self._profiles.add(id(profile))
+        self._user_agent = profile.httpUserAgent()
+        store = profile.cookieStore()
+        store.cookieAdded.connect(self._cookie_added)
+        store.cookieRemoved.connect(self._cookie_removed)
+        store.loadAllCookies()
+        profile.downloadRequested.connect(self._on_download_requested)
+
+    def _cookie_key(self, cookie):
+        return (cookie.domain(), cookie.path(), bytes(cookie.name()))
+
+    def _cookie_added(self, cookie):
+        self._cookies[self._cookie_key(cookie)] = cookie
+
+    def _cookie_removed(self, cookie):
+        self._cookies.pop(self._cookie_key(cookie), None)
+
+    def cookie_header(self, url):
+        qurl = QUrl(url)
+        host = qurl.host()
+        path = qurl.path() or "/"
+        pairs = []
+        for cookie in self._cookies.values():
+            domain = cookie.domain()
+            if domain.startswith("."):
+                matches = host == domain[1:] or host.endswith(domain)
+            else:
+                matches = host == domain
+            if (matches and path.startswith(cookie.path() or "/")
+                    and (not cookie.isSecure() or qurl.scheme() == "https")):
+                pairs.append(f"{bytes(cookie.name()).decode('latin-1')}={bytes(cookie.value()).decode('latin-1')}")
+        return "; ".join(pairs)
+
+    def _on_download_requested(self, item):
+        url = item.url()
+        if url.scheme() not in ("http", "https"):
+            # blob:, data: e afins só existem dentro do motor
+            item.accept()
+            return
+        directory = item.downloadDirectory() if hasattr(item, "downloadDirectory") else download_directory()
+        name = item.downloadFileName() if hasattr(item, "downloadFileName") else os.path.basename(item.path())
+        item.cancel()
+        self.start(url.toString(), os.path.join(directory or download_directory(), name))
+
+    def request_headers(self, url):
+        """User agent e cookies do perfil, para o servidor ver o mesmo cliente que a página"""
+        headers = {}
+        if self._user_agent:
+            headers["User-Agent"] = self._user_agent
+        cookies = self.cookie_header(url)
+        if cookies:
+            headers["Cookie"] = cookies
+        return headers
+
+    def start(self, url, path, headers=None, resume=False):
+        """Começa (ou retoma, com resume=True) um download; devolve o id usado nos sinais"""
+        if not resume:
+            path = unique_path(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if headers is None:
+            headers = self.request_headers(url)
+        download = Download(next(self._ids), url, path, headers)
+        self._downloads[download.id] = download
+        self.started.emit(download.id, path)
+        threading.Thread(target=self._prepare, args=(download,), name="download-probe", daemon=True).start()
+        return download.id
+
+    def resume_pending(self, directory=None):
+        """Retoma os downloads interrompidos que deixaram .part.json no diretório"""
+        directory = directory or download_directory()
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return []
+        resumed = []
+        for name in names:
+            if not name.endswith(".part.json"):
+                continue
+            try:
+                with open(os.path.join(directory, name), encoding="utf-8") as state_file:
+                    url = json.load(state_file)["url"]
+            except (OSError, ValueError, KeyError):
+                continue
+            path = os.path.join(directory, name[:-len(".part.json")])
+            resumed.append(self.start(url, path, resume=True))
+        return resumed
+
+    def cancel(self, download_id):
+        download = self._downloads.get(download_id)
+        if download is not None:
+            download.cancelled = True
+
+    def shutdown(self, timeout=SHUTDOWN_TIMEOUT):
+        """Interrompe tudo guardando o estado; os downloads continuam na próxima execução.
+
+        Espera no máximo timeout segundos: uma conexão parada num read não segura a saída.
+        """
+        for download in list(self._downloads.values()):
+            download.cancelled = True
+        self._pool.shutdown(wait=False)
+        wait(list(self._futures), timeout=timeout)
+
+    def _submit(self, function, *args):
+        try:
+            future = self._pool.submit(function, *args)
+        except RuntimeError:
+            # O pool já foi encerrado pelo shutdown
+            return
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+
+    def _request(self, download, first=None, last=None, validator=None):
+        headers = dict(download.headers)
+        if first is not None:
+            headers["Range"] = f"bytes={first}-{'' if last is None else last}"
+            if validator:
+                # Se o arquivo mudou no servidor, vem 200 com ele inteiro em vez de 206
+                headers["If-Range"] = validator
+        request = urllib.request.Request(download.url, headers=headers)
+        return urllib.request.urlopen(request, timeout=TIMEOUT)
+
+    def _prepare(self, download):
+        try:
+            if download.load_state():
+                self._schedule(download)
+                return
+            try:
+                response = self._request(download, 0, 0)
+            except urllib.error.HTTPError as error:
+                if error.code != 416 or not EMPTY_RANGE.match(error.headers.get("Content-Range", "")):
+                    raise
+                response = error
+            with response:
+                download.url = response.geturl()
+                headers = response.headers
+                download.validator = headers.get("ETag") or headers.get("Last-Modified")
+                download.sha256 = expected_sha256(headers)
+                match = CONTENT_RANGE.match(headers.get("Content-Range", ""))
+                if response.status == 206 and match and match.group(3) != "*":
+                    download.ranges = True
+                    download.size = int(match.group(3))
+                elif response.status == 416:
+                    # Arquivo vazio: não há byte 0 para a faixa 0-0 (Content-Range: bytes */0)
+                    download.ranges = True
+                    download.size = 0
+                elif headers.get("Content-Length"):
+                    download.size = int(headers["Content-Length"])
+        except (OSError, ValueError) as error:
+            self._finish(download, False, str(error))
+            return
+
+        if download.ranges:
+            count = max(1, min(self.max_segments, download.size // SEGMENT_MIN_SIZE))
+            download.segments = split_segments(download.size, count) if download.size else []
+            with open(download.part_path, "wb") as part:
+                # Reserva o espaço todo de uma vez; cada faixa grava na sua posição
+                part.truncate(download.size)
+            download.save_state(force=True)
+            self._schedule(download)
+        else:
+            self._submit(self._fetch_whole, download)
+
+    def _schedule(self, download):
+        pending = [segment for segment in download.segments if segment[0] + segment[2] <= segment[1]]
+        if not pending:
+            self._complete(download)
+            return
+        download.remaining = len(pending)
+        for segment in pending:
+            self._submit(self._fetch_segment, download, segment)
+
+    def _copy(self, download, response, part, on_chunk):
+        while not download.cancelled and not download.stale:
+            chunk = response.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            self.limiter.consume(len(chunk))
+            part.write(chunk)
+            on_chunk(len(chunk))
+            self._report(download)
+
+    def _fetch_segment(self, download, segment):
+        first, last = segment[0], segment[1]
+        error = None
+        for attempt in range(RETRIES):
+            if download.cancelled or download.error or download.stale:
+                break
+            offset = first + segment[2]
+            if offset > last:
+                break
+            try:
+                with self._request(download, offset, last, download.validator) as response:
+                    if response.status == 200:
+                        # If-Range não bateu: o arquivo mudou no servidor e as faixas já baixadas
+                        # são de outra versão; _complete recomeça do zero
+                        download.stale = True
+                        error = None
+                        break
+                    if response.status != 206:
+                        raise ValueError("o servidor não respeitou a faixa pedida")
+                    with open(download.part_path, "r+b") as part:
+                        part.seek(offset)
+
+                        def advance(amount):
+                            # Só conta o que já saiu do buffer; save_state faz o fsync antes de gravar
+                            part.flush()
+                            segment[2] += amount
+                            download.save_state()
+                        self._copy(download, response, part, advance)
+                error = None
+            except (OSError, ValueError) as failure:
+                error = failure
+                time.sleep(RETRY_DELAY * (attempt + 1))
+        if error is None and not download.cancelled and not download.stale and first + segment[2] <= last:
+            error = "conexão encerrada antes do fim da faixa"
+        if error is not None and not download.error:
+            download.error = str(error)
+
+        with download._lock:
+            download.remaining -= 1
+            done = download.remaining == 0
+        if done:
+            self._complete(download)
+
+    def _fetch_whole(self, download):
+        # Sem suporte a Range não há como retomar: cada tentativa recomeça do zero
+        error = None
+        for attempt in range(RETRIES):
+            if download.cancelled:
+                break
+            download.segments = [[0, (download.size or 1) - 1, 0]]
+            try:
+                with self._request(download) as response, open(download.part_path, "wb") as part:
+                    def advance(amount):
+                        download.segments[0][2] += amount
+                    self._copy(download, response, part, advance)
+                error = None
+                break
+            except (OSError, ValueError) as failure:
+                error = failure
+                time.sleep(RETRY_DELAY * (attempt + 1))
+        if error is not None:
+            download.error = str(error)
+        if download.size is None and not download.error:
+            download.size = download.received()
+        self._complete(download)
+
+    def _report(self, download):
+        now = time.monotonic()
+        if now - download._reported_at >= PROGRESS_INTERVAL:
+            download._reported_at = now
+            self.progress.emit(download.id, download.received(), download.size)
+
+    def _restart(self, download):
+        download.discard_part()
+        download.restarts += 1
+        if download.restarts > RETRIES:
+            self._finish(download, False, "o arquivo mudou no servidor a cada tentativa")
+            return
+        self.progress.emit(download.id, 0, None)
+        threading.Thread(target=self._prepare, args=(download,), name="download-probe", daemon=True).start()
+
+    def _complete(self, download):
+        if download.stale and not download.cancelled:
+            self._restart(download)
+            return
+        if download.cancelled or download.error:
+            if download.ranges:
+                download.save_state(force=True)
+            elif os.path.exists(download.part_path):
+                # Sem Range não há como retomar: o .part ficaria órfão, sem .part.json
+                os.remove(download.part_path)
+            self._finish(download, False, "interrompido" if download.cancelled else download.error)
+            return
+
+        actual = download.received() if download.ranges else os.path.getsize(download.part_path)
+        if download.size is not None and actual != download.size:
+            self._finish(download, False, f"tamanho {actual} diferente do esperado {download.size}")
+            return
+        checksum = file_sha256(download.part_path)
+        if download.sha256 and checksum != download.sha256:
+            os.remove(download.part_path)
+            if os.path.exists(download.state_path):
+                os.remove(download.state_path)
+            self._finish(download, False, "SHA-256 não confere com o anunciado pelo servidor")
+            return
+        os.replace(download.part_path, download.path)
+        if os.path.exists(download.state_path):
+            os.remove(download.state_path)
+        self._finish(download, True, checksum)
+
+    def _finish(self, download, ok, message):
+        self._downloads.pop(download.id, None)
+        self.progress.emit(download.id, download.received(), download.size)
+        self.finished.emit(download.id, download.path, ok, message)
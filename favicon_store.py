@@ -0,0 +1,166 @@
+import os
+import logging
+import time
+import queue
+import sqlite3
+import threading
+import collections
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QObject, QUrl, pyqtSignal
+from PyQt5.QtGui import QIcon, QPixmap
+
+logger = logging.getLogger("clowbrowser.favicons")
+
+FAVICON_PATH = os.path.join(os.path.expanduser("~"), ".cache", "clowbrowser", "favicons.sqlite")
+ICON_CACHE_SIZE = 256
+MAX_ENTRIES = 5000
+ICON_SIZE = 32
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS icons (
+    key TEXT PRIMARY KEY,
+    png BLOB NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+
+def icon_keys(url):
+    """Chaves de busca da URL: a página (sem fragmento) e, como reserva, o host"""
+    if url.scheme() not in ("http", "https") or not url.host():
+        return ()
+    return (url.adjusted(QUrl.RemoveFragment).toString(), "host:" + url.host())
+
+
+def icon_to_png(icon):
+    pixmap = icon.pixmap(ICON_SIZE, ICON_SIZE)
+    if pixmap.isNull():
+        return None
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    pixmap.save(buffer, "PNG")
+    return bytes(data)
+
+
+def png_to_icon(png):
+    pixmap = QPixmap()
+    if not pixmap.loadFromData(png, "PNG"):
+        return QIcon()
+    return QIcon(pixmap)
+
+
+def connect(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def load_all(connection, limit=MAX_ENTRIES):
+    """Poda as entradas mais antigas além do limite e devolve {chave: png} das restantes"""
+    connection.execute(
+        "DELETE FROM icons WHERE key NOT IN (SELECT key FROM icons ORDER BY updated DESC LIMIT ?)",
+        (limit,)
+    )
+    connection.commit()
+    return dict(connection.execute("SELECT key, png FROM icons"))
+
+
+def save_icon(connection, keys, png, now=None):
+    now = time.time() if now is None else now
+    connection.executemany(
+        "INSERT OR REPLACE INTO icons(key, png, updated) VALUES (?, ?, ?)",
+        [(key, png, now) for key in keys]
+    )
+
+
+class FaviconStore(QObject):
+    """Favicons persistentes: PNGs em memória vindos do disco numa thread, QIcons decodificados num LRU.
+
+    Na thread da interface, icon_for e remember só mexem em dicionários; o disco fica com o worker.
+    """
+
+    loaded = pyqtSignal()
+    _entriesLoaded = pyqtSignal(dict)
+
+    _shared = None
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, path=FAVICON_PATH, cache_size=ICON_CACHE_SIZE, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.cache_size = cache_size
+        self.is_loaded = False
+        self._png = {}
+        self._icons = collections.OrderedDict()
+        self._entriesLoaded.connect(self._on_entries_loaded)
+        self._tasks = queue.Queue()
+        self._tasks.put(lambda connection: self._entriesLoaded.emit(load_all(connection)))
+        self._worker = threading.Thread(target=self._run, name="favicons", daemon=True)
+        self._worker.start()
+
+    def _run(self):
+        connection = connect(self.path)
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+            try:
+                task(connection)
+            except sqlite3.Error as error:
+                logger.error("Favicons: %s", error)
+            except Exception:
+                # Um erro numa tarefa não pode matar a thread: as seguintes ficariam na fila para sempre
+                logger.exception("Favicons: tarefa falhou")
+        connection.close()
+
+    def _on_entries_loaded(self, entries):
+        # O que foi lembrado antes da carga terminar é mais novo que o disco
+        entries.update(self._png)
+        self._png = entries
+        self.is_loaded = True
+        self.loaded.emit()
+
+    def icon_for(self, url):
+        """Ícone guardado para a URL (ou para o host dela); QIcon nulo se não houver"""
+        for key in icon_keys(url):
+            icon = self._icons.get(key)
+            if icon is not None:
+                self._icons.move_to_end(key)
+                return icon
+            png = self._png.get(key)
+            if png is not None:
+                icon = png_to_icon(png)
+                self._icons[key] = icon
+                if len(self._icons) > self.cache_size:
+                    self._icons.popitem(last=False)
+                return icon
+        return QIcon()
+
+    def remember(self, url, icon):
+        """Guarda o favicon que a página acabou de entregar; só grava no disco se mudou"""
+        keys = icon_keys(url)
+        if not keys or icon.isNull():
+            return
+        png = icon_to_png(icon)
+        if png is None:
+            return
+        changed = [key for key in keys if self._png.get(key) != png]
+        for key in keys:
+            self._png[key] = png
+            self._icons[key] = icon
+            self._icons.move_to_end(key)
+        while len(self._icons) > self.cache_size:
+            self._icons.popitem(last=False)
+        if changed:
+            self._tasks.put(lambda connection: (save_icon(connection, changed, png), connection.commit()))
+
+    def close(self):
+        self._tasks.put(None)
@@ -0,0 +1,274 @@
+import os
+import logging
+import re
+import math
+import unicodedata
+import time
+import queue
+import sqlite3
+import threading
+from PyQt5.QtCore import QObject, QTimer, QStringListModel, pyqtSignal
+from PyQt5.QtWidgets import QCompleter
+
+logger = logging.getLogger("clowbrowser.history")
+
+HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".cache", "clowbrowser", "history.sqlite")
+SUGGESTION_LIMIT = 8
+# Quantas linhas, das de maior frecência, suggest() confere antes de recorrer ao índice FTS
+SCAN_LIMIT = 300
+SCAN_BATCH = 100
+# Acertos do FTS considerados quando a varredura não bastou
+CANDIDATE_LIMIT = 1000
+DEBOUNCE_INTERVAL = 80
+HALF_LIFE_DAYS = 30
+DECAY = math.log(2) / (HALF_LIFE_DAYS * 24 * 3600)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL DEFAULT '',
+    visit_count INTEGER NOT NULL DEFAULT 0,
+    last_visit REAL NOT NULL DEFAULT 0,
+    score REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS urls_score ON urls(score DESC);
+CREATE VIRTUAL TABLE IF NOT EXISTS urls_fts USING fts5(
+    url, title, content='urls', content_rowid='id', prefix='2 3 4 5'
+);
+CREATE TRIGGER IF NOT EXISTS urls_ai AFTER INSERT ON urls BEGIN
+    INSERT INTO urls_fts(rowid, url, title) VALUES (new.id, new.url, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS urls_ad AFTER DELETE ON urls BEGIN
+    INSERT INTO urls_fts(urls_fts, rowid, url, title) VALUES ('delete', old.id, old.url, old.title);
+END;
+CREATE TRIGGER IF NOT EXISTS urls_au AFTER UPDATE OF url, title ON urls BEGIN
+    INSERT INTO urls_fts(urls_fts, rowid, url, title) VALUES ('delete', old.id, old.url, old.title);
+    INSERT INTO urls_fts(rowid, url, title) VALUES (new.id, new.url, new.title);
+END;
+"""
+
+
+def frecency_score(previous_score, now):
+    """Soma uma visita à frecência com decaimento exponencial.
+
+    A frecência atual é exp(score - DECAY * agora); como o termo do agora é
+    igual para todas as linhas, ordenar por score ordena por frecência e o
+    índice urls_score continua válido sem recalcular nada com o tempo.
+    """
+    current = math.exp(previous_score - DECAY * now) if previous_score else 0.0
+    return math.log(current + 1.0) + DECAY * now
+
+
+IGNORED_WORDS = {"http", "https", "www"}
+# Mesmas palavras que o tokenizador unicode61 do FTS5 vê: letras e dígitos, sem "_"
+TOKEN = re.compile(r"[^\W_]+")
+
+
+def fold(text):
+    """Minúsculas e sem acentos, como o unicode61 compara as palavras"""
+    text = text.lower()
+    if text.isascii():
+        return text
+    return "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+
+
+def query_words(text):
+    """Palavras do texto digitado que entram na busca.
+
+    Esquema e "www" casam com quase todo o histórico e só deixariam a busca lenta.
+    """
+    return [word for word in TOKEN.findall(fold(text)) if word not in IGNORED_WORDS]
+
+
+def match_expression(words):
+    """Consulta FTS5 de prefixos para as palavras de query_words.
+
+    Só a última palavra ainda está sendo digitada; as anteriores casam inteiras. Uma última palavra
+    de uma letra fica de fora: sem índice de prefixo de 1 caractere o FTS percorreria todo o
+    vocabulário que começa com ela (dezenas de ms); quem chama confere essa letra com match_pattern.
+    """
+    terms = [f'"{word}"' for word in words[:-1]]
+    if len(words[-1]) > 1:
+        terms.append(f'"{words[-1]}"*')
+    return " ".join(terms)
+
+
+def match_pattern(words):
+    """Regex com a mesma semântica de match_expression, para conferir linhas fora do FTS"""
+    pieces = [rf"(?<![^\W_]){re.escape(word)}(?![^\W_])" for word in words[:-1]]
+    pieces.append(rf"(?<![^\W_]){re.escape(words[-1])}")
+    return [re.compile(piece) for piece in pieces]
+
+
+def connect(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def add_visit(connection, url, now=None):
+    now = time.time() if now is None else now
+    row = connection.execute("SELECT score FROM urls WHERE url = ?", (url,)).fetchone()
+    if row is None:
+        connection.execute(
+            "INSERT INTO urls(url, visit_count, last_visit, score) VALUES (?, 1, ?, ?)",
+            (url, now, frecency_score(0.0, now))
+        )
+    else:
+        connection.execute(
+            "UPDATE urls SET visit_count = visit_count + 1, last_visit = ?, score = ? WHERE url = ?",
+            (now, frecency_score(row[0], now), url)
+        )
+
+
+def set_title(connection, url, title):
+    connection.execute("UPDATE urls SET title = ? WHERE url = ? AND title != ?", (title, url, title))
+
+
+def suggest(connection, text, limit=SUGGESTION_LIMIT):
+    """Devolve (url, título) das entradas que casam com o texto, por frecência.
+
+    Prefixos curtos ("g", "co") casam com boa parte do histórico, e ordenar todos os acertos do FTS
+    custaria dezenas de ms. Por isso percorre primeiro o índice urls_score, do maior score para
+    baixo, e para assim que junta limit linhas. Só quando as SCAN_LIMIT maiores frecências não
+    bastam o FTS completa a lista, com no máximo CANDIDATE_LIMIT acertos (os mais novos); uma
+    busca de uma letra só fica na varredura.
+    """
+    words = query_words(text)
+    if not words:
+        return []
+    patterns = match_pattern(words)
+    found = []
+    seen = set()
+    scanned = 0
+    rows = connection.execute("SELECT id, url, title, score FROM urls ORDER BY score DESC LIMIT ?", (SCAN_LIMIT,))
+    while len(found) < limit:
+        batch = rows.fetchmany(SCAN_BATCH)
+        if not batch:
+            break
+        scanned += len(batch)
+        for row_id, url, title, score in batch:
+            haystack = fold(url + "\n" + title)
+            if all(pattern.search(haystack) for pattern in patterns):
+                found.append((score, url, title))
+                seen.add(row_id)
+                if len(found) == limit:
+                    break
+    rows.close()
+    expression = match_expression(words)
+    if len(found) < limit and scanned == SCAN_LIMIT and expression:
+        # O resto está abaixo das SCAN_LIMIT maiores frecências: vale o que o FTS achar, com teto
+        rest = connection.execute(
+            """
+            SELECT urls.id, urls.url, urls.title, urls.score FROM urls
+            WHERE urls.id IN (SELECT rowid FROM urls_fts WHERE urls_fts MATCH ? ORDER BY rowid DESC LIMIT ?)
+            ORDER BY urls.score DESC
+            """,
+            (expression, CANDIDATE_LIMIT)
+        )
+        for row_id, url, title, score in rest:
+            if row_id in seen or not all(pattern.search(fold(url + "\n" + title)) for pattern in patterns):
+                continue
+            # Vem em ordem de score, e tudo abaixo das SCAN_LIMIT primeiras perde para o que a varredura achou
+            found.append((score, url, title))
+            if len(found) == limit:
+                break
+    return [(url, title) for _, url, title in found[:limit]]
+
+
+class HistoryStore(QObject):
+    suggestionsReady = pyqtSignal(int, list)
+
+    _shared = None
+
+    @classmethod
+    def shared(cls):
+        """Histórico único do processo, compartilhado por todas as janelas"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, path=HISTORY_PATH, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self._tasks = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="history", daemon=True)
+        self._worker.start()
+
+    def _run(self):
+        # Toda leitura e escrita acontece nesta thread; a interface só enfileira tarefas
+        connection = connect(self.path)
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+            try:
+                task(connection)
+            except sqlite3.Error as error:
+                logger.error("Histórico: %s", error)
+            except Exception:
+                # Um erro numa tarefa não pode matar a thread: as seguintes ficariam na fila para sempre
+                logger.exception("Histórico: tarefa falhou")
+        connection.close()
+
+    def record_visit(self, url):
+        self._tasks.put(lambda connection: (add_visit(connection, url), connection.commit()))
+
+    def record_title(self, url, title):
+        self._tasks.put(lambda connection: (set_title(connection, url, title), connection.commit()))
+
+    def request_suggestions(self, request_id, text, limit=SUGGESTION_LIMIT):
+        """Consulta em segundo plano; o resultado chega por suggestionsReady(request_id, linhas)"""
+        def run(connection):
+            self.suggestionsReady.emit(request_id, suggest(connection, text, limit))
+        self._tasks.put(run)
+
+    def close(self):
+        self._tasks.put(None)
+
+
+class UrlCompleter(QCompleter):
+    # URL da melhor sugestão de cada consulta, para quem quiser se adiantar a ela
+    suggested = pyqtSignal(str)
+
+    def __init__(self, line_edit, store, parent=None):
+        super().__init__(parent)
+        self.line_edit = line_edit
+        self.store = store
+        self._request_id = 0
+
+        self.setModel(QStringListModel(self))
+        self.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.setMaxVisibleItems(SUGGESTION_LIMIT)
+        line_edit.setCompleter(self)
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(DEBOUNCE_INTERVAL)
+        self._debounce.timeout.connect(self._request)
+
+        line_edit.textEdited.connect(self._debounce.start)
+        store.suggestionsReady.connect(self._show)
+
+    def _request(self):
+        self._request_id += 1
+        text = self.line_edit.text().strip()
+        if text:
+            self.store.request_suggestions(self._request_id, text)
+        else:
+            self.popup().hide()
+
+    def _show(self, request_id, rows):
+        # Respostas de teclas antigas chegam atrasadas e são descartadas
+        if request_id != self._request_id or not self.line_edit.hasFocus():
+            return
+        self.model().setStringList([url for url, title in rows])
+        if rows:
+            self.complete()
+            self.suggested.emit(rows[0][0])
+        else:
+            self.popup().hide()
@@ -0,0 +1,265 @@
+import html
+import time
+import itertools
+from PyQt5.QtCore import QBuffer, QIODevice, QUrl, QUrlQuery
+from PyQt5.QtWebEngineCore import QWebEngineUrlScheme, QWebEngineUrlSchemeHandler
+
+from perf_store import METRICS, PerfStore
+from speculation import HINT_PAGE_URL, SpeculationEngine
+
+SCHEME = b"kiti"
+NEW_TAB_URL = QUrl("kiti://newtab")
+PERF_URL = QUrl("kiti://perf")
+HOME_URL = "https://www.google.com"
+
+PAGE_STYLE = """
+    body {
+        font-family: 'Segoe UI', Arial, sans-serif;
+        background-color: #202124;
+        color: #e8eaed;
+        display: flex;
+        justify-content: center;
+        align-items: center;
+        height: 100vh;
+        margin: 0;
+        text-align: center;
+    }
+    .container {
+        max-width: 500px;
+        padding: 20px;
+    }
+    h1 {
+        color: #f28b82;
+        font-size: 24px;
+        margin-bottom: 16px;
+    }
+    p {
+        margin: 10px 0;
+        color: #9aa0a6;
+    }
+    a {
+        color: #8ab4f8;
+        text-decoration: none;
+    }
+    a:hover {
+        text-decoration: underline;
+    }
+    input {
+        width: 460px;
+        padding: 12px 20px;
+        border: 1px solid #5f6368;
+        border-radius: 24px;
+        background: #2d2e30;
+        color: #e8eaed;
+        font-size: 16px;
+        outline: none;
+    }
+    input:focus {
+        border-color: #8ab4f8;
+    }
+"""
+
+NEW_TAB_PAGE = f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Nova aba</title>
+    <style>{PAGE_STYLE}</style>
+</head>
+<body>
+    <div class="container">
+        <form action="{HOME_URL}/search" method="get">
+            <input name="q" placeholder="Pesquisar no Google" autofocus>
+        </form>
+    </div>
+</body>
+</html>
+""".encode("utf-8")
+
+# Documento vazio da página oculta de especulação; só recebe os <link rel=preconnect>
+SPECULATION_PAGE = b'<!DOCTYPE html><html><head><meta charset="utf-8"></head><body></body></html>'
+
+ERROR_MESSAGES = {
+    "network": ("Não foi possível carregar a página",
+                "Verifique sua conexão com a internet e tente novamente."),
+    "crash": ("Esta página parou de funcionar",
+              "O processo que exibia a página foi encerrado inesperadamente."),
+}
+
+# A página de erro é pré-renderizada em duas metades; só o miolo muda por falha
+ERROR_PAGE_HEAD, ERROR_PAGE_TAIL = (part.encode("utf-8") for part in f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Erro</title>
+    <style>{PAGE_STYLE}</style>
+</head>
+<body>
+    <div class="container">
+{{body}}
+    </div>
+</body>
+</html>
+""".split("{body}"))
+
+ERROR_BODIES = {
+    reason: f"""        <h1>{html.escape(title)}</h1>
+        <p>{html.escape(detail)}</p>
+""".encode("utf-8")
+    for reason, (title, detail) in ERROR_MESSAGES.items()
+}
+
+
+def error_url(reason, failed_url):
+    """Monta a URL kiti://error para um motivo de falha e a URL que falhou"""
+    url = QUrl("kiti://error")
+    query = QUrlQuery()
+    query.addQueryItem("reason", reason)
+    query.addQueryItem("url", failed_url.toString())
+    url.setQuery(query)
+    return url
+
+
+def render_error_page(reason, failed_url):
+    body = ERROR_BODIES.get(reason, ERROR_BODIES["network"])
+    if not failed_url.startswith(("http://", "https://", "file://")):
+        failed_url = HOME_URL
+    retry = html.escape(failed_url, quote=True)
+    links = (f'        <p><a href="#" onclick="window.history.back(); return false;">Voltar</a> | \n'
+             f'           <a href="{retry}">Tentar novamente</a> | \n'
+             f'           <a href="kiti://newtab">Ir para a página inicial</a></p>\n')
+    return ERROR_PAGE_HEAD + body + links.encode("utf-8") + ERROR_PAGE_TAIL
+
+
+PERF_STYLE = """
+    body { display: block; height: auto; text-align: left; padding: 20px; font-size: 13px; }
+    h1 { color: #e8eaed; }
+    table { border-collapse: collapse; width: 100%; }
+    th, td { padding: 6px 10px; border-bottom: 1px solid #3c4043; white-space: nowrap; }
+    th { color: #9aa0a6; font-weight: normal; text-align: left; }
+    td.metric { text-align: right; font-variant-numeric: tabular-nums; }
+    td.regression { color: #f28b82; }
+"""
+
+METRIC_LABELS = {
+    "ttfb": "TTFB",
+    "dcl": "DOMContentLoaded",
+    "load": "load",
+    "fcp": "FCP",
+    "lcp": "LCP",
+    "transfer": "Transferido",
+}
+
+
+def format_metric(metric, value):
+    if value is None:
+        return "–"
+    if metric == "transfer":
+        return f"{value / 1024:.0f} KB"
+    return f"{value} ms"
+
+
+def render_perf_page(sites, notes=()):
+    """Tabela de p50/p95 por site, com as métricas que pioraram na última semana em destaque"""
+    header = "".join(f"<th>{METRIC_LABELS[metric]} p50 / p95</th>" for metric in METRICS)
+    rows = []
+    for site in sites:
+        cells = []
+        for metric in METRICS:
+            p50, p95 = site["metrics"][metric]
+            text = f"{format_metric(metric, p50)} / {format_metric(metric, p95)}"
+            regression = site["regressions"].get(metric)
+            if regression:
+                before, after = regression
+                text += f" (antes {format_metric(metric, before)})"
+                cells.append(f'<td class="metric regression">{html.escape(text)}</td>')
+            else:
+                cells.append(f'<td class="metric">{html.escape(text)}</td>')
+        last = time.strftime("%Y-%m-%d %H:%M", time.localtime(site["last"]))
+        rows.append(f"<tr><td>{html.escape(site['origin'])}</td><td class=\"metric\">{site['samples']}</td>"
+                    f"<td>{last}</td>{''.join(cells)}</tr>")
+    if not rows:
+        rows.append(f'<tr><td colspan="{len(METRICS) + 3}">Nenhuma medição ainda.</td></tr>')
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Desempenho por site</title>
+    <style>{PAGE_STYLE}{PERF_STYLE}</style>
+</head>
+<body>
+    <h1>Desempenho por site</h1>
+    <p>Medianas da última semana 20% piores que as das quatro semanas anteriores aparecem em vermelho.</p>
+    {"".join(f"<p>{html.escape(note)}</p>" for note in notes)}
+    <table>
+        <tr><th>Site</th><th>Amostras</th><th>Última</th>{header}</tr>
+        {"".join(rows)}
+    </table>
+</body>
+</html>
+""".encode("utf-8")
+
+
+class KitiSchemeHandler(QWebEngineUrlSchemeHandler):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pending = {}
+        self._request_ids = itertools.count()
+        self._perf_store = None
+
+    def _reply(self, request, data):
+        buffer = QBuffer(parent=request)
+        buffer.setData(data)
+        buffer.open(QIODevice.ReadOnly)
+        request.reply(b"text/html", buffer)
+
+    def _request_perf_page(self, request):
+        # A consulta roda na thread da base; a resposta sai quando reportReady chegar
+        if self._perf_store is None:
+            self._perf_store = PerfStore.shared()
+            self._perf_store.reportReady.connect(self._reply_perf_page)
+        request_id = next(self._request_ids)
+        self._pending[request_id] = request
+        request.destroyed.connect(lambda obj=None, request_id=request_id: self._pending.pop(request_id, None))
+        self._perf_store.request_report(request_id)
+
+    def _reply_perf_page(self, request_id, sites):
+        request = self._pending.pop(request_id, None)
+        if request is not None:
+            self._reply(request, render_perf_page(sites, SpeculationEngine.shared().summary()))
+
+    def requestStarted(self, request):
+        url = request.requestUrl()
+        page = url.host()
+        if page == "newtab":
+            data = NEW_TAB_PAGE
+        elif page == HINT_PAGE_URL.host():
+            data = SPECULATION_PAGE
+        elif page == "perf":
+            self._request_perf_page(request)
+            return
+        elif page == "error":
+            query = QUrlQuery(url)
+            data = render_error_page(
+                query.queryItemValue("reason"),
+                query.queryItemValue("url", QUrl.FullyDecoded)
+            )
+        else:
+            request.fail(request.UrlNotFound)
+            return
+
+        self._reply(request, data)
+
+
+def register_scheme():
+    """Registra o esquema kiti://; precisa rodar antes de criar a QApplication"""
+    scheme = QWebEngineUrlScheme(SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    scheme.setFlags(QWebEngineUrlScheme.SecureScheme | QWebEngineUrlScheme.LocalScheme)
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+
+def install_handler(profile):
+    handler = KitiSchemeHandler(profile)
+    profile.installUrlSchemeHandler(SCHEME, handler)
+    return handler
@@ -0,0 +1,231 @@
+import os
+import logging
+import time
+import queue
+import sqlite3
+import threading
+from PyQt5.QtCore import QObject, QUrl, pyqtSignal
+from PyQt5.QtWebEngineWidgets import QWebEngineScript
+
+logger = logging.getLogger("clowbrowser.perf")
+
+PERF_PATH = os.path.join(os.path.expanduser("~"), ".cache", "clowbrowser", "perf.sqlite")
+METRICS = ("ttfb", "dcl", "load", "fcp", "lcp", "transfer")
+SAMPLES_PER_ORIGIN = 1000
+RECENT_DAYS = 7
+BASELINE_DAYS = 28
+REGRESSION_RATIO = 1.2
+MIN_SAMPLES = 5
+COLLECT_DELAY = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS origins (
+    id INTEGER PRIMARY KEY,
+    origin TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS samples (
+    origin_id INTEGER NOT NULL,
+    time INTEGER NOT NULL,
+    ttfb INTEGER,
+    dcl INTEGER,
+    load INTEGER,
+    fcp INTEGER,
+    lcp INTEGER,
+    transfer INTEGER
+);
+CREATE INDEX IF NOT EXISTS samples_origin_time ON samples(origin_id, time);
+"""
+
+# O LCP só chega por PerformanceObserver; o observador fica no mundo isolado da aplicação
+# desde a criação do documento, longe dos scripts da página
+LCP_OBSERVER_SCRIPT = """
+(function () {
+    window.__kitiLcp = null;
+    try {
+        new PerformanceObserver(function (list) {
+            var entries = list.getEntries();
+            var last = entries[entries.length - 1];
+            window.__kitiLcp = last.renderTime || last.startTime;
+        }).observe({type: "largest-contentful-paint", buffered: true});
+    } catch (error) {}
+})();
+"""
+
+TIMING_SCRIPT = """
+(function () {
+    var navigation = performance.getEntriesByType("navigation")[0];
+    if (!navigation || !navigation.loadEventEnd) {
+        return null;
+    }
+    var fcp = performance.getEntriesByName("first-contentful-paint")[0];
+    // transferSize 0 com corpo decodificado: veio do cache. Recursos de outras origens
+    // sem Timing-Allow-Origin não informam tamanhos e ficam fora da conta
+    var hits = 0, misses = 0;
+    [navigation].concat(performance.getEntriesByType("resource")).forEach(function (entry) {
+        if (!entry.decodedBodySize) {
+            return;
+        }
+        if (entry.transferSize === 0) {
+            hits++;
+        } else {
+            misses++;
+        }
+    });
+    return {
+        ttfb: navigation.responseStart,
+        dcl: navigation.domContentLoadedEventEnd,
+        load: navigation.loadEventEnd,
+        fcp: fcp ? fcp.startTime : null,
+        lcp: window.__kitiLcp,
+        transfer: navigation.transferSize,
+        cache_hits: hits,
+        cache_misses: misses
+    };
+})()
+"""
+
+
+def install_script(profile):
+    """Instala o observador de LCP em todas as páginas do perfil"""
+    script = QWebEngineScript()
+    script.setName("kiti-lcp-observer")
+    script.setSourceCode(LCP_OBSERVER_SCRIPT)
+    script.setInjectionPoint(QWebEngineScript.DocumentCreation)
+    script.setWorldId(QWebEngineScript.ApplicationWorld)
+    script.setRunsOnSubFrames(False)
+    profile.scripts().insert(script)
+
+
+def page_origin(url):
+    """Origem http(s) da URL, ou None para páginas que não interessam (kiti://, file://, about:)"""
+    if url.scheme() not in ("http", "https"):
+        return None
+    return url.adjusted(QUrl.RemovePath | QUrl.RemoveQuery | QUrl.RemoveFragment
+                        | QUrl.RemoveUserInfo).toString()
+
+
+def connect(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def origin_id(connection, origin):
+    connection.execute("INSERT OR IGNORE INTO origins(origin) VALUES (?)", (origin,))
+    return connection.execute("SELECT id FROM origins WHERE origin = ?", (origin,)).fetchone()[0]
+
+
+def add_sample(connection, origin, timing, now=None):
+    """Grava uma medição em milissegundos inteiros e mantém só as SAMPLES_PER_ORIGIN mais novas"""
+    now = int(time.time() if now is None else now)
+    key = origin_id(connection, origin)
+    values = [None if timing.get(metric) is None else int(round(timing[metric])) for metric in METRICS]
+    connection.execute(
+        "INSERT INTO samples(origin_id, time, ttfb, dcl, load, fcp, lcp, transfer) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [key, now] + values
+    )
+    connection.execute(
+        """
+        DELETE FROM samples WHERE origin_id = ? AND time < (
+            SELECT time FROM samples WHERE origin_id = ? ORDER BY time DESC LIMIT 1 OFFSET ?
+        )
+        """,
+        (key, key, SAMPLES_PER_ORIGIN - 1)
+    )
+
+
+def percentile(values, fraction):
+    """Percentil por posição mais próxima; values já ordenados"""
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, int(round(fraction * len(values))) - 1))]
+
+
+def site_report(connection, now=None):
+    """p50/p95 por origem e métrica, com as métricas cuja mediana recente piorou em relação à base"""
+    now = time.time() if now is None else now
+    recent_start = now - RECENT_DAYS * 86400
+    baseline_start = recent_start - BASELINE_DAYS * 86400
+    samples = {}
+    rows = connection.execute(
+        """
+        SELECT origins.origin, samples.time, ttfb, dcl, load, fcp, lcp, transfer
+        FROM samples JOIN origins ON origins.id = samples.origin_id
+        """
+    )
+    for origin, sample_time, *values in rows:
+        samples.setdefault(origin, []).append((sample_time, values))
+
+    report = []
+    for origin, entries in samples.items():
+        site = {"origin": origin, "samples": len(entries), "last": max(entry[0] for entry in entries),
+                "metrics": {}, "regressions": {}}
+        for column, metric in enumerate(METRICS):
+            measured = [(sample_time, row[column]) for sample_time, row in entries if row[column] is not None]
+            values = sorted(value for _, value in measured)
+            site["metrics"][metric] = (percentile(values, 0.5), percentile(values, 0.95))
+
+            recent = sorted(value for sample_time, value in measured if sample_time >= recent_start)
+            baseline = sorted(value for sample_time, value in measured
+                              if baseline_start <= sample_time < recent_start)
+            if len(recent) >= MIN_SAMPLES and len(baseline) >= MIN_SAMPLES:
+                before, after = percentile(baseline, 0.5), percentile(recent, 0.5)
+                if before and after > before * REGRESSION_RATIO:
+                    site["regressions"][metric] = (before, after)
+        report.append(site)
+    report.sort(key=lambda site: (-len(site["regressions"]), -site["samples"]))
+    return report
+
+
+class PerfStore(QObject):
+    reportReady = pyqtSignal(int, list)
+
+    _shared = None
+
+    @classmethod
+    def shared(cls):
+        """Base de desempenho única do processo, compartilhada por todas as abas"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, path=PERF_PATH, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self._tasks = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="perf", daemon=True)
+        self._worker.start()
+
+    def _run(self):
+        connection = connect(self.path)
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+            try:
+                task(connection)
+            except sqlite3.Error as error:
+                logger.error("Desempenho: %s", error)
+            except Exception:
+                # Um erro numa tarefa não pode matar a thread: as seguintes ficariam na fila para sempre
+                logger.exception("Desempenho: tarefa falhou")
+        connection.close()
+
+    def record(self, url, timing):
+        """Guarda o resultado de TIMING_SCRIPT para a origem da URL; ignora páginas internas"""
+        origin = page_origin(url)
+        if origin is None or not timing:
+            return
+        self._tasks.put(lambda connection: (add_sample(connection, origin, timing), connection.commit()))
+
+    def request_report(self, request_id):
+        """Calcula o relatório em segundo plano; o resultado chega por reportReady(request_id, sites)"""
+        def run(connection):
+            self.reportReady.emit(request_id, site_report(connection))
+        self._tasks.put(run)
+
+    def close(self):
+        self._tasks.put(None)
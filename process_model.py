@@ -0,0 +1,62 @@
+import os
+from tab_discarder import TabPlaceholder, renderer_rss
+
+MODELS = {
+    # Padrão do Chromium: um renderizador por instância de site (isolamento máximo)
+    "site-instance": [],
+    # Todas as abas do mesmo site dividem um renderizador
+    "site": ["--process-per-site"],
+}
+
+DEFAULT_MODEL = "site-instance"
+
+
+def default_model():
+    name = os.environ.get("CLOWBROWSER_PROCESS_MODEL", DEFAULT_MODEL)
+    return name if name in MODELS else DEFAULT_MODEL
+
+
+def default_limit():
+    """Limite de renderizadores vindo de CLOWBROWSER_RENDERER_LIMIT; 0 deixa o Chromium decidir"""
+    try:
+        return max(0, int(os.environ.get("CLOWBROWSER_RENDERER_LIMIT", "0")))
+    except ValueError:
+        return 0
+
+
+def model_flags(name, limit=0):
+    """Flags do Chromium para o modelo de processos; vale para todas as janelas da aplicação"""
+    flags = list(MODELS[name])
+    if limit > 0:
+        # Acima do limite o Chromium passa a colocar abas novas em renderizadores existentes
+        flags.append(f"--renderer-process-limit={limit}")
+    return flags
+
+
+def renderer_map(windows):
+    """Agrupa as abas vivas por PID do renderizador: {pid: [(janela, índice, título), ...]}"""
+    renderers = {}
+    for window in windows:
+        tabs = window.tabs
+        for index in range(tabs.count()):
+            tab = tabs.widget(index)
+            if tab is None or isinstance(tab, TabPlaceholder):
+                continue
+            pid = tab.page().renderProcessPid()
+            renderers.setdefault(pid, []).append((window, index, tabs.tabText(index)))
+    return renderers
+
+
+def renderer_report(windows):
+    """Texto com cada renderizador, sua memória e as abas que ele atende"""
+    renderers = renderer_map(windows)
+    lines = []
+    total = 0
+    for pid, tabs in sorted(renderers.items()):
+        rss = renderer_rss(pid)
+        total += rss
+        lines.append(f"PID {pid or '?'}: {rss / (1024 * 1024):.0f} MB, {len(tabs)} aba(s)")
+        for window, index, title in tabs:
+            lines.append(f"    janela {window.session_id}, aba {index + 1}: {title}")
+    lines.append(f"{len(renderers)} renderizador(es), {total / (1024 * 1024):.0f} MB no total")
+    return "\n".join(lines)
@@ -0,0 +1,149 @@
+import os
+import re
+import sys
+import glob
+import shlex
+from PyQt5.QtCore import Qt, QTimer, QUrl
+from PyQt5.QtWidgets import QApplication
+
+COMMON_FLAGS = [
+    "--enable-features=WebRtcHideLocalIpsWithMdns,WebRtcUseEchoCanceller3",
+]
+
+PROFILES = {
+    # Servidores sem GPU: composição e rasterização em software, com até 4 threads de raster
+    "software": {
+        "attribute": Qt.AA_UseSoftwareOpenGL,
+        "flags": [
+            "--disable-gpu",
+            "--disable-gpu-compositing",
+            f"--num-raster-threads={min(4, os.cpu_count() or 1)}",
+        ],
+        "env": {
+            "QT_QUICK_BACKEND": "software",
+            "QMLSCENE_DEVICE": "softwarecontext",
+        },
+    },
+    # Deixa o Chromium escolher pela lista de GPUs suportadas
+    "auto": {
+        "attribute": None,
+        "flags": [],
+        "env": {},
+    },
+    "gpu": {
+        "attribute": Qt.AA_UseOpenGLES,
+        "flags": [
+            "--ignore-gpu-blocklist",
+            "--enable-gpu-rasterization",
+            "--enable-accelerated-2d-canvas",
+            "--enable-accelerated-video-decode",
+            "--enable-accelerated-video-encode",
+            "--enable-webrtc-hw-decoding",
+            "--enable-webrtc-hw-encoding",
+        ],
+        "env": {},
+    },
+}
+
+CONFLICTS = [
+    ("--disable-gpu", "--enable-gpu-rasterization"),
+    ("--disable-gpu", "--enable-accelerated-video-decode"),
+    ("--disable-gpu", "--enable-accelerated-video-encode"),
+    ("--disable-gpu", "--ignore-gpu-blocklist"),
+    ("--disable-gpu", "--disable-software-rasterizer"),
+    ("--disable-gpu-compositing", "--enable-gpu-rasterization"),
+    ("--single-process", "--process-per-site"),
+    ("--single-process", "--renderer-process-limit"),
+]
+
+GPU_TEXT_SCRIPT = """
+(function () {
+    function text(root) {
+        var parts = [root.body ? root.body.innerText : ""];
+        root.querySelectorAll("*").forEach(function (element) {
+            if (element.shadowRoot) {
+                Array.prototype.forEach.call(element.shadowRoot.children, function (child) {
+                    parts.push(child.innerText || "");
+                });
+                parts.push(text(element.shadowRoot));
+            }
+        });
+        return parts.join("\\n");
+    }
+    return text(document);
+})()
+"""
+
+FEATURE_STATUS = re.compile(r"^\s*(Canvas|Compositing|Rasterization|Video Decode|WebGL)\s*:\s*(.+)$", re.MULTILINE)
+
+
+class RenderingConfigError(ValueError):
+    pass
+
+
+def default_profile():
+    """Software quando não há GPU utilizável (sem nó de render no Linux, ou Windows), senão auto"""
+    name = os.environ.get("CLOWBROWSER_RENDERING")
+    if name:
+        return name
+    if sys.platform == "win32":
+        return "software"
+    if sys.platform.startswith("linux") and not glob.glob("/dev/dri/renderD*"):
+        return "software"
+    return "auto"
+
+
+def flag_name(flag):
+    return flag.split("=", 1)[0]
+
+
+def validate_flags(flags):
+    """Levanta RenderingConfigError se houver flags que se contradizem"""
+    names = {flag_name(flag) for flag in flags}
+    problems = [f"{first} contradiz {second}" for first, second in CONFLICTS
+                if first in names and second in names]
+    if problems:
+        raise RenderingConfigError("Flags do Chromium inconsistentes: " + "; ".join(problems))
+
+
+def build_flags(name, extra="", extra_flags=()):
+    """Flags do perfil, as de outros módulos e as do usuário em QTWEBENGINE_CHROMIUM_FLAGS, sem repetições"""
+    if name not in PROFILES:
+        raise RenderingConfigError(f"Perfil de renderização desconhecido: {name}")
+    flags = []
+    for flag in COMMON_FLAGS + PROFILES[name]["flags"] + list(extra_flags) + shlex.split(extra):
+        if flag not in flags:
+            flags.append(flag)
+    validate_flags(flags)
+    return flags
+
+
+def apply_profile(name, extra_flags=()):
+    """Configura atributos do Qt e ambiente do Chromium; precisa rodar antes da QApplication"""
+    flags = build_flags(name, os.environ.get("QTWEBENGINE_CHROMIUM_FLAGS", ""), extra_flags)
+    profile = PROFILES[name]
+    if profile["attribute"] is not None:
+        QApplication.setAttribute(profile["attribute"])
+    for key, value in profile["env"].items():
+        os.environ.setdefault(key, value)
+    os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] = " ".join(flags)
+    return flags
+
+
+def parse_gpu_status(text):
+    """Extrai o estado de cada recurso gráfico do texto de chrome://gpu"""
+    return {feature: status.strip() for feature, status in FEATURE_STATUS.findall(text)}
+
+
+def detect_backend(page, callback, delay=1000):
+    """Carrega chrome://gpu numa página e entrega ao callback o que o motor realmente usa"""
+    def read_status():
+        page.runJavaScript(GPU_TEXT_SCRIPT, lambda text: callback(parse_gpu_status(text or "")))
+
+    def on_load_finished(ok):
+        page.loadFinished.disconnect(on_load_finished)
+        # chrome://gpu preenche o relatório por script depois do loadFinished
+        QTimer.singleShot(delay, read_status)
+
+    page.loadFinished.connect(on_load_finished)
+    page.load(QUrl("chrome://gpu"))
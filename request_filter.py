@@ -0,0 +1,266 @@
+import os
+import re
+import glob
+import pickle
+from PyQt5.QtWebEngineCore import QWebEngineUrlRequestInterceptor, QWebEngineUrlRequestInfo
+
+from browser_profile import CACHE_PATH
+
+FILTERS_PATH = os.path.join(CACHE_PATH, "filters")
+COMPILED_PATH = os.path.join(CACHE_PATH, "filters.compiled")
+ENGINE_VERSION = 1
+
+URL_TOKEN = re.compile(r"[a-z0-9%]+")
+SEPARATOR = r"(?:[^\w\-.%]|$)"
+SUPPORTED_TYPES = {"script", "image", "stylesheet", "xmlhttprequest", "subdocument", "media", "font", "other"}
+
+RESOURCE_TYPES = {
+    QWebEngineUrlRequestInfo.ResourceTypeScript: "script",
+    QWebEngineUrlRequestInfo.ResourceTypeImage: "image",
+    QWebEngineUrlRequestInfo.ResourceTypeFavicon: "image",
+    QWebEngineUrlRequestInfo.ResourceTypeStylesheet: "stylesheet",
+    QWebEngineUrlRequestInfo.ResourceTypeXhr: "xmlhttprequest",
+    QWebEngineUrlRequestInfo.ResourceTypeSubFrame: "subdocument",
+    QWebEngineUrlRequestInfo.ResourceTypeMedia: "media",
+    QWebEngineUrlRequestInfo.ResourceTypeFontResource: "font",
+}
+
+
+class Rule:
+    __slots__ = ("pattern", "third_party", "types", "_regex")
+
+    def __init__(self, pattern, third_party=None, types=None):
+        self.pattern = pattern
+        self.third_party = third_party
+        self.types = types
+        self._regex = None
+
+    def __getstate__(self):
+        return self.pattern, self.third_party, self.types
+
+    def __setstate__(self, state):
+        self.pattern, self.third_party, self.types = state
+        self._regex = None
+
+    def applies(self, third_party, resource_type):
+        if self.third_party is not None and self.third_party != third_party:
+            return False
+        return self.types is None or resource_type in self.types
+
+    def matches(self, url):
+        # As expressões só são compiladas na primeira vez que um token as seleciona
+        if self._regex is None:
+            self._regex = re.compile(pattern_to_regex(self.pattern))
+        return self._regex.search(url) is not None
+
+
+def pattern_to_regex(pattern):
+    """Converte um padrão no estilo EasyList em expressão regular"""
+    regex = ""
+    if pattern.startswith("||"):
+        regex = r"^[a-z][a-z0-9+.\-]*://(?:[^/?#]*\.)?"
+        pattern = pattern[2:]
+    elif pattern.startswith("|"):
+        regex = "^"
+        pattern = pattern[1:]
+    end = ""
+    if pattern.endswith("|"):
+        end = "$"
+        pattern = pattern[:-1]
+    for char in pattern:
+        if char == "*":
+            regex += ".*"
+        elif char == "^":
+            regex += SEPARATOR
+        else:
+            regex += re.escape(char)
+    return regex + end
+
+
+def pattern_token(pattern):
+    """Escolhe o token mais longo do padrão que sempre aparece inteiro na URL bloqueada"""
+    anchored_start = pattern.startswith("|")
+    body = pattern.lstrip("|")
+    anchored_end = body.endswith(("|", "^"))
+    best = ""
+    for match in URL_TOKEN.finditer(body):
+        before = body[match.start() - 1] if match.start() > 0 else None
+        after = body[match.end()] if match.end() < len(body) else None
+        if before == "*" or after == "*":
+            continue
+        if before is None and not anchored_start:
+            continue
+        if after is None and not anchored_end:
+            continue
+        if len(match.group()) > len(best):
+            best = match.group()
+    return best
+
+
+def parse_options(text):
+    """Interpreta $third-party e tipos de recurso; devolve None se houver opção não suportada"""
+    third_party = None
+    types = set()
+    for option in text.split(","):
+        option = option.strip()
+        if option == "third-party":
+            third_party = True
+        elif option in ("~third-party", "first-party"):
+            third_party = False
+        elif option in SUPPORTED_TYPES:
+            types.add(option)
+        else:
+            return None
+    return third_party, types or None
+
+
+def url_host(url):
+    start = url.find("://")
+    if start < 0:
+        return ""
+    start += 3
+    end = len(url)
+    for separator in "/?#":
+        index = url.find(separator, start)
+        if index >= 0:
+            end = min(end, index)
+    return url[start:end].rsplit("@", 1)[-1].split(":", 1)[0]
+
+
+def base_domain(host):
+    return ".".join(host.rsplit(".", 2)[-2:])
+
+
+class RuleSet:
+    """Índice de regras: trie de domínios para ||host^ e tokens para o resto"""
+
+    def __init__(self):
+        self.domains = {}
+        self.tokens = {}
+        self.untokenized = []
+        self.size = 0
+
+    def add(self, pattern, rule):
+        self.size += 1
+        host = pattern[2:-1] if pattern.startswith("||") and pattern.endswith("^") else None
+        if host and re.fullmatch(r"[a-z0-9\-.]+", host):
+            node = self.domains
+            for label in reversed(host.split(".")):
+                node = node.setdefault(label, {})
+            node.setdefault("", []).append(rule)
+            return
+        token = pattern_token(pattern)
+        if token:
+            self.tokens.setdefault(token, []).append(rule)
+        else:
+            self.untokenized.append(rule)
+
+    def match(self, url, host, url_tokens, third_party, resource_type):
+        node = self.domains
+        for label in reversed(host.split(".")):
+            node = node.get(label)
+            if node is None:
+                break
+            for rule in node.get("", ()):
+                if rule.applies(third_party, resource_type):
+                    return True
+        for token in url_tokens:
+            for rule in self.tokens.get(token, ()):
+                if rule.applies(third_party, resource_type) and rule.matches(url):
+                    return True
+        for rule in self.untokenized:
+            if rule.applies(third_party, resource_type) and rule.matches(url):
+                return True
+        return False
+
+
+class FilterEngine:
+    def __init__(self):
+        self.block = RuleSet()
+        self.allow = RuleSet()
+
+    def add_line(self, line):
+        line = line.strip()
+        if not line or line.startswith(("!", "[")) or "##" in line or "#@#" in line or "#?#" in line:
+            return
+        rules = self.block
+        if line.startswith("@@"):
+            rules = self.allow
+            line = line[2:]
+        pattern, _, options = line.partition("$")
+        parsed = parse_options(options) if options else (None, None)
+        if parsed is None or not pattern or (pattern.startswith("/") and pattern.endswith("/")):
+            return
+        pattern = pattern.lower()
+        rules.add(pattern, Rule(pattern, *parsed))
+
+    def should_block(self, url, first_party_host="", resource_type="other"):
+        url = url.lower()
+        host = url_host(url)
+        third_party = bool(first_party_host) and base_domain(host) != base_domain(first_party_host)
+        url_tokens = set(URL_TOKEN.findall(url))
+        if not self.block.match(url, host, url_tokens, third_party, resource_type):
+            return False
+        return not self.allow.match(url, host, url_tokens, third_party, resource_type)
+
+
+def compile_rules(paths):
+    engine = FilterEngine()
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as rules:
+            for line in rules:
+                engine.add_line(line)
+    return engine
+
+
+def load_engine(filters_path=FILTERS_PATH, compiled_path=COMPILED_PATH):
+    """Carrega o ruleset compilado do disco, recompilando só se as listas mudaram"""
+    paths = sorted(glob.glob(os.path.join(filters_path, "*.txt")))
+    key = (ENGINE_VERSION, [(path, os.path.getmtime(path), os.path.getsize(path)) for path in paths])
+    try:
+        with open(compiled_path, "rb") as compiled:
+            cached_key, engine = pickle.load(compiled)
+        if cached_key == key:
+            return engine
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError):
+        pass
+
+    engine = compile_rules(paths)
+    os.makedirs(os.path.dirname(compiled_path), exist_ok=True)
+    tmp_path = compiled_path + ".tmp"
+    with open(tmp_path, "wb") as compiled:
+        pickle.dump((key, engine), compiled, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, compiled_path)
+    return engine
+
+
+_engine = None
+
+
+def shared_engine():
+    global _engine
+    if _engine is None:
+        _engine = load_engine()
+    return _engine
+
+
+class TabRequestFilter(QWebEngineUrlRequestInterceptor):
+    def __init__(self, engine, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.blocked = 0
+        self.allowed = 0
+
+    def interceptRequest(self, info):
+        resource_type = info.resourceType()
+        url = info.requestUrl()
+        if resource_type == QWebEngineUrlRequestInfo.ResourceTypeMainFrame or url.scheme() not in ("http", "https"):
+            return
+        if self.engine.should_block(
+                url.toString(),
+                info.firstPartyUrl().host(),
+                RESOURCE_TYPES.get(resource_type, "other")):
+            info.block(True)
+            self.blocked += 1
+        else:
+            self.allowed += 1
@@ -0,0 +1,234 @@
+import os
+import json
+import base64
+import itertools
+from PyQt5.QtCore import QObject, QTimer
+
+from tab_discarder import TabPlaceholder, serialize_history
+
+SESSION_PATH = os.path.join(os.path.expanduser("~"), ".cache", "clowbrowser", "session.jsonl")
+FLUSH_INTERVAL = 1000
+# Reescreve o journal quando ele passa de COMPACT_RATIO vezes o tamanho do estado atual
+COMPACT_RATIO = 4
+COMPACT_MIN_BYTES = 256 * 1024
+
+
+def read_journal(path):
+    """Reaplica o journal e devolve as janelas abertas; linhas truncadas por crash são ignoradas"""
+    windows = {}
+    try:
+        journal = open(path, encoding="utf-8")
+    except OSError:
+        return []
+
+    # Linha a linha: o journal pode ser grande e não precisa estar inteiro na memória
+    for line in journal:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        op = record.get("op")
+        if op == "window":
+            windows.setdefault(record["window"], {"tabs": {}, "active": None})
+        elif op == "tab":
+            window = windows.setdefault(record["window"], {"tabs": {}, "active": None})
+            for other in windows.values():
+                other["tabs"].pop(record["tab"], None)
+            window["tabs"][record["tab"]] = record
+        elif op == "active":
+            if record["window"] in windows:
+                windows[record["window"]]["active"] = record["tab"]
+        elif op == "close_tab":
+            for window in windows.values():
+                window["tabs"].pop(record["tab"], None)
+        elif op == "close_window":
+            windows.pop(record["window"], None)
+    journal.close()
+
+    restored = []
+    for window in windows.values():
+        tabs = sorted(window["tabs"].values(), key=lambda tab: tab.get("index", 0))
+        if tabs:
+            restored.append({"tabs": tabs, "active": window["active"]})
+    return restored
+
+
+class SessionStore(QObject):
+    _shared = None
+
+    @classmethod
+    def shared(cls):
+        """Journal único do processo, compartilhado por todas as janelas"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, path=SESSION_PATH, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.saved_windows = read_journal(path)
+        self._ids = itertools.count(1)
+        self._windows = {}
+        # window_id -> session_ids das abas alteradas, ou None para todas as abas da janela
+        self._dirty = {}
+        self._dirty_active = set()
+        # Última linha gravada de cada aba e da aba ativa de cada janela: o estado que a compactação reescreve
+        self._tab_lines = {}
+        self._active_lines = {}
+        self._compact()
+        self._journal = open(path, "a", encoding="utf-8")
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.flush)
+        self._timer.start(FLUSH_INTERVAL)
+
+    def _snapshot_lines(self):
+        lines = []
+        for window_id, window in enumerate(self.saved_windows, 1):
+            lines.append(json.dumps({"op": "window", "window": -window_id}) + "\n")
+            for tab in window["tabs"]:
+                lines.append(json.dumps(dict(tab, window=-window_id)) + "\n")
+            if window["active"] is not None:
+                lines.append(json.dumps({"op": "active", "window": -window_id, "tab": window["active"]}) + "\n")
+        for window_id in self._windows:
+            lines.append(json.dumps({"op": "window", "window": window_id}) + "\n")
+            lines.extend(line for owner, line in self._tab_lines.values() if owner == window_id)
+            if window_id in self._active_lines:
+                lines.append(self._active_lines[window_id])
+        return lines
+
+    def _compact(self):
+        """Reescreve o journal só com o estado atual, de forma atômica"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as journal:
+            journal.writelines(self._snapshot_lines())
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _compact_if_large(self):
+        live = sum(len(line) for _, line in self._tab_lines.values())
+        if self._journal.tell() <= max(COMPACT_MIN_BYTES, COMPACT_RATIO * live):
+            return
+        self._journal.close()
+        self._compact()
+        self._journal = open(self.path, "a", encoding="utf-8")
+
+    def _append(self, record):
+        line = json.dumps(record) + "\n"
+        self._journal.write(line)
+        return line
+
+    def take_saved_windows(self):
+        """Entrega as janelas salvas uma única vez e as marca como substituídas"""
+        windows, self.saved_windows = self.saved_windows, []
+        for window_id in range(1, len(windows) + 1):
+            self._append({"op": "close_window", "window": -window_id})
+        return windows
+
+    def register_window(self, window):
+        window.session_id = next(self._ids)
+        self._windows[window.session_id] = window
+        self._append({"op": "window", "window": window.session_id})
+
+    def unregister_window(self, window):
+        """Esquece a janela, exceto a última: ela é o que volta na próxima execução"""
+        if len(self._windows) > 1:
+            self.flush()
+            self._windows.pop(window.session_id, None)
+            self._dirty.pop(window.session_id, None)
+            self._dirty_active.discard(window.session_id)
+            self._active_lines.pop(window.session_id, None)
+            for tab_id in [tab_id for tab_id, (owner, _) in self._tab_lines.items() if owner == window.session_id]:
+                del self._tab_lines[tab_id]
+            self._append({"op": "close_window", "window": window.session_id})
+        else:
+            self.flush()
+        self._journal.flush()
+
+    def windows(self):
+        """Janelas abertas registradas nesta sessão"""
+        return list(self._windows.values())
+
+    def register_tab(self, tab):
+        if getattr(tab, "session_id", None) is None:
+            tab.session_id = next(self._ids)
+
+    def tab_closed(self, tab):
+        if getattr(tab, "session_id", None) is not None:
+            self._tab_lines.pop(tab.session_id, None)
+            for tabs in self._dirty.values():
+                if tabs is not None:
+                    tabs.discard(tab.session_id)
+            self._append({"op": "close_tab", "tab": tab.session_id})
+
+    def mark_dirty(self, window, tab=None):
+        """Marca uma aba (ou, sem tab, todas as abas da janela, como depois de reordenar) para o próximo flush"""
+        window_id = window.session_id
+        if tab is None:
+            self._dirty[window_id] = None
+        elif getattr(tab, "session_id", None) is not None:
+            tabs = self._dirty.setdefault(window_id, set())
+            if tabs is not None:
+                tabs.add(tab.session_id)
+
+    def mark_active(self, window):
+        """A aba atual da janela mudou; só esse registro pequeno vai para o journal"""
+        self._dirty_active.add(window.session_id)
+
+    def flush(self):
+        """Grava no journal só as abas alteradas desde o último flush, e a aba ativa se ela mudou"""
+        if not self._dirty and not self._dirty_active:
+            return
+        for window_id, dirty_tabs in self._dirty.items():
+            window = self._windows.get(window_id)
+            if window is None:
+                continue
+            tabs = window.tabs
+            for index in range(tabs.count()):
+                tab = tabs.widget(index)
+                tab_id = getattr(tab, "session_id", None)
+                if tab_id is None or (dirty_tabs is not None and tab_id not in dirty_tabs):
+                    continue
+                self._tab_lines[tab_id] = (window_id, self._append(self.tab_record(window_id, index, tab)))
+        for window_id in self._dirty_active | set(self._dirty):
+            window = self._windows.get(window_id)
+            current = window.tabs.currentWidget() if window is not None else None
+            if getattr(current, "session_id", None) is not None:
+                self._active_lines[window_id] = self._append(
+                    {"op": "active", "window": window_id, "tab": current.session_id})
+        self._dirty.clear()
+        self._dirty_active.clear()
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._compact_if_large()
+
+    def tab_record(self, window_id, index, tab):
+        if isinstance(tab, TabPlaceholder):
+            history = tab.history_data
+            scroll = tab.scroll
+        else:
+            history = serialize_history(tab.history())
+            position = tab.page().scrollPosition()
+            scroll = [position.x(), position.y()]
+        return {
+            "op": "tab",
+            "window": window_id,
+            "tab": tab.session_id,
+            "index": index,
+            "url": tab.url().toString(),
+            "title": tab.title(),
+            "history": base64.b64encode(history).decode("ascii"),
+            "scroll": scroll
+        }
+
+    @staticmethod
+    def placeholder_from_record(record):
+        """Cria a aba preguiçosa de um registro salvo; o QWebEngineView só nasce na ativação"""
+        return TabPlaceholder(
+            record["url"],
+            record.get("title", ""),
+            history=base64.b64decode(record.get("history", "")),
+            scroll=record.get("scroll", [0, 0])
+        )
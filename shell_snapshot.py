@@ -0,0 +1,180 @@
+import os
+import json
+import time
+import shutil
+import urllib.error
+import urllib.parse
+import urllib.request
+from html.parser import HTMLParser
+
+CURRENT_FILE = "current.json"
+KEEP_VERSIONS = 2
+TIMEOUT = 15
+USER_AGENT = "ClowBrowser/1.0 (LaçarOS Inside)"
+
+
+def file_name(path):
+    """Nome plano no disco para um caminho do shell; não deixa o caminho sair do diretório da versão"""
+    return urllib.parse.quote(path, safe="") or "index"
+
+
+class SubresourceParser(HTMLParser):
+    """Coleta os recursos referenciados pelo HTML (folhas de estilo, scripts, imagens, ícones)"""
+
+    ATTRIBUTES = {"link": "href", "script": "src", "img": "src", "source": "src"}
+
+    def __init__(self):
+        super().__init__()
+        self.references = []
+
+    def handle_starttag(self, tag, attrs):
+        attribute = self.ATTRIBUTES.get(tag)
+        value = dict(attrs).get(attribute) if attribute else None
+        if value:
+            self.references.append(value)
+
+
+def subresources(document, document_url, base):
+    """Caminhos, relativos a base, dos recursos do documento que moram na mesma origem"""
+    parser = SubresourceParser()
+    try:
+        parser.feed(document.decode("utf-8", "replace"))
+    except AssertionError:
+        return set()
+    paths = set()
+    for reference in parser.references:
+        url = urllib.parse.urldefrag(urllib.parse.urljoin(document_url, reference))[0]
+        url = url.split("?", 1)[0]
+        if url.startswith(base) and len(url) > len(base):
+            paths.add(url[len(base):])
+    return paths
+
+
+def fetch(url, validators=None):
+    """GET condicional; devolve (status, corpo, metadados) com status 304 quando nada mudou"""
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    if validators:
+        if validators.get("etag"):
+            request.add_header("If-None-Match", validators["etag"])
+        if validators.get("last_modified"):
+            request.add_header("If-Modified-Since", validators["last_modified"])
+    try:
+        with urllib.request.urlopen(request, timeout=TIMEOUT) as response:
+            body = response.read()
+            headers = response.headers
+            status = response.status
+    except urllib.error.HTTPError as error:
+        if error.code == 304:
+            return 304, None, validators
+        raise
+    metadata = {
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "content_type": headers.get("Content-Type", "application/octet-stream").split(";")[0].strip(),
+    }
+    return status, body, metadata
+
+
+class ShellSnapshot:
+    """Versões do shell no disco: diretórios v<N> imutáveis e current.json apontando para a ativa.
+
+    Uma versão nova é gravada inteira antes de current.json ser trocado com os.replace, então
+    quem lê sempre vê uma versão completa, nunca metade de uma atualização.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.current = self._load_current()
+
+    def _load_current(self):
+        try:
+            with open(os.path.join(self.directory, CURRENT_FILE), encoding="utf-8") as current:
+                manifest = json.load(current)
+        except (OSError, ValueError):
+            return None
+        if not os.path.isdir(self.version_directory(manifest["version"])):
+            return None
+        return manifest
+
+    def version_directory(self, version):
+        return os.path.join(self.directory, f"v{version}")
+
+    def read(self, path, manifest=None):
+        """(tipo, bytes) do caminho na versão dada (ou na atual); None se não estiver guardado"""
+        manifest = manifest or self.current
+        if not manifest or path not in manifest["files"]:
+            return None
+        try:
+            with open(os.path.join(self.version_directory(manifest["version"]), file_name(path)), "rb") as data:
+                return manifest["files"][path]["content_type"], data.read()
+        except OSError:
+            return None
+
+    def publish(self, files, contents):
+        """Grava uma versão nova com contents {caminho: bytes} e troca current.json atomicamente"""
+        version = (self.current["version"] if self.current else 0) + 1
+        final = self.version_directory(version)
+        staging = final + ".tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        for path, body in contents.items():
+            with open(os.path.join(staging, file_name(path)), "wb") as data:
+                data.write(body)
+        shutil.rmtree(final, ignore_errors=True)
+        os.replace(staging, final)
+
+        manifest = {"version": version, "published": time.time(), "files": files}
+        pointer = os.path.join(self.directory, CURRENT_FILE)
+        with open(pointer + ".tmp", "w", encoding="utf-8") as current:
+            json.dump(manifest, current)
+            current.flush()
+            os.fsync(current.fileno())
+        os.replace(pointer + ".tmp", pointer)
+        self.current = manifest
+        self._prune(version)
+        return manifest
+
+    def _prune(self, version):
+        # A versão anterior fica para respostas que ainda estejam lendo dela
+        for name in os.listdir(self.directory):
+            if name.startswith("v") and name[1:].isdigit() and int(name[1:]) <= version - KEEP_VERSIONS:
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+
+def refresh(snapshot, base, entry, manifest, wanted=()):
+    """Confere cada arquivo na origem com GET condicional, seguindo os recursos de cada HTML.
+
+    Devolve (arquivos, conteúdos) para snapshot.publish quando algo mudou, None quando a versão
+    atual continua valendo; erros de rede sobem como OSError.
+    """
+    old_files = manifest["files"] if manifest else {}
+    paths = [entry] + sorted((set(old_files) | set(wanted)) - {entry})
+    files, contents, changed, seen = {}, {}, False, set()
+    while paths:
+        path = paths.pop(0)
+        if path in seen:
+            continue
+        seen.add(path)
+        try:
+            status, body, metadata = fetch(base + path, old_files.get(path))
+        except urllib.error.HTTPError as error:
+            if error.code not in (404, 410) or path == entry:
+                raise
+            # Sumiu da origem: sai da próxima versão
+            changed = changed or path in old_files
+            continue
+        stored = snapshot.read(path, manifest)
+        if status == 304 and stored is None:
+            # Validadores de um arquivo que não está mais no disco: baixa de novo
+            status, body, metadata = fetch(base + path)
+        if status == 304:
+            body = stored[1]
+        else:
+            changed = changed or stored is None or stored[1] != body
+        files[path], contents[path] = metadata, body
+        if metadata["content_type"] == "text/html":
+            paths.extend(sorted(subresources(body, base + path, base) - seen))
+    if changed or set(files) != set(old_files):
+        return files, contents
+    return None
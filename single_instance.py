@@ -0,0 +1,171 @@
+import os
+import sys
+import json
+import time
+import getpass
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+CONNECT_TIMEOUT = 100
+ACK_TIMEOUT = 2000
+# Modos que são ferramentas de linha de comando e sempre rodam num processo próprio
+LOCAL_ONLY_FLAGS = (
+    "--new-instance", "--batch", "--cache-", "--rendering-report", "--trace-startup",
+    "--exit-after-startup", "-h", "--help",
+)
+# Flags que configuram o motor ao iniciar; a instância em execução já escolheu as dela
+ENGINE_FLAGS = ("--rendering", "--process-model", "--renderer-limit")
+# Opções que o próprio Qt lê de argv (com e sem valor); aceitas com - ou --
+QT_VALUE_OPTIONS = {
+    "platform", "platformpluginpath", "platformtheme", "plugin", "qmljsdebugger", "session",
+    "qwindowgeometry", "qwindowicon", "qwindowtitle", "display", "geometry", "name", "title",
+    "style", "stylesheet",
+}
+QT_FLAG_OPTIONS = {"reverse", "widgetcount", "nograb", "dograb", "sync"}
+
+
+def server_name(app):
+    """Nome do socket local, um por usuário e por variante do navegador"""
+    try:
+        user = getpass.getuser()
+    except (KeyError, OSError):
+        user = str(os.getuid()) if hasattr(os, "getuid") else "user"
+    return f"clowbrowser-{app}-{user}"
+
+
+def split_qt_args(args):
+    """Separa as opções do Qt (e os valores delas) do resto, para o argparse não tomá-las por URLs.
+
+    "-platform offscreen exemplo.com" devolve (["-platform", "offscreen"], ["exemplo.com"]).
+    """
+    qt_args, rest = [], []
+    position = 0
+    while position < len(args):
+        arg = args[position]
+        position += 1
+        if arg == "--":
+            rest.extend(args[position - 1:])
+            break
+        name = arg.lstrip("-").split("=", 1)[0] if arg.startswith("-") else None
+        if name in QT_VALUE_OPTIONS:
+            qt_args.append(arg)
+            if "=" not in arg and position < len(args):
+                qt_args.append(args[position])
+                position += 1
+        elif name in QT_FLAG_OPTIONS:
+            qt_args.append(arg)
+        else:
+            rest.append(arg)
+    return qt_args, rest
+
+
+def should_forward(argv):
+    return not any(arg.startswith(LOCAL_ONLY_FLAGS) for arg in argv[1:])
+
+
+def engine_flags(argv):
+    """Flags de motor presentes em argv, que não fazem sentido entregues a uma instância já aberta"""
+    return [arg.split("=", 1)[0] for arg in argv[1:]
+            if arg in ENGINE_FLAGS or arg.startswith(tuple(flag + "=" for flag in ENGINE_FLAGS))]
+
+
+def running(name, timeout=CONNECT_TIMEOUT):
+    """Se alguma instância atende no nome"""
+    probe = QLocalSocket()
+    probe.connectToServer(name)
+    if not probe.waitForConnected(timeout):
+        return False
+    probe.disconnectFromServer()
+    return True
+
+
+def forward(name, argv, timeout=CONNECT_TIMEOUT):
+    """Entrega argv à instância em execução; devolve a latência até a confirmação em segundos, ou None.
+
+    Roda antes de qualquer QApplication e sem laço de eventos: só chamadas bloqueantes do QLocalSocket.
+    """
+    started = time.perf_counter()
+    socket = QLocalSocket()
+    socket.connectToServer(name)
+    if not socket.waitForConnected(timeout):
+        return None
+    message = {"argv": argv[1:], "cwd": os.getcwd()}
+    socket.write(json.dumps(message).encode("utf-8") + b"\n")
+    socket.waitForBytesWritten(timeout)
+    # Sem confirmação a mensagem já foi entregue; só a medida de latência fica de fora
+    acknowledged = socket.waitForReadyRead(ACK_TIMEOUT) and socket.readLine().trimmed() == b"ok"
+    socket.disconnectFromServer()
+    return time.perf_counter() - started if acknowledged else float("nan")
+
+
+def forward_or_continue(app, argv=None):
+    """Sai do processo se outra instância aceitar a abertura; senão volta e a inicialização segue"""
+    argv = sys.argv if argv is None else argv
+    if not should_forward(argv):
+        return
+    flags = engine_flags(argv)
+    if flags:
+        if running(server_name(app)):
+            print(f"{', '.join(flags)} só vale ao iniciar o navegador, e ele já está aberto; "
+                  "feche-o ou use --new-instance", file=sys.stderr)
+            sys.exit(2)
+        return
+    latency = forward(server_name(app), argv)
+    if latency is None:
+        return
+    if os.environ.get("CLOWBROWSER_HANDOFF_REPORT"):
+        print(f"Entregue à instância em execução em {latency * 1000:.1f} ms", file=sys.stderr)
+    sys.exit(0)
+
+
+class SingleInstanceServer(QObject):
+    """Escuta o socket local e emite received(argv, cwd) para cada abertura vinda de outra execução"""
+
+    received = pyqtSignal(list, str)
+
+    def __init__(self, app, parent=None):
+        super().__init__(parent)
+        self.name = server_name(app)
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self._on_new_connection)
+        self._buffers = {}
+
+    def listen(self):
+        """Assume o nome se nenhuma instância atende nele; devolve False se outra já escuta"""
+        # Com UserAccessOption o Qt troca o arquivo do socket por rename e tomaria o nome de uma
+        # instância viva, então pergunta antes; o que sobrar sem resposta é órfão de uma execução que caiu
+        if running(self.name):
+            return False
+        QLocalServer.removeServer(self.name)
+        return self.server.listen(self.name)
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self._buffers[socket] = b""
+            socket.readyRead.connect(lambda socket=socket: self._on_ready_read(socket))
+            socket.disconnected.connect(lambda socket=socket: self._on_disconnected(socket))
+
+    def _on_ready_read(self, socket):
+        self._buffers[socket] += bytes(socket.readAll())
+        if b"\n" not in self._buffers[socket]:
+            return
+        line, _, self._buffers[socket] = self._buffers[socket].partition(b"\n")
+        try:
+            message = json.loads(line.decode("utf-8"))
+            argv, cwd = list(message["argv"]), str(message["cwd"])
+        except (ValueError, KeyError, TypeError):
+            socket.disconnectFromServer()
+            return
+        # Confirma antes de abrir janelas: a outra execução já pode sair
+        socket.write(b"ok\n")
+        socket.flush()
+        self.received.emit(argv, cwd)
+
+    def _on_disconnected(self, socket):
+        self._buffers.pop(socket, None)
+        socket.deleteLater()
+
+    def close(self):
+        self.server.close()
@@ -0,0 +1,280 @@
+import os
+import json
+import time
+import statistics
+import collections
+from PyQt5.QtCore import QObject, QTimer, QUrl
+from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineScript
+
+MAX_ACTIVE = 2
+HOVER_PRECONNECT_DELAY = 50
+HOVER_PREFETCH_DELAY = 300
+TYPING_DELAY = 150
+# Sockets ociosos do Chromium duram uns 10 s; depois disso a especulação não ajuda mais
+PRECONNECT_TTL = 10.0
+PREFETCH_TTL = 60.0
+TTFB_SAMPLES = 500
+# Página interna e oculta que recebe as dicas do que foi digitado: nenhum site vê o documento dela
+HINT_PAGE_URL = QUrl("kiti://speculation")
+
+# As dicas são elementos <link> num documento; o Chromium abre a conexão (ou baixa para o cache)
+# e a navegação seguinte reaproveita. Remover o elemento cancela a dica. Só links que a própria
+# página já tem (hover) entram no DOM dela; o que o usuário digita vai para a página interna.
+HINT_SCRIPT = """
+(function (hints) {
+    var head = document.head || document.documentElement;
+    if (!head) {
+        return;
+    }
+    var wanted = {};
+    hints.forEach(function (hint) { wanted[hint.rel + " " + hint.href] = hint; });
+    Array.prototype.forEach.call(document.querySelectorAll("link[data-kiti-speculation]"), function (link) {
+        var key = link.rel + " " + link.href;
+        if (wanted[key]) {
+            delete wanted[key];
+        } else {
+            link.remove();
+        }
+    });
+    Object.keys(wanted).forEach(function (key) {
+        var link = document.createElement("link");
+        link.rel = wanted[key].rel;
+        link.href = wanted[key].href;
+        link.setAttribute("data-kiti-speculation", "");
+        head.appendChild(link);
+    });
+})(%s);
+"""
+
+TRANSFER_SIZE_SCRIPT = """
+(function (url) {
+    var entry = performance.getEntriesByName(url)[0];
+    return entry ? entry.transferSize : 0;
+})(%s)
+"""
+
+
+def enabled():
+    """CLOWBROWSER_SPECULATION=off desliga tudo, para comparar o TTFB com e sem"""
+    return os.environ.get("CLOWBROWSER_SPECULATION", "on").lower() not in ("0", "off", "no")
+
+
+def origin_of(url):
+    if url.scheme() not in ("http", "https") or not url.host():
+        return None
+    return url.adjusted(QUrl.RemovePath | QUrl.RemoveQuery | QUrl.RemoveFragment
+                        | QUrl.RemoveUserInfo).toString()
+
+
+class Speculation:
+    __slots__ = ("kind", "target", "page", "started", "used")
+
+    def __init__(self, kind, target, page):
+        self.kind = kind
+        self.target = target
+        self.page = page
+        self.started = time.monotonic()
+        self.used = False
+
+    def ttl(self):
+        return PRECONNECT_TTL if self.kind == "preconnect" else PREFETCH_TTL
+
+
+class SpeculationEngine(QObject):
+    """Preconnect/prefetch do alvo provável do hover ou da barra de endereço, com estatísticas de acerto"""
+
+    _shared = None
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, max_active=MAX_ACTIVE, parent=None):
+        super().__init__(parent)
+        self.enabled = enabled()
+        self.max_active = max_active
+        self.hits = collections.Counter()
+        self.misses = collections.Counter()
+        self.wasted_bytes = 0
+        self.ttfb = {"hit": collections.deque(maxlen=TTFB_SAMPLES), "miss": collections.deque(maxlen=TTFB_SAMPLES)}
+        self._active = collections.OrderedDict()
+        self._navigations = {}
+        self._hovered = None
+
+        self._preconnect_timer = QTimer(self)
+        self._preconnect_timer.setSingleShot(True)
+        self._preconnect_timer.setInterval(HOVER_PRECONNECT_DELAY)
+        self._preconnect_timer.timeout.connect(lambda: self._speculate_hover("preconnect"))
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(HOVER_PREFETCH_DELAY)
+        self._prefetch_timer.timeout.connect(lambda: self._speculate_hover("prefetch"))
+        self._typing_timer = QTimer(self)
+        self._typing_timer.setSingleShot(True)
+        self._typing_timer.setInterval(TYPING_DELAY)
+        self._typing_timer.timeout.connect(self._speculate_typed)
+        self._typed = None
+        self._hint_page = None
+        self._hint_page_ready = False
+        self._expiry_timer = QTimer(self)
+        self._expiry_timer.setInterval(int(PRECONNECT_TTL * 1000))
+        self._expiry_timer.timeout.connect(self.expire)
+        self._expiry_timer.start()
+
+    def hovered(self, page, url):
+        """linkHovered da página: preconnect logo, prefetch se o mouse ficar parado no link"""
+        if not self.enabled:
+            return
+        self._preconnect_timer.stop()
+        self._prefetch_timer.stop()
+        if url.isEmpty() or origin_of(url) is None:
+            self._hovered = None
+            return
+        self._hovered = (page, url.adjusted(QUrl.RemoveFragment))
+        self._preconnect_timer.start()
+        self._prefetch_timer.start()
+
+    def typed(self, profile, url):
+        """Palpite da barra de endereço (texto digitado ou sugestão do histórico): só preconnect.
+
+        A dica sai da página interna oculta do mesmo perfil, que divide o pool de conexões com as
+        abas; no DOM da aba atual o site poderia ler o que está sendo digitado.
+        """
+        if not self.enabled or url is None or origin_of(url) is None:
+            return
+        self._typed = (self.hint_page(profile), url)
+        self._typing_timer.start()
+
+    def hint_page(self, profile):
+        if self._hint_page is None or self._hint_page.profile() is not profile:
+            self._hint_page = QWebEnginePage(profile, self)
+            self._hint_page_ready = False
+            self._hint_page.loadFinished.connect(self._on_hint_page_loaded)
+            self._hint_page.setUrl(HINT_PAGE_URL)
+        return self._hint_page
+
+    def _on_hint_page_loaded(self, ok):
+        self._hint_page_ready = ok
+        if ok:
+            self._apply(self._hint_page)
+
+    def _speculate_hover(self, kind):
+        if self._hovered is not None:
+            page, url = self._hovered
+            self.speculate(page, kind, url)
+
+    def _speculate_typed(self):
+        if self._typed is not None:
+            page, url = self._typed
+            self._typed = None
+            self.speculate(page, "preconnect", url)
+
+    def speculate(self, page, kind, url):
+        target = origin_of(url) if kind == "preconnect" else url.toString()
+        if target is None:
+            return
+        key = (kind, target)
+        if key in self._active:
+            self._active.move_to_end(key)
+            return
+        self._active[key] = Speculation(kind, target, page)
+        # Palpite novo empurra o mais antigo para fora: no máximo max_active dicas vivas
+        while len(self._active) > self.max_active:
+            _, dropped = self._active.popitem(last=False)
+            self._account_unused(dropped)
+        self._apply(page)
+
+    def _apply(self, page):
+        if page is self._hint_page and not self._hint_page_ready:
+            # Aplicado de novo quando a página interna terminar de carregar
+            return
+        hints = [{"rel": speculation.kind, "href": speculation.target}
+                 for speculation in self._active.values() if speculation.page is page]
+        try:
+            page.runJavaScript(HINT_SCRIPT % json.dumps(hints), QWebEngineScript.ApplicationWorld)
+        except RuntimeError:
+            # A página foi destruída enquanto a dica esperava
+            pass
+
+    def navigating(self, page, url):
+        """Chamado em toda navegação principal; decide se alguma especulação acertou"""
+        if url.scheme() not in ("http", "https"):
+            return
+        now = time.monotonic()
+        exact = url.adjusted(QUrl.RemoveFragment).toString()
+        origin = origin_of(url)
+        hit = None
+        for key in (("prefetch", exact), ("preconnect", origin)):
+            speculation = self._active.get(key)
+            if speculation is not None and now - speculation.started <= speculation.ttl():
+                speculation.used = True
+                hit = speculation.kind
+                break
+        if hit:
+            self.hits[hit] += 1
+        else:
+            self.misses["navigation"] += 1
+        self._navigations[id(page)] = "hit" if hit else "miss"
+
+    def record_ttfb(self, page, timing):
+        """TTFB da navegação que acabou de carregar, separado entre acertos e erros"""
+        outcome = self._navigations.pop(id(page), None)
+        if outcome is None or not timing or timing.get("ttfb") is None:
+            return
+        self.ttfb[outcome].append(timing["ttfb"])
+
+    def expire(self):
+        """Tira as dicas vencidas; prefetch não usado conta os bytes que baixou como desperdício"""
+        now = time.monotonic()
+        pages = set()
+        for key, speculation in list(self._active.items()):
+            if now - speculation.started > speculation.ttl():
+                del self._active[key]
+                self._account_unused(speculation)
+                pages.add(speculation.page)
+        for page in pages:
+            self._apply(page)
+
+    def _account_unused(self, speculation):
+        if speculation.used:
+            return
+        self.misses[speculation.kind] += 1
+        if speculation.kind != "prefetch":
+            return
+
+        def add_waste(size):
+            self.wasted_bytes += int(size or 0)
+        try:
+            speculation.page.runJavaScript(TRANSFER_SIZE_SCRIPT % json.dumps(speculation.target),
+                                           QWebEngineScript.ApplicationWorld, add_waste)
+        except RuntimeError:
+            pass
+
+    def forget(self, page_key):
+        """Esquece uma página destruída; recebe id(página), já que o objeto não existe mais"""
+        self._navigations.pop(page_key, None)
+        for key, speculation in list(self._active.items()):
+            if id(speculation.page) == page_key:
+                del self._active[key]
+        if self._hovered is not None and id(self._hovered[0]) == page_key:
+            self._hovered = None
+        if self._typed is not None and id(self._typed[0]) == page_key:
+            self._typed = None
+
+    def summary(self):
+        """Números para ajuste: acertos por tipo, especulações perdidas, bytes desperdiçados e TTFB"""
+        navigations = sum(self.hits.values()) + self.misses["navigation"]
+        lines = [
+            f"Especulação {'ligada' if self.enabled else 'desligada'}: "
+            f"{sum(self.hits.values())} de {navigations} navegações acertadas "
+            f"(preconnect {self.hits['preconnect']}, prefetch {self.hits['prefetch']})",
+            f"Dicas não usadas: preconnect {self.misses['preconnect']}, prefetch {self.misses['prefetch']}; "
+            f"{self.wasted_bytes / 1024:.0f} KB baixados à toa",
+        ]
+        for outcome, label in (("hit", "com acerto"), ("miss", "sem acerto")):
+            samples = self.ttfb[outcome]
+            if samples:
+                lines.append(f"TTFB mediano {label}: {statistics.median(samples):.0f} ms ({len(samples)} cargas)")
+        return lines
@@ -0,0 +1,114 @@
+import os
+import sys
+import json
+import time
+import contextlib
+from PyQt5.QtCore import QObject, QEvent
+from PyQt5.QtWidgets import QApplication, QWidget
+
+DEFAULT_TRACE_PATH = "startup-trace.json"
+
+_trace = None
+
+
+class StartupTrace(QObject):
+    """Marca fases da inicialização até o primeiro loadFinished e a primeira pintura"""
+
+    def __init__(self, path, exit_when_done=False):
+        super().__init__()
+        self.path = path
+        self.exit_when_done = exit_when_done
+        self.origin = time.monotonic_ns()
+        self.events = []
+        self.browser = None
+        self.done = False
+
+    def now(self):
+        return (time.monotonic_ns() - self.origin) // 1000
+
+    def record(self, name, start, end=None):
+        event = {"name": name, "pid": os.getpid(), "tid": 0, "ts": start}
+        if end is None:
+            event.update(ph="i", s="g")
+        else:
+            event.update(ph="X", dur=end - start)
+        self.events.append(event)
+
+    def watch(self, browser):
+        """Acompanha a primeira aba até carregar e pintar"""
+        self.browser = browser
+        browser.loadStarted.connect(self._on_load_started)
+        browser.loadFinished.connect(self._on_load_finished)
+        QApplication.instance().installEventFilter(self)
+
+    def _first(self, name):
+        return any(event["name"] == name for event in self.events)
+
+    def _on_load_started(self):
+        if not self._first("loadStarted"):
+            self.record("loadStarted", self.now())
+
+    def _on_load_finished(self, ok):
+        if not self._first("first loadFinished"):
+            self.record("first loadFinished", self.now())
+            self._maybe_finish()
+
+    def eventFilter(self, obj, event):
+        if (event.type() == QEvent.Paint and isinstance(obj, QWidget)
+                and self.browser is not None and self.browser.isAncestorOf(obj)
+                and not self._first("first paint")):
+            self.record("first paint", self.now())
+            self._maybe_finish()
+        return False
+
+    def _maybe_finish(self):
+        if self.done or not (self._first("first loadFinished") and self._first("first paint")):
+            return
+        self.done = True
+        QApplication.instance().removeEventFilter(self)
+        self.write()
+        self.print_summary()
+        if self.exit_when_done:
+            QApplication.instance().quit()
+
+    def write(self):
+        with open(self.path, "w", encoding="utf-8") as trace_file:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, trace_file)
+
+    def print_summary(self):
+        print("Inicialização (ms desde o início de main):", file=sys.stderr)
+        for event in sorted(self.events, key=lambda event: event["ts"]):
+            if event["ph"] == "X":
+                print(f"  {event['name']:<32} {event['ts'] / 1000:9.1f}  +{event['dur'] / 1000:.1f}",
+                      file=sys.stderr)
+            else:
+                print(f"  {event['name']:<32} {event['ts'] / 1000:9.1f}", file=sys.stderr)
+        print(f"Trace gravado em {self.path}", file=sys.stderr)
+
+
+def start(path=DEFAULT_TRACE_PATH, exit_when_done=False):
+    global _trace
+    _trace = StartupTrace(path, exit_when_done)
+    return _trace
+
+
+def active():
+    return _trace is not None and not _trace.done
+
+
+@contextlib.contextmanager
+def phase(name):
+    """Mede uma fase da inicialização; não faz nada se o trace não estiver ligado"""
+    if not active():
+        yield
+        return
+    begin = _trace.now()
+    try:
+        yield
+    finally:
+        _trace.record(name, begin, _trace.now())
+
+
+def watch(browser):
+    if active():
+        _trace.watch(browser)
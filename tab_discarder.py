@@ -0,0 +1,140 @@
+import os
+import time
+from PyQt5.QtCore import QObject, QTimer, QUrl, QByteArray, QDataStream, QIODevice
+from PyQt5.QtGui import QIcon
+from PyQt5.QtWidgets import QWidget
+
+DEFAULT_MEMORY_BUDGET = 1024 * 1024 * 1024
+DEFAULT_TAB_COST = 80 * 1024 * 1024
+DEFAULT_CHECK_INTERVAL = 30 * 1000
+
+
+def serialize_history(history):
+    """Serializa o QWebEngineHistory de uma aba em bytes"""
+    data = QByteArray()
+    stream = QDataStream(data, QIODevice.WriteOnly)
+    stream << history
+    return bytes(data)
+
+
+def restore_history(history, data):
+    """Restaura um QWebEngineHistory a partir de bytes serializados"""
+    stream = QDataStream(QByteArray(data), QIODevice.ReadOnly)
+    stream >> history
+
+
+def renderer_rss(pid):
+    """Lê o RSS de um processo renderizador em /proc; retorna 0 se indisponível"""
+    if not pid:
+        return 0
+    try:
+        with open(f"/proc/{pid}/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class TabPlaceholder(QWidget):
+    """Aba sem renderizador: guarda só URL, título, ícone e histórico serializado"""
+
+    def __init__(self, url, title="", icon=None, history=b"", scroll=None, parent=None):
+        super().__init__(parent)
+        self._url = QUrl(url)
+        self._title = title
+        self._icon = icon if icon is not None else QIcon()
+        self.history_data = history
+        self.scroll = scroll or [0, 0]
+
+    def url(self):
+        return self._url
+
+    def title(self):
+        return self._title
+
+    def icon(self):
+        return self._icon
+
+
+class TabDiscarder(QObject):
+    def __init__(self, window, budget=None, interval=DEFAULT_CHECK_INTERVAL):
+        super().__init__(window)
+        self.window = window
+        if budget is None:
+            budget = int(os.environ.get("CLOWBROWSER_TAB_MEMORY_MB", 0)) * 1024 * 1024
+        self.budget = budget or DEFAULT_MEMORY_BUDGET
+        self.discarded_count = 0
+        self.reclaimed_bytes = 0
+        # Por tab_id do TabRegistry, como o TabFreezer
+        self._last_focus = {}
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.enforce_budget)
+        self._timer.start(interval)
+
+    def touch(self, tab):
+        """Registra o momento em que a aba recebeu foco"""
+        self._last_focus[tab.tab_id] = time.monotonic()
+
+    def forget(self, tab):
+        self._last_focus.pop(tab.tab_id, None)
+
+    def tab_memory(self, tab, sharing):
+        """Estima a memória de uma aba dividindo o RSS do renderizador entre as abas que o usam"""
+        pid = tab.page().renderProcessPid()
+        rss = renderer_rss(pid)
+        if not rss:
+            return DEFAULT_TAB_COST
+        return rss // max(1, sharing.get(pid, 1))
+
+    def enforce_budget(self):
+        """Descarta abas em segundo plano, da menos recentemente focada, até caber no orçamento"""
+        tabs = self.window.tabs
+        current = tabs.currentWidget()
+        live = [tabs.widget(i) for i in range(tabs.count())]
+        live = [tab for tab in live if tab is not None and not isinstance(tab, TabPlaceholder)]
+
+        pids = {id(tab): tab.page().renderProcessPid() for tab in live}
+        sharing = {}
+        for pid in pids.values():
+            sharing[pid] = sharing.get(pid, 0) + 1
+        costs = {id(tab): self.tab_memory(tab, sharing) for tab in live}
+        used = sum(costs.values())
+        # O renderizador só libera memória quando sai a última aba que o usa
+        process_costs = {}
+        for tab in live:
+            process_costs[pids[id(tab)]] = process_costs.get(pids[id(tab)], 0) + costs[id(tab)]
+
+        candidates = sorted(
+            (tab for tab in live if tab is not current),
+            key=lambda tab: self._last_focus.get(tab.tab_id, 0.0)
+        )
+        for tab in candidates:
+            if used <= self.budget:
+                break
+            pid = pids[id(tab)]
+            if self.discard(tab):
+                sharing[pid] -= 1
+                if sharing[pid] == 0:
+                    used -= process_costs[pid]
+                    self.reclaimed_bytes += process_costs[pid]
+
+    def discard(self, tab):
+        """Troca a aba por um TabPlaceholder, liberando página e renderizador"""
+        index = self.window.tabs.indexOf(tab)
+        if index < 0 or tab is self.window.tabs.currentWidget():
+            return False
+
+        position = tab.page().scrollPosition()
+        placeholder = TabPlaceholder(
+            tab.url(),
+            tab.page().title(),
+            tab.icon(),
+            serialize_history(tab.history()),
+            [position.x(), position.y()]
+        )
+        self.window.replace_tab_widget(index, placeholder)
+        self.forget(tab)
+        self.window.freezer.forget(tab)
+        tab.deleteLater()
+        self.discarded_count += 1
+        return True
@@ -0,0 +1,86 @@
+import os
+import time
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtWebEngineWidgets import QWebEnginePage
+
+from tab_discarder import TabPlaceholder
+
+DEFAULT_FREEZE_AFTER = 60
+DEFAULT_CHECK_INTERVAL = 10 * 1000
+
+
+def freeze_delay():
+    """Segundos em segundo plano até congelar, de CLOWBROWSER_FREEZE_AFTER; 0 desliga o congelamento"""
+    try:
+        return max(0.0, float(os.environ.get("CLOWBROWSER_FREEZE_AFTER", DEFAULT_FREEZE_AFTER)))
+    except ValueError:
+        return float(DEFAULT_FREEZE_AFTER)
+
+
+def freeze_allowlist():
+    """Hosts que nunca congelam (e seus subdomínios), de CLOWBROWSER_FREEZE_ALLOWLIST separados por vírgula"""
+    hosts = os.environ.get("CLOWBROWSER_FREEZE_ALLOWLIST", "")
+    return tuple(host.strip().lower() for host in hosts.split(",") if host.strip())
+
+
+class TabFreezer(QObject):
+    """Congela abas escondidas há mais que o prazo: timers, animações e mídia param até a aba voltar"""
+
+    def __init__(self, window, delay=None, allowlist=None, interval=DEFAULT_CHECK_INTERVAL):
+        super().__init__(window)
+        self.window = window
+        self.delay = freeze_delay() if delay is None else delay
+        self.allowlist = freeze_allowlist() if allowlist is None else tuple(allowlist)
+        self.frozen_count = 0
+        # Por tab_id do TabRegistry: id(aba) é reaproveitado pelo Python depois que a aba some
+        self._hidden_since = {}
+        self._current = None
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.freeze_hidden)
+        if self.delay:
+            self._timer.start(interval)
+
+    def touch(self, tab):
+        """A aba ficou visível: descongela na hora e marca a anterior como escondida a partir de agora"""
+        if self._current is not None and self._current is not tab:
+            self._hidden_since[self._current.tab_id] = time.monotonic()
+        self._current = tab
+        self._hidden_since.pop(tab.tab_id, None)
+        self.thaw(tab)
+
+    def forget(self, tab):
+        self._hidden_since.pop(tab.tab_id, None)
+        if self._current is tab:
+            self._current = None
+
+    def thaw(self, tab):
+        page = tab.page()
+        if page.lifecycleState() != QWebEnginePage.LifecycleState.Active:
+            page.setLifecycleState(QWebEnginePage.LifecycleState.Active)
+
+    def exempt(self, tab):
+        page = tab.page()
+        if page.recentlyAudible() or tab.state.loading:
+            return True
+        host = tab.url().host().lower()
+        return any(host == allowed or host.endswith("." + allowed) for allowed in self.allowlist)
+
+    def freeze_hidden(self):
+        """Congela as abas escondidas além do prazo que não estão tocando áudio nem na lista de exceções"""
+        now = time.monotonic()
+        tabs = self.window.tabs
+        current = tabs.currentWidget()
+        for index in range(tabs.count()):
+            tab = tabs.widget(index)
+            if tab is None or tab is current or isinstance(tab, TabPlaceholder):
+                continue
+            # Abas que nunca ficaram visíveis (restauradas, abertas em segundo plano) contam desde já
+            hidden_since = self._hidden_since.setdefault(tab.tab_id, now)
+            if now - hidden_since < self.delay:
+                continue
+            page = tab.page()
+            if page.lifecycleState() != QWebEnginePage.LifecycleState.Active or self.exempt(tab):
+                continue
+            page.setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+            self.frozen_count += 1
@@ -0,0 +1,51 @@
+import os
+from PyQt5.QtCore import QObject, QTimer
+
+DEFAULT_POOL_SIZE = 2
+REFILL_DELAY = 500
+
+
+class SpareTabPool(QObject):
+    def __init__(self, factory, size=None, parent=None):
+        super().__init__(parent)
+        self.factory = factory
+        if size is None:
+            size = int(os.environ.get("CLOWBROWSER_SPARE_TABS", DEFAULT_POOL_SIZE))
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._spares = []
+
+        self._refill_timer = QTimer(self)
+        self._refill_timer.setSingleShot(True)
+        self._refill_timer.timeout.connect(self._refill_one)
+        self.schedule_refill()
+
+    def schedule_refill(self):
+        """Agenda a reposição para quando a interface estiver ociosa"""
+        if len(self._spares) < self.size and not self._refill_timer.isActive():
+            self._refill_timer.start(REFILL_DELAY)
+
+    def _refill_one(self):
+        # Uma aba por vez, para não travar a interface enquanto o pool enche. A reserva não
+        # navega: uma página carregada aqui viraria uma entrada de "Voltar" da URL que a aba abrir
+        if len(self._spares) < self.size:
+            browser = self.factory()
+            self._spares.append(browser)
+        self.schedule_refill()
+
+    def take(self):
+        """Entrega uma aba pré-aquecida, ou cria uma na hora se o pool estiver vazio"""
+        if self._spares:
+            browser = self._spares.pop()
+            self.hits += 1
+        else:
+            browser = self.factory()
+            self.misses += 1
+        self.schedule_refill()
+        return browser
+
+    def clear(self):
+        for browser in self._spares:
+            browser.deleteLater()
+        self._spares = []
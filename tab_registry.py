@@ -0,0 +1,274 @@
+import os
+import itertools
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSortFilterProxyModel, QUrl, pyqtSignal
+from PyQt5.QtWidgets import QLineEdit, QListView, QTabWidget, QVBoxLayout, QWidget
+
+DEFAULT_STRIP_LIMIT = 150
+TabIdRole = Qt.UserRole
+
+
+def strip_limit():
+    """Acima de quantas abas a barra some e a lista virtualizada assume, de CLOWBROWSER_TAB_STRIP_LIMIT"""
+    try:
+        return max(1, int(os.environ.get("CLOWBROWSER_TAB_STRIP_LIMIT", DEFAULT_STRIP_LIMIT)))
+    except ValueError:
+        return DEFAULT_STRIP_LIMIT
+
+
+class TabRecord:
+    __slots__ = ("id", "tab", "title", "url", "haystack", "generation", "text", "icon")
+
+    def __init__(self, tab_id, tab):
+        self.id = tab_id
+        self.tab = tab
+        self.generation = 0
+        # Texto e ícone guardados enquanto a barra está escondida; None quando já estão no QTabBar
+        self.text = None
+        self.icon = None
+        self.read()
+
+    def read(self):
+        """Copia título e endereço da aba; o texto em minúsculas fica pronto para o filtro"""
+        title = self.tab.title() if hasattr(self.tab, "title") else ""
+        url = self.tab.url() if hasattr(self.tab, "url") else QUrl()
+        self.title = title or "Nova aba"
+        self.url = url.toString() if isinstance(url, QUrl) else str(url)
+        self.haystack = f"{self.title}\n{self.url}".lower()
+        self.generation += 1
+
+
+class TabRegistry(QAbstractListModel):
+    """As abas de um QTabWidget na ordem da barra, como modelo de lista.
+
+    id→aba e aba→posição são consultas em dicionário; só inserir, remover e mover abas
+    custam O(n), para renumerar as posições seguintes.
+    """
+
+    # Um contador só para o processo: o tab_id também identifica a aba no índice de texto, que é de todas as janelas
+    _ids = itertools.count(1)
+
+    def __init__(self, tabs, parent=None):
+        super().__init__(parent)
+        self.tabs = tabs
+        self._records = {}
+        self._order = []
+        self._positions = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._order)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._order):
+            return None
+        record = self._records[self._order[index.row()]]
+        if role == Qt.DisplayRole:
+            return record.title
+        if role == Qt.ToolTipRole:
+            return record.url
+        if role == Qt.DecorationRole:
+            return self.tabs.tabIcon(index.row())
+        if role == TabIdRole:
+            return record.id
+        return None
+
+    def record(self, row):
+        return self._records[self._order[row]]
+
+    def tab(self, tab_id):
+        record = self._records.get(tab_id)
+        return record.tab if record is not None else None
+
+    def index_of(self, tab):
+        return self._positions.get(getattr(tab, "tab_id", None), -1)
+
+    def _renumber(self, start):
+        for position in range(start, len(self._order)):
+            self._positions[self._order[position]] = position
+
+    def inserted(self, index):
+        tab = self.tabs.widget(index)
+        # Uma aba substituída (placeholder ↔ página) entra de novo com o mesmo id
+        tab_id = getattr(tab, "tab_id", None)
+        if tab_id is None or tab_id in self._positions:
+            tab_id = next(self._ids)
+            tab.tab_id = tab_id
+        self.beginInsertRows(QModelIndex(), index, index)
+        self._records[tab_id] = TabRecord(tab_id, tab)
+        self._order.insert(index, tab_id)
+        self._renumber(index)
+        self.endInsertRows()
+
+    def removed(self, index):
+        self.beginRemoveRows(QModelIndex(), index, index)
+        tab_id = self._order.pop(index)
+        self._records.pop(tab_id, None)
+        self._positions.pop(tab_id, None)
+        self._renumber(index)
+        self.endRemoveRows()
+
+    def moved(self, source, target):
+        self.beginMoveRows(QModelIndex(), source, source, QModelIndex(), target + (target > source))
+        self._order.insert(target, self._order.pop(source))
+        self._renumber(min(source, target))
+        self.endMoveRows()
+
+    def refresh(self, tab):
+        """A aba mudou de título, endereço ou ícone: relê e avisa só a linha dela"""
+        row = self.index_of(tab)
+        if row < 0:
+            return
+        self._records[self._order[row]].read()
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+
+class TabWidget(QTabWidget):
+    """QTabWidget com registro das abas: indexOf em O(1) e, acima do limite, a barra escondida.
+
+    O QTabBar refaz as medidas de todas as abas a cada setTabText/setTabIcon, mesmo escondido;
+    por isso, sem a barra, texto e ícone ficam no registro e só são aplicados quando ela volta.
+    As abas são encontradas pela lista virtualizada (TabSearchPanel), que só desenha as linhas visíveis.
+    """
+
+    stripVisibilityChanged = pyqtSignal(bool)
+
+    def __init__(self, parent=None, limit=None):
+        super().__init__(parent)
+        self.registry = TabRegistry(self, self)
+        self.limit = strip_limit() if limit is None else limit
+        self.tabBar().tabMoved.connect(self.registry.moved)
+
+    def indexOf(self, widget):
+        return self.registry.index_of(widget)
+
+    def tabInserted(self, index):
+        self.registry.inserted(index)
+        self._update_strip()
+
+    def tabRemoved(self, index):
+        self.registry.removed(index)
+        self._update_strip()
+
+    def setTabText(self, index, text):
+        if self.strip_visible():
+            super().setTabText(index, text)
+        elif 0 <= index < self.count():
+            self.registry.record(index).text = text
+
+    def tabText(self, index):
+        if 0 <= index < self.count() and self.registry.record(index).text is not None:
+            return self.registry.record(index).text
+        return super().tabText(index)
+
+    def setTabIcon(self, index, icon):
+        if self.strip_visible():
+            super().setTabIcon(index, icon)
+        elif 0 <= index < self.count():
+            self.registry.record(index).icon = icon
+
+    def tabIcon(self, index):
+        if 0 <= index < self.count() and self.registry.record(index).icon is not None:
+            return self.registry.record(index).icon
+        return super().tabIcon(index)
+
+    def strip_visible(self):
+        return not self.tabBar().isHidden()
+
+    def _update_strip(self):
+        visible = self.count() <= self.limit
+        if visible == self.strip_visible():
+            return
+        self.tabBar().setVisible(visible)
+        if visible:
+            for row in range(self.count()):
+                record = self.registry.record(row)
+                if record.text is not None:
+                    super().setTabText(row, record.text)
+                if record.icon is not None:
+                    super().setTabIcon(row, record.icon)
+                record.text = record.icon = None
+        self.stripVisibilityChanged.emit(visible)
+
+
+class TabFilterModel(QSortFilterProxyModel):
+    """Filtra as abas por palavras no título ou endereço, a cada tecla.
+
+    Quando a busca só cresce ("git" → "gith"), quem já ficou de fora e não mudou desde então
+    continua de fora sem comparar o texto de novo.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._query = ""
+        self._words = ()
+        self._rejected = {}
+        self._narrowing = {}
+
+    def set_query(self, text):
+        query = " ".join(text.lower().split())
+        self._narrowing = self._rejected if self._query and query.startswith(self._query) else {}
+        self._rejected = {}
+        self._query = query
+        self._words = tuple(query.split())
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self._words:
+            return True
+        record = self.sourceModel().record(source_row)
+        if self._narrowing.get(record.id) == record.generation:
+            self._rejected[record.id] = record.generation
+            return False
+        if all(word in record.haystack for word in self._words):
+            return True
+        self._rejected[record.id] = record.generation
+        return False
+
+
+class TabSearchPanel(QWidget):
+    """Lista pesquisável das abas da janela; emite o índice da aba escolhida"""
+
+    tabActivated = pyqtSignal(int)
+
+    def __init__(self, tabs, parent=None):
+        super().__init__(parent)
+        self.tabs = tabs
+        self.filter_model = TabFilterModel(self)
+        self.filter_model.setSourceModel(tabs.registry)
+
+        self.search = QLineEdit()
+        self.search.setPlaceholderText("Buscar abas por título ou endereço...")
+        self.search.setClearButtonEnabled(True)
+        self.search.textChanged.connect(self.filter_model.set_query)
+        self.search.returnPressed.connect(lambda: self.activate(self.filter_model.index(0, 0)))
+
+        self.view = QListView()
+        # Linhas de altura fixa: a view calcula o que aparece sem medir cada item
+        self.view.setUniformItemSizes(True)
+        self.view.setLayoutMode(QListView.Batched)
+        self.view.setModel(self.filter_model)
+        self.view.activated.connect(self.activate)
+        self.view.clicked.connect(self.activate)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(4, 4, 4, 4)
+        layout.addWidget(self.search)
+        layout.addWidget(self.view)
+
+        tabs.currentChanged.connect(self.select_current)
+
+    def activate(self, index):
+        if index.isValid():
+            self.tabActivated.emit(self.filter_model.mapToSource(index).row())
+
+    def select_current(self, row):
+        if row < 0 or not self.isVisible():
+            return
+        index = self.filter_model.mapFromSource(self.tabs.registry.index(row))
+        if index.isValid():
+            self.view.setCurrentIndex(index)
+            self.view.scrollTo(index)
+
+    def focus_search(self):
+        self.search.setFocus()
+        self.search.selectAll()
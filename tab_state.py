@@ -0,0 +1,64 @@
+from PyQt5.QtCore import QObject, QUrl, pyqtSignal
+from PyQt5.QtGui import QIcon
+
+FRAME_INTERVAL = 16
+
+
+class TabState(QObject):
+    """Estado de uma aba que a interface desenha; sinaliza changed(self) a cada alteração"""
+
+    changed = pyqtSignal(object)
+
+    def __init__(self, browser):
+        super().__init__(browser)
+        self.browser = browser
+        self.url = QUrl()
+        self.title = ""
+        self.icon = QIcon()
+        self.progress = 100
+        self.loading = False
+        self.load_ok = True
+        self.can_go_back = False
+        self.can_go_forward = False
+
+        browser.urlChanged.connect(self._on_url_changed)
+        browser.titleChanged.connect(self._on_title_changed)
+        browser.iconChanged.connect(self._on_icon_changed)
+        browser.loadStarted.connect(self._on_load_started)
+        browser.loadProgress.connect(self._on_load_progress)
+        browser.loadFinished.connect(self._on_load_finished)
+
+    def _update_history(self):
+        history = self.browser.history()
+        self.can_go_back = history.canGoBack()
+        self.can_go_forward = history.canGoForward()
+
+    def _on_url_changed(self, url):
+        self.url = url
+        self._update_history()
+        self.changed.emit(self)
+
+    def _on_title_changed(self, title):
+        self.title = title
+        self.changed.emit(self)
+
+    def _on_icon_changed(self, icon):
+        self.icon = icon
+        self.changed.emit(self)
+
+    def _on_load_started(self):
+        self.loading = True
+        self.progress = 0
+        self.changed.emit(self)
+
+    def _on_load_progress(self, progress):
+        if progress != self.progress:
+            self.progress = progress
+            self.changed.emit(self)
+
+    def _on_load_finished(self, ok):
+        self.loading = False
+        self.load_ok = ok
+        self.progress = 100
+        self._update_history()
+        self.changed.emit(self)
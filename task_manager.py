@@ -0,0 +1,299 @@
+import os
+import time
+import queue
+import threading
+from PyQt5.QtCore import (QAbstractTableModel, QModelIndex, QObject, QSortFilterProxyModel, QTimer, Qt,
+                          pyqtSignal)
+from PyQt5.QtWidgets import QAbstractItemView, QDialog, QHBoxLayout, QPushButton, QTableView, QVBoxLayout
+from PyQt5.QtWebEngineWidgets import QWebEnginePage
+
+from tab_discarder import TabPlaceholder, renderer_rss
+
+SAMPLE_INTERVAL = 2000
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def process_cpu_ticks(pid):
+    """utime + stime do processo em ticks do relógio, de /proc/<pid>/stat"""
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            # O nome do processo pode ter espaços e parênteses; os campos começam depois do último ")"
+            fields = stat.read().rsplit(")", 1)[1].split()
+        return int(fields[11]) + int(fields[12])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def process_memory(pid):
+    """PSS de /proc/<pid>/smaps_rollup quando existe (divide páginas compartilhadas), senão RSS"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as rollup:
+            for line in rollup:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return renderer_rss(pid)
+
+
+class ProcessSampler(QObject):
+    """Lê CPU e memória dos processos em uma thread própria; entrega {pid: (memória, cpu%)} por sampled"""
+
+    sampled = pyqtSignal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._tasks = queue.Queue()
+        self._previous = {}
+        self._worker = threading.Thread(target=self._run, name="task-manager", daemon=True)
+        self._worker.start()
+
+    def _run(self):
+        while True:
+            pids = self._tasks.get()
+            if pids is None:
+                break
+            self.sampled.emit(self._sample(pids))
+
+    def _sample(self, pids):
+        now = time.monotonic()
+        samples = {}
+        previous, self._previous = self._previous, {}
+        for pid in pids:
+            ticks = process_cpu_ticks(pid)
+            if ticks is None:
+                continue
+            self._previous[pid] = (ticks, now)
+            cpu = 0.0
+            if pid in previous:
+                last_ticks, last_time = previous[pid]
+                if now > last_time:
+                    cpu = 100.0 * (ticks - last_ticks) / CLOCK_TICKS / (now - last_time)
+            samples[pid] = (process_memory(pid), cpu)
+        return samples
+
+    def request(self, pids):
+        # Amostras atrasadas são descartadas: só a mais nova importa
+        while not self._tasks.empty():
+            try:
+                self._tasks.get_nowait()
+            except queue.Empty:
+                break
+        self._tasks.put(sorted(set(pids)))
+
+    def close(self):
+        self._tasks.put(None)
+
+
+LIFECYCLE_NAMES = {
+    QWebEnginePage.LifecycleState.Active: "ativa",
+    QWebEnginePage.LifecycleState.Frozen: "congelada",
+    QWebEnginePage.LifecycleState.Discarded: "descartada",
+}
+
+
+def tab_lifecycle(tab):
+    if tab is None:
+        return ""
+    if isinstance(tab, TabPlaceholder):
+        return "descartada"
+    return LIFECYCLE_NAMES.get(tab.page().lifecycleState(), "")
+
+
+class TaskRow:
+    __slots__ = ("window", "tab", "title", "lifecycle", "pid", "shared", "memory", "cpu")
+
+    def __init__(self, window, tab, title, pid, shared=1, memory=0, cpu=0.0):
+        self.window = window
+        self.tab = tab
+        self.title = title
+        self.lifecycle = tab_lifecycle(tab)
+        self.pid = pid
+        self.shared = shared
+        self.memory = memory
+        self.cpu = cpu
+
+
+class TaskModel(QAbstractTableModel):
+    HEADERS = ("Aba", "Janela", "Estado", "PID", "Memória", "CPU")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        row = self.rows[index.row()]
+        column = index.column()
+        if role == Qt.UserRole:
+            return (row.title.lower(), row.window.session_id if row.window else 0, row.lifecycle, row.pid,
+                    row.memory, row.cpu)[column]
+        if role == Qt.TextAlignmentRole and column >= 3:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        if role != Qt.DisplayRole:
+            return None
+        if column == 0:
+            return row.title
+        if column == 1:
+            return str(row.window.session_id) if row.window else ""
+        if column == 2:
+            return row.lifecycle
+        if column == 3:
+            return str(row.pid) if row.pid else ""
+        if column == 4:
+            if not row.pid:
+                return ""
+            text = f"{row.memory / (1024 * 1024):.0f} MB"
+            return f"{text} (÷{row.shared})" if row.shared > 1 else text
+        return f"{row.cpu:.1f}%" if row.pid else ""
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+
+class TaskManager(QDialog):
+    """Cada aba com seu renderizador, memória e CPU, atualizado em segundo plano enquanto visível"""
+
+    _shared = None
+
+    @classmethod
+    def show_for(cls, session):
+        if cls._shared is None:
+            cls._shared = cls(session)
+        cls._shared.show()
+        cls._shared.raise_()
+        cls._shared.activateWindow()
+        return cls._shared
+
+    def __init__(self, session, parent=None):
+        super().__init__(parent)
+        self.session = session
+        self.setWindowTitle("Gerenciador de tarefas")
+        self.resize(720, 480)
+
+        self.model = TaskModel(self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setSortRole(Qt.UserRole)
+
+        self.view = QTableView()
+        self.view.setModel(self.proxy)
+        self.view.setSortingEnabled(True)
+        self.view.sortByColumn(5, Qt.DescendingOrder)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.view.verticalHeader().hide()
+        self.view.horizontalHeader().setStretchLastSection(False)
+        self.view.setColumnWidth(0, 360)
+
+        self.discard_button = QPushButton("Descartar")
+        self.discard_button.clicked.connect(self.discard_selected)
+        self.close_button = QPushButton("Fechar aba")
+        self.close_button.clicked.connect(self.close_selected)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        buttons.addWidget(self.discard_button)
+        buttons.addWidget(self.close_button)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.view)
+        layout.addLayout(buttons)
+
+        self._pending_rows = None
+        self.sampler = ProcessSampler(self)
+        self.sampler.sampled.connect(self.apply_sample)
+        self.timer = QTimer(self)
+        self.timer.setInterval(SAMPLE_INTERVAL)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start()
+
+    def hideEvent(self, event):
+        # Fechado não custa nada: sem timer, sem leituras de /proc
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def collect_rows(self):
+        rows = []
+        sharing = {}
+        for window in self.session.windows():
+            tabs = window.tabs
+            for index in range(tabs.count()):
+                tab = tabs.widget(index)
+                if tab is None:
+                    continue
+                pid = 0 if isinstance(tab, TabPlaceholder) else tab.page().renderProcessPid()
+                rows.append(TaskRow(window, tab, tabs.tabText(index), pid))
+                if pid:
+                    sharing[pid] = sharing.get(pid, 0) + 1
+        for row in rows:
+            row.shared = sharing.get(row.pid, 1)
+        rows.append(TaskRow(None, None, "Navegador", os.getpid()))
+        return rows
+
+    def refresh(self):
+        """Só enumera as abas aqui; a leitura de /proc acontece na thread do sampler"""
+        self._pending_rows = self.collect_rows()
+        self.sampler.request(row.pid for row in self._pending_rows if row.pid)
+
+    def apply_sample(self, samples):
+        rows = self._pending_rows
+        if rows is None:
+            return
+        for row in rows:
+            memory, cpu = samples.get(row.pid, (0, 0.0))
+            # Abas que dividem um renderizador dividem também o custo dele
+            row.memory = memory // row.shared
+            row.cpu = cpu / row.shared
+        selected = self.selected_row()
+        self.model.set_rows(rows)
+        if selected is not None:
+            for position, row in enumerate(rows):
+                if row.tab is selected.tab:
+                    self.view.selectRow(self.proxy.mapFromSource(self.model.index(position, 0)).row())
+                    break
+
+    def selected_row(self):
+        indexes = self.view.selectionModel().selectedRows()
+        if not indexes:
+            return None
+        return self.model.rows[self.proxy.mapToSource(indexes[0]).row()]
+
+    def _selected_tab_index(self):
+        row = self.selected_row()
+        if row is None or row.tab is None:
+            return None, -1
+        try:
+            return row, row.window.tabs.indexOf(row.tab)
+        except RuntimeError:
+            # A aba ou a janela já foi destruída desde a última amostra
+            return None, -1
+
+    def discard_selected(self):
+        row, index = self._selected_tab_index()
+        if index < 0 or isinstance(row.tab, TabPlaceholder):
+            return
+        if row.window.discarder.discard(row.tab):
+            self.refresh()
+
+    def close_selected(self):
+        row, index = self._selected_tab_index()
+        if index < 0:
+            return
+        row.window.close_tab(index)
+        self.refresh()
@@ -0,0 +1,42 @@
+import collections
+
+import cache_manager
+
+MB = 1024 * 1024
+GB = 1024 * MB
+DiskUsage = collections.namedtuple("DiskUsage", "total used free")
+
+
+def quota(monkeypatch, tmp_path, total, free):
+    monkeypatch.delenv("CLOWBROWSER_HTTP_CACHE_MB", raising=False)
+    monkeypatch.setattr(cache_manager.shutil, "disk_usage",
+                        lambda path: DiskUsage(total, total - free, free))
+    return cache_manager.adaptive_quota(str(tmp_path))
+
+
+def test_quota_shrinks_when_disk_fills_even_with_a_large_cache(monkeypatch, tmp_path):
+    (tmp_path / "entry").write_bytes(b"x" * MB)
+
+    roomy = quota(monkeypatch, tmp_path, total=500 * GB, free=100 * GB)
+    full = quota(monkeypatch, tmp_path, total=500 * GB, free=500 * MB)
+
+    assert roomy == 1 * GB
+    assert full == 80 * MB
+    assert full < roomy
+
+
+def test_quota_never_takes_most_of_a_nearly_full_disk(monkeypatch, tmp_path):
+    assert quota(monkeypatch, tmp_path, total=64 * GB, free=50 * MB) == 40 * MB
+
+
+def test_quota_is_capped_by_disk_size_and_maximum(monkeypatch, tmp_path):
+    assert quota(monkeypatch, tmp_path, total=200 * MB, free=150 * MB) == 20 * MB
+    assert quota(monkeypatch, tmp_path, total=1 * GB, free=900 * MB) == 90 * MB
+    assert quota(monkeypatch, tmp_path, total=8 * GB, free=1800 * MB) == 180 * MB
+    assert quota(monkeypatch, tmp_path, total=100 * 1024 * GB, free=90 * 1024 * GB) == cache_manager.MAX_CACHE_SIZE
+
+
+def test_fixed_quota_from_environment(monkeypatch, tmp_path):
+    monkeypatch.setenv("CLOWBROWSER_HTTP_CACHE_MB", "300")
+
+    assert cache_manager.adaptive_quota(str(tmp_path)) == 300 * MB
@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import download_manager
+
+CONTENT = bytes(range(256)) * 64
+ETAG = '"v2"'
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        first = None
+        range_header = self.headers.get("Range", "")
+        if range_header.startswith("bytes=") and self.headers.get("If-Range", ETAG) == ETAG:
+            start, _, end = range_header[len("bytes="):].partition("-")
+            first, last = int(start), int(end) if end else len(CONTENT) - 1
+        if first is None:
+            self.send_response(200)
+            body = CONTENT
+        else:
+            self.send_response(206)
+            body = CONTENT[first:last + 1]
+            self.send_header("Content-Range", f"bytes {first}-{last}/{len(CONTENT)}")
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def wait_finished(manager, download_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while download_id in manager._downloads:
+        assert time.monotonic() < deadline, "download não terminou"
+        time.sleep(0.02)
+
+
+def test_changed_file_restarts_from_scratch(tmp_path):
+    server = serve()
+    url = f"http://127.0.0.1:{server.server_address[1]}/file.bin"
+    path = os.path.join(tmp_path, "file.bin")
+    # Metade de uma versão antiga já baixada, com outro ETag
+    with open(path + ".part", "wb") as part:
+        part.write(b"\xff" * (len(CONTENT) // 2))
+        part.truncate(len(CONTENT))
+    with open(path + ".part.json", "w", encoding="utf-8") as state:
+        json.dump({"url": url, "size": len(CONTENT), "validator": '"v1"', "sha256": None,
+                   "segments": [[0, len(CONTENT) - 1, len(CONTENT) // 2]]}, state)
+
+    manager = download_manager.DownloadManager(rate_limit=0)
+    download_id = manager.start(url, path, headers={}, resume=True)
+    wait_finished(manager, download_id)
+    server.shutdown()
+
+    with open(path, "rb") as data:
+        assert data.read() == CONTENT
+    assert not os.path.exists(path + ".part")
+    assert not os.path.exists(path + ".part.json")
+
+
+class EmptyFileHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.headers.get("Range"):
+            self.send_response(416)
+            self.send_header("Content-Range", "bytes */0")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class SlowWholeHandler(BaseHTTPRequestHandler):
+    """Sem suporte a Range, e mandando o corpo devagar"""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(CONTENT)))
+        self.end_headers()
+        for start in range(0, len(CONTENT), 1024):
+            self.wfile.write(CONTENT[start:start + 1024])
+            self.wfile.flush()
+            time.sleep(0.05)
+
+    def log_message(self, *args):
+        pass
+
+
+class StalledHandler(BaseHTTPRequestHandler):
+    """Promete o arquivo e para de mandar bytes por alguns segundos"""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(CONTENT)))
+        self.end_headers()
+        self.wfile.flush()
+        time.sleep(3)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_with(handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/file.bin"
+
+
+def test_empty_file_with_unsatisfiable_range(tmp_path):
+    server, url = serve_with(EmptyFileHandler)
+    path = os.path.join(tmp_path, "empty.bin")
+    manager = download_manager.DownloadManager(rate_limit=0)
+
+    wait_finished(manager, manager.start(url, path, headers={}))
+    server.shutdown()
+
+    assert os.path.getsize(path) == 0
+    assert not os.path.exists(path + ".part")
+
+
+def test_cancelled_whole_download_leaves_no_part(tmp_path):
+    server, url = serve_with(SlowWholeHandler)
+    path = os.path.join(tmp_path, "file.bin")
+    manager = download_manager.DownloadManager(rate_limit=0)
+    download_id = manager.start(url, path, headers={})
+    deadline = time.monotonic() + 10
+    while not os.path.exists(path + ".part"):
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+    manager.cancel(download_id)
+    wait_finished(manager, download_id)
+    server.shutdown()
+
+    assert not os.path.exists(path + ".part")
+    assert not os.path.exists(path + ".part.json")
+    assert not os.path.exists(path)
+
+
+def test_shutdown_does_not_wait_for_a_stalled_connection(tmp_path):
+    server, url = serve_with(StalledHandler)
+    path = os.path.join(tmp_path, "file.bin")
+    manager = download_manager.DownloadManager(rate_limit=0)
+    manager.start(url, path, headers={})
+    deadline = time.monotonic() + 10
+    while not manager._futures:
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+    start = time.monotonic()
+    manager.shutdown(timeout=0.2)
+    elapsed = time.monotonic() - start
+    server.shutdown()
+
+    assert elapsed < 1.0
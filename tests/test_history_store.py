@@ -0,0 +1,104 @@
+import os
+import random
+
+import pytest
+
+import history_store
+
+
+def make_connection(tmp_path):
+    return history_store.connect(os.path.join(tmp_path, "history.sqlite"))
+
+
+def test_old_high_frecency_url_beats_many_newer_matches(tmp_path):
+    connection = make_connection(tmp_path)
+    connection.execute("INSERT INTO urls(url, title, visit_count, last_visit, score) VALUES (?, ?, ?, ?, ?)",
+                       ("https://github.com/", "GitHub", 900, 1.0, 1000.0))
+    connection.executemany(
+        "INSERT INTO urls(url, title, visit_count, last_visit, score) VALUES (?, ?, 1, ?, ?)",
+        [(f"https://gitlab{i}.example/", f"Gitlab {i}", 2.0 + i, 1.0 + i / 1000) for i in range(600)]
+    )
+    connection.commit()
+
+    suggestions = history_store.suggest(connection, "g")
+
+    assert suggestions[0] == ("https://github.com/", "GitHub")
+    assert len(suggestions) == history_store.SUGGESTION_LIMIT
+
+
+def test_suggestions_are_ordered_by_score(tmp_path):
+    connection = make_connection(tmp_path)
+    for number, score in enumerate((5.0, 50.0, 20.0)):
+        connection.execute("INSERT INTO urls(url, title, score) VALUES (?, ?, ?)",
+                           (f"https://wiki{number}.example/", "wiki", score))
+    connection.commit()
+
+    urls = [url for url, _ in history_store.suggest(connection, "wiki")]
+
+    assert urls == ["https://wiki1.example/", "https://wiki2.example/", "https://wiki0.example/"]
+
+
+def test_scheme_only_text_has_no_suggestions(tmp_path):
+    connection = make_connection(tmp_path)
+    history_store.add_visit(connection, "https://example.com/")
+    connection.commit()
+
+    assert history_store.suggest(connection, "https://www.") == []
+
+
+def brute_force(connection, text, limit=history_store.SUGGESTION_LIMIT):
+    patterns = history_store.match_pattern(history_store.query_words(text))
+    rows = connection.execute("SELECT url, title, score FROM urls ORDER BY score DESC").fetchall()
+    return [(url, title) for url, title, _ in rows
+            if all(pattern.search(history_store.fold(url + "\n" + title)) for pattern in patterns)][:limit]
+
+
+def synthetic_history(tmp_path, count):
+    connection = make_connection(tmp_path)
+    rng = random.Random(7)
+    words = "news mail docs wiki github python video music shop maps gitlab gmail".split()
+    rows = []
+    for number in range(count):
+        host, section = rng.sample(words, 2)
+        rows.append((f"https://www.{host}.site{number % 50}.com/{section}/{number}",
+                     f"{section.title()} {number}", rng.random() * 100))
+    connection.executemany("INSERT INTO urls(url, title, score) VALUES (?, ?, ?)", rows)
+    connection.commit()
+    return connection
+
+
+@pytest.mark.parametrize("text", ["g", "m", "gi", "gm", "co", "https://g", "https://www.g", "www.gi",
+                                  "http://www.mu", "github py", "site7 wi", "49"])
+def test_short_and_scheme_prefixes_match_full_ranking(tmp_path, text):
+    connection = synthetic_history(tmp_path, 5000)
+
+    assert history_store.suggest(connection, text) == brute_force(connection, text)
+
+
+def test_rare_match_below_the_scanned_rows_is_found(tmp_path):
+    connection = synthetic_history(tmp_path, 5000)
+    connection.execute("INSERT INTO urls(url, title, score) VALUES ('https://quixote.example/', 'Quixote', -1)")
+    connection.commit()
+
+    assert history_store.suggest(connection, "quix") == [("https://quixote.example/", "Quixote")]
+
+
+def test_accents_are_ignored_like_fts(tmp_path):
+    connection = make_connection(tmp_path)
+    connection.execute("INSERT INTO urls(url, title, score) VALUES ('https://g1.example/', 'Notícias', 1)")
+    connection.commit()
+
+    assert history_store.suggest(connection, "notic") == [("https://g1.example/", "Notícias")]
+
+
+def test_worker_survives_a_failing_task(tmp_path):
+    path = os.path.join(tmp_path, "history.sqlite")
+    store = history_store.HistoryStore(path)
+
+    store._tasks.put(lambda connection: 1 / 0)
+    store.record_visit("https://example.com/")
+    store.close()
+    store._worker.join(5)
+
+    connection = history_store.connect(path)
+    assert connection.execute("SELECT url FROM urls").fetchall() == [("https://example.com/",)]
@@ -0,0 +1,80 @@
+import os
+
+import pytest
+from PyQt5.QtWidgets import QApplication
+
+import session_store
+from tab_discarder import TabPlaceholder
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+class Tabs:
+    def __init__(self, widgets):
+        self.widgets = widgets
+        self.current = 0
+
+    def count(self):
+        return len(self.widgets)
+
+    def widget(self, index):
+        return self.widgets[index]
+
+    def currentWidget(self):
+        return self.widgets[self.current]
+
+
+class Window:
+    def __init__(self, store, urls):
+        self.tabs = Tabs([TabPlaceholder(url, url) for url in urls])
+        store.register_window(self)
+        for tab in self.tabs.widgets:
+            store.register_tab(tab)
+
+
+def journal_records(path):
+    with open(path, encoding="utf-8") as journal:
+        return [line for line in journal if '"op": "tab"' in line]
+
+
+def test_flush_appends_only_the_changed_tabs(app, tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    store = session_store.SessionStore(path)
+    window = Window(store, [f"https://example.com/{number}" for number in range(20)])
+    store.mark_dirty(window)
+    store.flush()
+    before = len(journal_records(path))
+
+    store.mark_dirty(window, window.tabs.widget(3))
+    store.mark_active(window)
+    store.flush()
+
+    assert before == 20
+    assert len(journal_records(path)) == 21
+    restored = session_store.read_journal(path)
+    assert [tab["url"] for tab in restored[0]["tabs"]] == [f"https://example.com/{number}" for number in range(20)]
+    assert restored[0]["active"] == window.tabs.widget(0).session_id
+
+
+def test_journal_is_compacted_while_running(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(session_store, "COMPACT_MIN_BYTES", 4096)
+    path = str(tmp_path / "session.jsonl")
+    store = session_store.SessionStore(path)
+    window = Window(store, ["https://example.com/a", "https://example.com/b"])
+    closed = window.tabs.widgets.pop()
+    store.mark_dirty(window)
+    store.flush()
+    store.tab_closed(closed)
+
+    for _ in range(200):
+        store.mark_dirty(window, window.tabs.widget(0))
+        store.flush()
+
+    assert os.path.getsize(path) < 2 * 4096
+    assert not os.path.exists(path + ".tmp")
+    restored = session_store.read_journal(path)
+    assert [tab["url"] for tab in restored[0]["tabs"]] == ["https://example.com/a"]
+    assert restored[0]["active"] == window.tabs.widget(0).session_id
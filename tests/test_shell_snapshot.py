@@ -0,0 +1,129 @@
+import os
+import json
+import time
+import functools
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import shell_snapshot
+
+ENTRY = "lacarosinside.html"
+SHELL_FILES = {
+    ENTRY: '<html><head><title>LaçarOS %s</title><link rel="stylesheet" href="style.css">'
+           '<script src="app.js?v=%s"></script></head><body><p>LaçarOS Inside</p></body></html>',
+    "style.css": "body { background: #%s; }",
+    "app.js": "document.documentElement.dataset.version = '%s';",
+}
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def write_shell_files(directory, version):
+    for name, template in SHELL_FILES.items():
+        path = os.path.join(directory, name)
+        with open(path, "w", encoding="utf-8") as data:
+            data.write(template.replace("%s", str(version)))
+        # Last-Modified tem resolução de segundos; empurra o mtime para a troca ser vista
+        mtime = time.time() + version * 10
+        os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def origin(tmp_path):
+    directory = tmp_path / "origin"
+    directory.mkdir()
+    write_shell_files(directory, 1)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=str(directory)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield directory, f"http://127.0.0.1:{server.server_address[1]}/", server
+    server.shutdown()
+    server.server_close()
+
+
+def revalidate(snapshot, base):
+    changes = shell_snapshot.refresh(snapshot, base, ENTRY, snapshot.current)
+    return snapshot.publish(*changes) if changes is not None else None
+
+
+def test_publish_swaps_current_only_after_the_version_is_complete(tmp_path):
+    snapshot = shell_snapshot.ShellSnapshot(str(tmp_path))
+    files = {ENTRY: {"content_type": "text/html"}, "a/b.css": {"content_type": "text/css"}}
+
+    first = snapshot.publish(files, {ENTRY: b"<p>1</p>", "a/b.css": b"p {}"})
+    second = snapshot.publish(files, {ENTRY: b"<p>2</p>", "a/b.css": b"p {}"})
+
+    assert (first["version"], second["version"]) == (1, 2)
+    with open(tmp_path / shell_snapshot.CURRENT_FILE, encoding="utf-8") as current:
+        assert json.load(current)["version"] == 2
+    assert snapshot.read(ENTRY) == ("text/html", b"<p>2</p>")
+    assert snapshot.read(ENTRY, first) == ("text/html", b"<p>1</p>")
+    assert snapshot.read("a/b.css") == ("text/css", b"p {}")
+    assert not any(name.endswith(".tmp") for name in os.listdir(tmp_path))
+
+
+def test_old_versions_are_pruned(tmp_path):
+    snapshot = shell_snapshot.ShellSnapshot(str(tmp_path))
+    for number in range(4):
+        snapshot.publish({ENTRY: {"content_type": "text/html"}}, {ENTRY: b"%d" % number})
+
+    versions = sorted(name for name in os.listdir(tmp_path) if name.startswith("v"))
+
+    assert versions == ["v3", "v4"]
+
+
+def test_missing_version_directory_means_no_snapshot(tmp_path):
+    snapshot = shell_snapshot.ShellSnapshot(str(tmp_path))
+    manifest = snapshot.publish({ENTRY: {"content_type": "text/html"}}, {ENTRY: b"shell"})
+    os.rename(snapshot.version_directory(manifest["version"]), tmp_path / "elsewhere")
+
+    reopened = shell_snapshot.ShellSnapshot(str(tmp_path))
+
+    assert reopened.current is None
+    assert reopened.read(ENTRY) is None
+
+
+def test_subresources_stay_on_the_shell_origin():
+    document = (b'<link rel="stylesheet" href="css/site.css"><script src="/app.js?v=2"></script>'
+                b'<img src="https://cdn.example/logo.png">')
+
+    paths = shell_snapshot.subresources(document, "https://host/shell/index.html", "https://host/shell/")
+
+    assert paths == {"css/site.css"}
+
+
+def test_revalidation_publishes_only_when_the_origin_changes(origin, tmp_path):
+    directory, base, _ = origin
+    snapshot = shell_snapshot.ShellSnapshot(str(tmp_path / "snapshot"))
+
+    first = revalidate(snapshot, base)
+    unchanged = revalidate(snapshot, base)
+    write_shell_files(directory, 2)
+    second = revalidate(snapshot, base)
+
+    assert first["version"] == 1
+    assert sorted(first["files"]) == ["app.js", ENTRY, "style.css"]
+    assert unchanged is None
+    assert second["version"] == 2
+    assert "LaçarOS 2" in snapshot.read(ENTRY)[1].decode("utf-8")
+    assert snapshot.read("style.css")[1] == b"body { background: #2; }"
+
+
+def test_offline_origin_keeps_serving_the_snapshot(origin, tmp_path):
+    _, base, server = origin
+    snapshot = shell_snapshot.ShellSnapshot(str(tmp_path / "snapshot"))
+    revalidate(snapshot, base)
+    server.shutdown()
+    server.server_close()
+
+    reopened = shell_snapshot.ShellSnapshot(str(tmp_path / "snapshot"))
+    with pytest.raises(OSError):
+        shell_snapshot.refresh(reopened, base, ENTRY, reopened.current)
+
+    assert reopened.current["version"] == 1
+    for path in SHELL_FILES:
+        assert reopened.read(path) is not None
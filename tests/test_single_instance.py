@@ -0,0 +1,50 @@
+import os
+
+import pytest
+from PyQt5.QtCore import QCoreApplication
+
+import single_instance
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def test_qt_options_and_their_values_are_not_urls():
+    qt_args, rest = single_instance.split_qt_args(["-platform", "offscreen", "example.com", "--style=fusion",
+                                                   "-reverse", "--new-window", "other.org"])
+
+    assert qt_args == ["-platform", "offscreen", "--style=fusion", "-reverse"]
+    assert rest == ["example.com", "--new-window", "other.org"]
+
+
+def test_arguments_after_double_dash_are_left_alone():
+    qt_args, rest = single_instance.split_qt_args(["--", "-platform"])
+
+    assert qt_args == []
+    assert rest == ["--", "-platform"]
+
+
+def test_engine_flags_are_detected_in_both_forms():
+    argv = ["Tema2.py", "--rendering", "gpu", "--process-model=site", "--rendering-report", "example.com"]
+
+    assert single_instance.engine_flags(argv) == ["--rendering", "--process-model"]
+
+
+def test_engine_flags_are_rejected_when_an_instance_is_running(app, capsys):
+    name = f"test-{os.getpid()}"
+    server = single_instance.SingleInstanceServer(name)
+    assert server.listen()
+    try:
+        with pytest.raises(SystemExit) as exit_info:
+            single_instance.forward_or_continue(name, ["Tema2.py", "--process-model", "site", "example.com"])
+    finally:
+        server.close()
+
+    assert exit_info.value.code == 2
+    assert "--process-model" in capsys.readouterr().err
+
+
+def test_engine_flags_start_normally_without_a_running_instance(app):
+    assert single_instance.forward_or_continue(f"absent-{os.getpid()}", ["Tema2.py", "--rendering", "gpu"]) is None
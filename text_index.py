@@ -0,0 +1,383 @@
+import re
+import time
+import itertools
+import queue
+import threading
+import collections
+import unicodedata
+from PyQt5.QtCore import Qt, QObject, QTimer
+from PyQt5.QtWidgets import QDialog, QLabel, QLineEdit, QListWidget, QListWidgetItem, QVBoxLayout
+from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineScript
+
+from tab_discarder import TabPlaceholder
+
+MAX_TEXT_CHARS = 50000
+MAX_TOKENS_PER_TAB = 5000
+MAX_TOTAL_CHARS = 20 * 1000 * 1000
+EXTRACT_DELAY = 1500
+CHECK_INTERVAL = 10 * 1000
+SIGNIFICANT_CHANGE = 2000
+MAX_RESULTS = 50
+SNIPPET_BEFORE = 60
+SNIPPET_AFTER = 100
+PREFIX_LENGTH = 3
+
+# Lê o texto visível uma vez e deixa um MutationObserver contando quanto texto mudou desde então
+EXTRACT_SCRIPT = """
+(function (limit) {
+    var state = window.__kitiTextIndex;
+    var root = document.body || document.documentElement;
+    if (!root) {
+        return "";
+    }
+    if (!state) {
+        state = window.__kitiTextIndex = {changed: 0};
+        new MutationObserver(function (mutations) {
+            mutations.forEach(function (mutation) {
+                if (mutation.type === "characterData") {
+                    state.changed += (mutation.target.data || "").length;
+                } else {
+                    mutation.addedNodes.forEach(function (node) {
+                        state.changed += (node.textContent || "").length;
+                    });
+                }
+            });
+        }).observe(root, {childList: true, subtree: true, characterData: true});
+    }
+    state.changed = 0;
+    return (root.innerText || "").slice(0, limit);
+})(%d)
+"""
+
+CHANGE_SCRIPT = "(window.__kitiTextIndex || {changed: 0}).changed"
+
+TOKEN = re.compile(r"\w{2,}")
+WHITESPACE = re.compile(r"\s+")
+
+# Tira acentos sem mudar o comprimento do texto, para as posições valerem no original
+FOLD_TABLE = {
+    codepoint: unicodedata.normalize("NFKD", chr(codepoint))[0]
+    for codepoint in range(0xC0, 0x250)
+    if unicodedata.normalize("NFKD", chr(codepoint))[0] != chr(codepoint)
+}
+
+
+def fold(text):
+    """Minúsculas e sem acentos, com o mesmo comprimento de text"""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        lowered = "".join(char.lower()[:1] or char for char in text)
+    return lowered.translate(FOLD_TABLE)
+
+
+def snippet(text, folded, term):
+    """Trecho do texto original em volta da primeira ocorrência do termo"""
+    position = folded.find(term)
+    if position < 0:
+        return ""
+    start = max(0, position - SNIPPET_BEFORE)
+    end = min(len(text), position + len(term) + SNIPPET_AFTER)
+    excerpt = WHITESPACE.sub(" ", text[start:end]).strip()
+    return ("…" if start else "") + excerpt + ("…" if end < len(text) else "")
+
+
+def resolve(tabs, tab_id):
+    """A aba com esse tab_id no TabWidget (a página ou o placeholder dela), ou None se fechou"""
+    try:
+        # Levanta RuntimeError se a janela já foi destruída
+        tabs.count()
+    except RuntimeError:
+        return None
+    return tabs.registry.tab(tab_id)
+
+
+class TextEntry:
+    __slots__ = ("tabs", "title", "url", "text", "folded", "counts")
+
+    def __init__(self, tabs, title, url, text, folded, counts):
+        self.tabs = tabs
+        self.title = title
+        self.url = url
+        self.text = text
+        self.folded = folded
+        self.counts = counts
+
+
+class SearchResult:
+    __slots__ = ("tab_id", "tabs", "title", "url", "snippet", "score")
+
+    def __init__(self, tab_id, tabs, title, url, snippet, score):
+        self.tab_id = tab_id
+        self.tabs = tabs
+        self.title = title
+        self.url = url
+        self.snippet = snippet
+        self.score = score
+
+
+class TextIndex(QObject):
+    """Índice invertido do texto das abas abertas, para achar em qual aba está um texto.
+
+    O texto é lido uma vez depois do load e de novo quando a página muda bastante; a quebra em
+    palavras roda numa thread. Cada aba guarda no máximo MAX_TEXT_CHARS caracteres e
+    MAX_TOKENS_PER_TAB palavras; passando de MAX_TOTAL_CHARS, as abas indexadas há mais tempo
+    saem primeiro. As entradas são do tab_id do TabRegistry: uma aba descartada continua
+    no índice pelo placeholder, e só close_tab a esquece.
+    """
+
+    _shared = None
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, max_total_chars=MAX_TOTAL_CHARS, parent=None):
+        super().__init__(parent)
+        self.max_total_chars = max_total_chars
+        self.total_chars = 0
+        self.evicted = 0
+        self._entries = collections.OrderedDict()
+        self._postings = {}
+        self._prefixes = {}
+        self._generations = {}
+        self._extractions = itertools.count(1)
+        self._lock = threading.Lock()
+        self._tasks = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="text-index", daemon=True)
+        self._worker.start()
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(CHECK_INTERVAL)
+        self._timer.timeout.connect(self.check_changes)
+        self._timer.start()
+
+    def _run(self):
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+            task()
+
+    def extract(self, tab):
+        """Lê o texto da aba e o indexa em segundo plano"""
+        key = getattr(tab, "tab_id", None)
+        tabs = getattr(tab.window(), "tabs", None)
+        if key is None or tabs is None:
+            # Aba ainda fora de uma janela, como as reservas do pool
+            return
+        generation = next(self._extractions)
+        with self._lock:
+            self._generations[key] = generation
+        try:
+            tab.page().runJavaScript(EXTRACT_SCRIPT % MAX_TEXT_CHARS, QWebEngineScript.ApplicationWorld,
+                                     lambda text: self._extracted(key, generation, tab, tabs, text))
+        except RuntimeError:
+            pass
+
+    def _extracted(self, key, generation, tab, tabs, text):
+        if not isinstance(text, str):
+            return
+        try:
+            title, url = tab.title(), tab.url().toString()
+        except RuntimeError:
+            # A aba foi destruída enquanto o script rodava
+            return
+        self._tasks.put(lambda: self.index_text(key, tabs, title, url, text, generation))
+
+    def index_text(self, key, tabs, title, url, text, generation=None):
+        """Quebra o texto em palavras e troca a entrada da aba; roda na thread do índice"""
+        text = text[:MAX_TEXT_CHARS]
+        folded = fold(text)
+        counts = dict(collections.Counter(TOKEN.findall(fold(title) + "\n" + folded))
+                      .most_common(MAX_TOKENS_PER_TAB))
+        entry = TextEntry(tabs, title, url, text, folded, counts)
+        with self._lock:
+            # Leitura antiga (a aba fechou ou já foi lida de novo): descarta
+            if generation is not None and self._generations.get(key) != generation:
+                return
+            self._remove(key)
+            self._entries[key] = entry
+            self.total_chars += len(text)
+            for token, count in counts.items():
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    self._prefixes.setdefault(token[:PREFIX_LENGTH], set()).add(token)
+                postings[key] = count
+            while self.total_chars > self.max_total_chars and len(self._entries) > 1:
+                self._remove(next(iter(self._entries)))
+                self.evicted += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.total_chars -= len(entry.text)
+        for token in entry.counts:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[token]
+                tokens = self._prefixes.get(token[:PREFIX_LENGTH])
+                if tokens is not None:
+                    tokens.discard(token)
+                    if not tokens:
+                        del self._prefixes[token[:PREFIX_LENGTH]]
+
+    def forget(self, key):
+        """Esquece uma aba fechada pelo tab_id"""
+        with self._lock:
+            self._generations.pop(key, None)
+            self._remove(key)
+
+    def check_changes(self):
+        """Reindexa as abas visíveis cujo texto mudou bastante desde a última leitura"""
+        with self._lock:
+            entries = [(key, entry.tabs) for key, entry in self._entries.items()]
+        for key, tabs in entries:
+            tab = resolve(tabs, key)
+            if tab is None:
+                # A janela fechou sem passar por close_tab
+                self.forget(key)
+                continue
+            if isinstance(tab, TabPlaceholder):
+                continue
+            try:
+                if not tab.isVisible() or tab.page().lifecycleState() != QWebEnginePage.LifecycleState.Active:
+                    continue
+                tab.page().runJavaScript(CHANGE_SCRIPT, QWebEngineScript.ApplicationWorld,
+                                         lambda changed, tab=tab: self._changed(tab, changed))
+            except RuntimeError:
+                continue
+
+    def _changed(self, tab, changed):
+        if isinstance(changed, (int, float)) and changed >= SIGNIFICANT_CHANGE:
+            self.extract(tab)
+
+    def search(self, query, limit=MAX_RESULTS):
+        """Abas que têm todas as palavras da busca (a última como prefixo), com um trecho de cada"""
+        terms = TOKEN.findall(fold(query))
+        if not terms:
+            return []
+        with self._lock:
+            scores = None
+            for position, term in enumerate(terms):
+                matches = {}
+                if position == len(terms) - 1 and len(term) >= PREFIX_LENGTH:
+                    tokens = [token for token in self._prefixes.get(term[:PREFIX_LENGTH], ())
+                              if token.startswith(term)]
+                else:
+                    tokens = [term]
+                for token in tokens:
+                    for key, count in self._postings.get(token, {}).items():
+                        matches[key] = matches.get(key, 0) + count
+                if scores is None:
+                    scores = matches
+                else:
+                    scores = {key: scores[key] + count for key, count in matches.items() if key in scores}
+                if not scores:
+                    return []
+            best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+            results = []
+            for key, score in best:
+                entry = self._entries[key]
+                results.append(SearchResult(key, entry.tabs, entry.title, entry.url,
+                                            snippet(entry.text, entry.folded, terms[0]), score))
+        return results
+
+    def stats(self):
+        with self._lock:
+            return {"tabs": len(self._entries), "chars": self.total_chars,
+                    "tokens": len(self._postings), "evicted": self.evicted}
+
+    def close(self):
+        self._tasks.put(None)
+
+
+class TextSearchDialog(QDialog):
+    """Busca de texto em todas as abas abertas; escolher um resultado vai até a aba e destaca o texto"""
+
+    _shared = None
+
+    @classmethod
+    def show_for(cls, index=None):
+        if cls._shared is None:
+            cls._shared = cls(index or TextIndex.shared())
+        cls._shared.show()
+        cls._shared.raise_()
+        cls._shared.activateWindow()
+        cls._shared.search.setFocus()
+        cls._shared.search.selectAll()
+        return cls._shared
+
+    def __init__(self, index, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.setWindowTitle("Buscar nas abas")
+        self.resize(560, 480)
+
+        self.search = QLineEdit()
+        self.search.setPlaceholderText("Texto que aparece em alguma aba aberta...")
+        self.search.setClearButtonEnabled(True)
+        self.search.textChanged.connect(self.run_search)
+        self.search.returnPressed.connect(lambda: self.open_result(self.results.item(0)))
+
+        self.results = QListWidget()
+        self.results.setWordWrap(True)
+        self.results.itemActivated.connect(self.open_result)
+        self.results.itemClicked.connect(self.open_result)
+
+        self.summary = QLabel()
+        self.summary.setObjectName("textSearchSummary")
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.search)
+        layout.addWidget(self.results)
+        layout.addWidget(self.summary)
+        self._results = []
+
+    def run_search(self, text):
+        start = time.perf_counter()
+        self._results = self.index.search(text)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.results.clear()
+        for number, result in enumerate(self._results):
+            item = QListWidgetItem(f"{result.title or result.url}\n{result.snippet}")
+            item.setToolTip(result.url)
+            item.setData(Qt.UserRole, number)
+            self.results.addItem(item)
+        stats = self.index.stats()
+        self.summary.setText(f"{len(self._results)} abas em {elapsed:.1f} ms "
+                             f"({stats['tabs']} abas indexadas)" if text.strip() else "")
+
+    def open_result(self, item):
+        if item is None:
+            return
+        result = self._results[item.data(Qt.UserRole)]
+        tab = resolve(result.tabs, result.tab_id)
+        if tab is None:
+            # A aba fechou depois da busca
+            self.run_search(self.search.text())
+            return
+        # Ativar um placeholder recria a página; a aba atual passa a ser a nova BrowserTab
+        result.tabs.setCurrentIndex(result.tabs.indexOf(tab))
+        restored = tab is not result.tabs.currentWidget()
+        tab = result.tabs.currentWidget()
+        window = result.tabs.window()
+        window.raise_()
+        window.activateWindow()
+        terms = self.search.text().split()
+        if not terms:
+            return
+        if restored:
+            def find_when_loaded(ok):
+                tab.loadFinished.disconnect(find_when_loaded)
+                if ok:
+                    tab.findText(terms[0])
+            tab.loadFinished.connect(find_when_loaded)
+        else:
+            tab.findText(terms[0])
@@ -0,0 +1,245 @@
+import os
+import functools
+from string import Template
+from PyQt5.QtGui import QColor, QPalette
+
+DEFAULT_THEME = "dark"
+
+COLORS = {
+    "dark": {
+        "window": "#202124",
+        "surface": "#2d2e30",
+        "raised": "#3c4043",
+        "border": "#5f6368",
+        "pressed": "#9aa0a6",
+        "text": "#e8eaed",
+        "muted": "#9aa0a6",
+        "accent": "#8ab4f8",
+        "visited": "#c58af9",
+        "page": "white",
+        "page_text": "black",
+    },
+    "light": {
+        "window": "#ffffff",
+        "surface": "#f1f3f4",
+        "raised": "#e8eaed",
+        "border": "#dadce0",
+        "pressed": "#bdc1c6",
+        "text": "#202124",
+        "muted": "#5f6368",
+        "accent": "#1a73e8",
+        "visited": "#681da8",
+        "page": "white",
+        "page_text": "black",
+    },
+}
+
+STYLESHEET = Template("""
+    QMainWindow {
+        background-color: $window;
+        color: $text;
+    }
+    QWebEngineView {
+        background-color: $page;
+        color: $page_text;
+    }
+
+    QToolBar {
+        background-color: $window;
+        border: none;
+        border-bottom: 1px solid $raised;
+        padding: 5px 10px;
+        spacing: 5px;
+    }
+    QToolButton {
+        background: transparent;
+        border: none;
+        border-radius: 4px;
+        padding: 5px;
+        color: $text;
+    }
+    QToolButton:hover {
+        background: $raised;
+    }
+    QToolButton:pressed {
+        background: $border;
+    }
+    QToolButton:disabled {
+        color: $border;
+    }
+    QToolButton#menuButton::menu-indicator {
+        width: 0px;
+    }
+    QToolButton#newTabButton {
+        border: 1px solid $border;
+        border-radius: 12px;
+        font-size: 16px;
+        font-weight: bold;
+    }
+    QToolButton#newTabButton:hover {
+        background: $raised;
+        border-color: $accent;
+    }
+    QToolButton#newTabButton:pressed {
+        background: $border;
+    }
+
+    QLineEdit {
+        padding: 8px 15px;
+        border: 1px solid $border;
+        border-radius: 20px;
+        background: $surface;
+        color: $text;
+        min-width: 400px;
+        margin: 5px 10px;
+        font-size: 13px;
+        selection-background-color: $border;
+    }
+    QLineEdit:focus {
+        border: 2px solid $accent;
+        background: $raised;
+        padding: 7px 14px;
+    }
+
+    QTabWidget::pane {
+        border: none;
+        background: $window;
+    }
+    QTabBar::tab {
+        background: $surface;
+        color: $text;
+        padding: 8px 15px 8px 15px;
+        margin: 0 1px;
+        border-top-left-radius: 4px;
+        border-top-right-radius: 4px;
+        border: 1px solid $raised;
+        border-bottom: none;
+        min-width: 100px;
+        max-width: 200px;
+    }
+    QTabBar::tab:selected {
+        background: $window;
+        border-bottom: 2px solid $accent;
+        color: $accent;
+        margin-bottom: -1px;
+    }
+    QTabBar::tab:!selected {
+        margin-top: 2px;
+        background: $surface;
+    }
+    QTabBar::tab:hover {
+        background: $raised;
+    }
+    QTabBar::tab:first-child {
+        margin-left: 5px;
+    }
+    QTabBar::close-button {
+        subcontrol-position: right;
+        width: 16px;
+        height: 16px;
+        margin: 0px 2px;
+        border-radius: 8px;
+        background: transparent;
+    }
+    QTabBar::close-button:hover {
+        background: $border;
+    }
+    QTabBar::close-button:pressed {
+        background: $pressed;
+    }
+    QTabBar::scroller {
+        width: 20px;
+    }
+    QTabBar QToolButton {
+        background: $surface;
+        border: none;
+        padding: 0px;
+        margin: 0px;
+        color: $text;
+        font-size: 14px;
+        font-weight: bold;
+    }
+    QTabBar QToolButton:hover {
+        background: $raised;
+    }
+    QTabBar QToolButton:pressed {
+        background: $border;
+    }
+
+    QStatusBar {
+        background-color: $window;
+        color: $muted;
+        border-top: 1px solid $raised;
+        font-size: 11px;
+    }
+    QProgressBar {
+        border: 1px solid $border;
+        border-radius: 4px;
+        text-align: center;
+        background: $raised;
+        min-width: 100px;
+        max-width: 200px;
+        height: 6px;
+    }
+    QProgressBar::chunk {
+        background-color: $accent;
+        border-radius: 2px;
+    }
+
+    QMenu {
+        background-color: $surface;
+        color: $text;
+        border: 1px solid $border;
+        padding: 5px;
+    }
+    QMenu::item {
+        padding: 5px 30px 5px 30px;
+    }
+    QMenu::item:selected {
+        background-color: $raised;
+    }
+    QMenu::item:disabled {
+        color: $border;
+    }
+""")
+
+
+def theme_name():
+    name = os.environ.get("CLOWBROWSER_THEME", DEFAULT_THEME)
+    return name if name in COLORS else DEFAULT_THEME
+
+
+@functools.lru_cache(maxsize=None)
+def compile_stylesheet(name):
+    """Folha de estilo única da aplicação para o tema, montada uma vez só"""
+    return STYLESHEET.substitute(COLORS[name])
+
+
+def build_palette(palette, name):
+    colors = COLORS[name]
+    roles = {
+        QPalette.Window: colors["window"],
+        QPalette.WindowText: colors["text"],
+        QPalette.Base: colors["surface"],
+        QPalette.AlternateBase: colors["raised"],
+        QPalette.ToolTipBase: colors["window"],
+        QPalette.ToolTipText: colors["text"],
+        QPalette.Text: colors["text"],
+        QPalette.Button: colors["raised"],
+        QPalette.ButtonText: colors["text"],
+        QPalette.BrightText: colors["accent"],
+        QPalette.Highlight: colors["accent"],
+        QPalette.HighlightedText: colors["window"],
+        QPalette.Link: colors["accent"],
+        QPalette.LinkVisited: colors["visited"],
+    }
+    for role, color in roles.items():
+        palette.setColor(role, QColor(color))
+    return palette
+
+
+def apply_theme(app, name=None):
+    """Aplica paleta e folha de estilo no nível da aplicação; nenhum widget tem estilo próprio"""
+    name = name or theme_name()
+    app.setPalette(build_palette(app.palette(), name))
+    app.setStyleSheet(compile_stylesheet(name))